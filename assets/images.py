@@ -1,71 +1,269 @@
-from enum import Enum
-from pygame import Surface, image
-
-
-class ImageChoice(Enum):
-    BACKGROUND_COMBAT_JUNGLE  = "assets/backgrounds/combat_jungle.webp"
-    BACKGROUND_SHOP_JUNGLE    = "assets/backgrounds/shop_jungle.webp"
-
-    CHARACTER_CORPSE          = "assets/corpse-transformed.webp"
-
-    #Characters
-    CHARACTER_ARCHER          = "assets/characters/archer-transformed.webp"  
-    CHARACTER_ASSASSIN_RAPTOR = "assets/characters/assassinraptor-transformed.webp"
-    CHARACTER_CLUB            = "assets/characters/club-transformed.webp"
-    CHARACTER_CREST           = "assets/characters/crest-transformed.webp"
-    CHARACTER_HEALER          = "assets/characters/healer-transformed.webp"
-    CHARACTER_DILOPHMAGE      = "assets/characters/dilophmage-transformed.webp"
-    CHARACTER_PIKEMAN         = "assets/characters/pikeman-transformed.webp"
-    CHARACTER_PTERO           = "assets/characters/ptero-transformed.webp"
-    CHARACTER_SPINO           = "assets/characters/spino-transformed.webp"
-    CHARACTER_SUMMONER        = "assets/characters/summoner-transformed.webp"
-    CHARACTER_VELO            = "assets/characters/velo-transformed.webp"
-    CHARACTER_ALCHEMIST       = "assets/characters/alchemist-transformed.webp"
-    CHARACTER_BARD            = "assets/characters/bard-transformed.webp"
-    CHARACTER_BATTLE_MAGE     = "assets/characters/battlemage-transformed.webp"
-    CHARACTER_NATURE_MAGE     = "assets/characters/nature-transformed.webp"
-    CHARACTER_NECROMANCER     = "assets/characters/necro-transformed.webp"
-    CHARACTER_QUETZALCOATLUS  = "assets/characters/quetz-transformed.webp"
-    CHARACTER_RAPTOR          = "assets/characters/raptor2-transformed.webp"
-    CHARACTER_DEFENDER        = "assets/characters/shield-transformed.webp"
-
-    #Enemies
-    CHARACTER_AEPYCAMELUS     = "assets/enemies/aepycamelus.webp"
-    CHARACTER_BRONTOTHERIUM   = "assets/enemies/brontotherium.webp"
-    CHARACTER_CRANIOCERAS     = "assets/enemies/cranioceras.webp"
-    CHARACTER_GLYPTO          = "assets/enemies/glypto.webp"
-    CHARACTER_GORGONO         = "assets/enemies/gorgonopsid.webp"
-    CHARACTER_MAMMOTH         = "assets/enemies/mammoth-transformed.webp"
-    CHARACTER_PHORUS          = "assets/enemies/phorusrhacus.webp"
-    CHARACTER_SABRE           = "assets/enemies/sabre-transformed.webp"
-    CHARACTER_SLOTH           = "assets/enemies/sloth.webp"
-    CHARACTER_TRILO           = "assets/enemies/trilobite-transformed.webp"
-
-    #UI images
-    CHARACTER_TOOLTIP         = "assets/ui/tooltip.webp"
-    SLOT                      = "assets/ui/slot.webp"
-    SLOT_HOVER                = "assets/ui/slot-hover.webp"
-    COMBAT_TARGET             = "assets/ui/target.png"
-    HEALTH_ICON               = "assets/ui/health.webp"
-    DAMAGE_ICON               = "assets/ui/attack.webp"
-    REROLL_BUTTON             = "assets/ui/reroll.webp"
-    FIGHT_BUTTON              = "assets/ui/fight.webp"
-    BUY_BUTTON                = "assets/ui/buy.webp"
-    GOLD_ICON                 = "assets/ui/gold.webp"
-    GOLD_BACK                 = "assets/ui/goldback.webp"
-
-
-    COMMON_TIER_EGG           = "assets/ui/common.webp"
-    UNCOMMON_TIER_EGG         = "assets/ui/uncommon.webp"
-    RARE_TIER_EGG             = "assets/ui/rare.webp"
-    LEGENDARY_TIER_EGG        = "assets/ui/legendary.webp"
-
-    COMMON_TIER_ICON           = "assets/ui/bronzeicon.webp"
-    UNCOMMON_TIER_ICON         = "assets/ui/silvericon.webp"
-    RARE_TIER_ICON             = "assets/ui/goldicon.webp"
-    LEGENDARY_TIER_ICON        = "assets/ui/crystalicon.webp"   
-
-
-
-
-IMAGES: dict[ImageChoice, Surface] = {character_image: image.load(character_image.value) for character_image in ImageChoice}
\ No newline at end of file
+import json
+import logging
+import os
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from typing import Any, Callable, Final, Hashable, NamedTuple, Optional, TypeVar, Union
+from pygame import Surface, Mask, display, image, mask, transform
+
+from assets.image_choice import ImageChoice
+from settings import IMAGE_CACHE_BUDGET_BYTES, PRELOAD_BUDGET_SHARE
+
+
+BAKED_BUNDLE_PATH: Final[str] = "assets/baked/images.bundle"
+BAKED_INDEX_PATH: Final[str] = "assets/baked/images.json"
+BAKED_FORMAT_VERSION: Final[int] = 3
+
+
+class ImageVariant(NamedTuple):
+    image_key: ImageChoice
+    size: Optional[tuple[int, int]] = None     # None is the full resolution original
+    flip: bool = False
+
+
+class DerivedKey(NamedTuple):
+    """Anything else made from an image (hover frames, masks, composites), cached and budgeted next to the variants"""
+    image_key: ImageChoice     # What it is made from, memory_report() counts it towards this image
+    kind: str
+    parameters: Hashable
+
+
+CacheKey = Union[ImageVariant, DerivedKey]
+Cached = TypeVar("Cached")
+
+
+class ImageCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    resident_bytes: int
+    budget_bytes: int
+
+
+def get_surface_bytes(surface: Surface) -> int:
+    return surface.get_pitch() * surface.get_height()
+
+
+def get_resident_bytes(cached: Any) -> int:
+    """Pixel memory of a cache entry, a surface, a mask (one bit per pixel) or a tuple holding them"""
+    if isinstance(cached, Surface): return get_surface_bytes(cached)
+    if isinstance(cached, Mask): return (cached.get_size()[0] + 7) // 8 * cached.get_size()[1]
+    if isinstance(cached, tuple): return sum(get_resident_bytes(item) for item in cached)
+    return 0
+
+
+def to_display_format(surface: Surface) -> Surface:
+    """Pixel format conversion needs a display mode, before that the surface is kept as decoded"""
+    if display.get_init() and display.get_surface():
+        return surface.convert_alpha()
+    return surface
+
+
+class BakedImage(NamedTuple):
+    offset: int
+    width: int
+    height: int
+    source_bytes: int      # Size and modification time of the webp it was baked from, only checked by bake_assets.py
+    source_mtime_ns: int
+
+
+def open_pixels(bundle_path: str) -> memoryview:
+    """Memory-map the bundle, or read it in one go where mmap is not available (e.g. pygbag)"""
+    with open(bundle_path, "rb") as bundle_file:
+        try:
+            import mmap
+            return memoryview(mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ))
+        except (ImportError, OSError, ValueError):
+            return memoryview(bundle_file.read())
+
+
+class BakedBundle:
+    """
+    Pre-decoded RGBA pixels written by bake_assets.py, surfaces are built directly on top of the mapped file.
+    The index is trusted as is, the sources are never opened at runtime, `python bake_assets.py --check` finds stale entries.
+    """
+    def __init__(self, pixels: memoryview, images: dict[ImageChoice, BakedImage]) -> None:
+        self.pixels = pixels
+        self.images = images
+
+    @classmethod
+    def open(cls, bundle_path: str = BAKED_BUNDLE_PATH, index_path: str = BAKED_INDEX_PATH) -> Optional["BakedBundle"]:
+        if not (os.path.exists(bundle_path) and os.path.exists(index_path)): return None
+        with open(index_path, "r") as index_file:
+            index = json.load(index_file)
+        if index.get("version") != BAKED_FORMAT_VERSION:
+            logging.warning(f"Ignoring {bundle_path}, it was baked with format {index.get('version')}")
+            return None
+
+        images = {ImageChoice[name]: BakedImage(**entry) for name, entry in index["images"].items() if name in ImageChoice.__members__}
+        return cls(open_pixels(bundle_path), images)
+
+    def load(self, image_key: ImageChoice) -> Optional[Surface]:
+        baked_image = self.images.get(image_key)
+        if not baked_image: return None
+        end = baked_image.offset + baked_image.width * baked_image.height * 4
+        return image.frombuffer(self.pixels[baked_image.offset:end], (baked_image.width, baked_image.height), "RGBA")
+
+
+class AssetManager:
+    """
+    Loads images on first use and keeps them, their scaled variants and everything else derived from
+    them (see DerivedKey) in one LRU cache limited by a byte budget. Originals are evicted like any other
+    entry and decoded again when a new size is requested, so only the sizes actually drawn stay resident.
+    Preloaded originals are the exception, they are never evicted and may only fill their share of the budget.
+    Originals come from the baked bundle when there is one, and are decoded from the webp files otherwise.
+    """
+    def __init__(self, budget_bytes: int = IMAGE_CACHE_BUDGET_BYTES, use_baked_bundle: bool = True) -> None:
+        self.budget_bytes = budget_bytes
+        self.use_baked_bundle = use_baked_bundle
+        self.bundle: Optional[BakedBundle] = None
+        self.variants: OrderedDict[CacheKey, Any] = OrderedDict()
+        self.pinned: set[CacheKey] = set()
+        self.resident_bytes: int = 0
+        self.pinned_bytes: int = 0
+        self.preload_budget_bytes: int = round(budget_bytes * PRELOAD_BUDGET_SHARE)
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get_image(self, image_key: ImageChoice) -> Surface:
+        """Full resolution original, converted to the display format"""
+        return self.get_variant(ImageVariant(image_key))
+
+    def get_scaled(self, image_key: ImageChoice, size: tuple[int, int], flip: bool = False) -> Surface:
+        return self.get_variant(ImageVariant(image_key, size, flip))
+
+    def get_mask(self, image_key: ImageChoice, size: tuple[int, int], flip: bool = False) -> Mask:
+        """Opaque pixels of a scaled variant for hit testing"""
+        variant = ImageVariant(image_key, size, flip)
+        return self.get_cached(DerivedKey(image_key, "mask", variant), lambda: mask.from_surface(self.get_variant(variant)))
+
+    def get_hover_frame(self, variant: ImageVariant, scale_ratios: tuple[float, ...], frame: int) -> Surface:
+        """
+        The scaled variant grown by one of the ratios, the first is the variant itself. The fully grown last frame is
+        a scaled variant of its own, the frames in between are smoothscaled down from it, so they never need the original.
+        """
+        assert variant.size
+        if frame == 0: return self.get_variant(variant)
+        sizes = tuple((round(variant.size[0] * scale_ratio), round(variant.size[1] * scale_ratio)) for scale_ratio in scale_ratios)
+        grown = variant._replace(size=sizes[-1])
+        if frame == len(sizes) - 1: return self.get_variant(grown)
+
+        def create_frames() -> tuple[Surface, ...]:
+            return tuple(transform.smoothscale(self.get_variant(grown), size) for size in sizes[1:-1])
+        return self.get_cached(DerivedKey(variant.image_key, "hover frames", (variant, scale_ratios)), create_frames)[frame - 1]
+
+    def get_hover_mask(self, variant: ImageVariant, scale_ratios: tuple[float, ...], frame: int) -> Mask:
+        key = DerivedKey(variant.image_key, "hover mask", (variant, scale_ratios, frame))
+        return self.get_cached(key, lambda: mask.from_surface(self.get_hover_frame(variant, scale_ratios, frame)))
+
+    def get_variant(self, variant: ImageVariant) -> Surface:
+        return self.get_cached(variant, lambda: self.create_variant(variant))
+
+    def get_cached(self, key: CacheKey, create: Callable[[], Cached]) -> Cached:
+        cached = self.variants.get(key)
+        if cached is not None:
+            self.variants.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        cached = create()
+        self.store(key, cached)
+        return cached
+
+    def open_bundle(self) -> None:
+        if self.use_baked_bundle and self.bundle is None:
+            self.bundle = BakedBundle.open()
+            self.use_baked_bundle = self.bundle is not None
+
+    def is_baked(self, image_key: ImageChoice) -> bool:
+        self.open_bundle()
+        return bool(self.bundle and image_key in self.bundle.images)
+
+    def is_loaded(self, image_key: ImageChoice) -> bool:
+        return ImageVariant(image_key) in self.variants
+
+    def load_original(self, image_key: ImageChoice) -> Surface:
+        self.open_bundle()
+        # Baked pixels stay in the mapped file, the scaled variants made from them are converted instead
+        baked_surface = self.bundle.load(image_key) if self.bundle else None
+        if baked_surface:
+            return baked_surface
+        return to_display_format(image.load(image_key.value))
+
+    def preload(self, image_key: ImageChoice, decoded: Optional[Surface] = None) -> bool:
+        """
+        Keep an original resident for good, optionally one decoded elsewhere (e.g. on a loader thread).
+        Returns False without keeping it when it does not fit in what is left of the preload budget.
+        """
+        variant = ImageVariant(image_key)
+        if variant in self.pinned: return True
+        surface = self.variants.get(variant)
+        if surface is None:
+            surface = to_display_format(decoded) if decoded is not None else self.load_original(image_key)
+        surface_bytes = get_surface_bytes(surface)
+        if self.pinned_bytes + surface_bytes > self.preload_budget_bytes: return False
+
+        if variant not in self.variants:
+            self.store(variant, surface)
+        self.pinned.add(variant)
+        self.pinned_bytes += surface_bytes
+        return True
+
+    def create_variant(self, variant: ImageVariant) -> Surface:
+        image_key, size, flip = variant
+        if size is None:
+            return self.load_original(image_key)
+
+        surface = transform.scale(self.get_image(image_key), size)
+        if flip:
+            surface = transform.flip(surface, True, False)
+        return to_display_format(surface)
+
+    def store(self, key: CacheKey, cached: Any) -> None:
+        cached_bytes = get_resident_bytes(cached)
+        # An entry larger than the unpinned budget is handed out without caching instead of flushing everything else
+        if cached_bytes > self.budget_bytes - self.pinned_bytes: return
+
+        self.variants[key] = cached
+        self.resident_bytes += cached_bytes
+        while self.resident_bytes > self.budget_bytes:
+            evicted_key = next(resident for resident in self.variants if resident not in self.pinned)
+            self.resident_bytes -= get_resident_bytes(self.variants.pop(evicted_key))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self.variants.clear()
+        self.pinned.clear()
+        self.resident_bytes = 0
+        self.pinned_bytes = 0
+
+    def cache_info(self) -> ImageCacheInfo:
+        return ImageCacheInfo(self.hits, self.misses, self.evictions, self.resident_bytes, self.budget_bytes)
+
+    def memory_report(self) -> dict[ImageChoice, int]:
+        """Resident bytes per image, originals, scaled variants and what is derived from them together, largest first"""
+        report: dict[ImageChoice, int] = {}
+        for key, cached in self.variants.items():
+            report[key.image_key] = report.get(key.image_key, 0) + get_resident_bytes(cached)
+        return dict(sorted(report.items(), key=lambda item: item[1], reverse=True))
+
+
+class LazyImages(Mapping[ImageChoice, Surface]):
+    """Read-only view of the originals that loads each image through the asset manager when first accessed"""
+    def __init__(self, asset_manager: AssetManager) -> None:
+        self.asset_manager = asset_manager
+
+    def __getitem__(self, image_key: ImageChoice) -> Surface:
+        return self.asset_manager.get_image(image_key)
+
+    def __iter__(self) -> Iterator[ImageChoice]:
+        return iter(ImageChoice)
+
+    def __len__(self) -> int:
+        return len(ImageChoice)
+
+
+ASSETS = AssetManager()
+IMAGES = LazyImages(ASSETS)
@@ -0,0 +1,69 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+from typing import Iterable, Optional
+from pygame import Surface, image
+
+from assets.images import AssetManager, ImageChoice, ASSETS
+from settings import ASSET_LOADER_THREADS, ASSET_LOADING_SLICE_MS, IS_WEB_BUILD
+
+
+class AssetPreloader:
+    """
+    Loads the originals in the background while the loading screen is shown. On desktop the webp decoding runs
+    on a thread pool and step() only hands finished images to the asset manager. Under pygbag there are no
+    threads, so step() decodes images itself until its time slice is used up and then yields back to the loop.
+    Preloaded originals are pinned in the asset manager, so the loading screen cannot evict what it loaded.
+    Once they fill the preload budget the rest is skipped, and loaded on demand like any image requested early.
+    """
+    def __init__(self, asset_manager: AssetManager = ASSETS, image_keys: Iterable[ImageChoice] = ImageChoice, use_threads: bool = not IS_WEB_BUILD) -> None:
+        self.asset_manager = asset_manager
+        self.pending: list[ImageChoice] = list(image_keys)
+        self.total: int = len(self.pending)
+        self.loaded: int = 0
+        self.use_threads = use_threads
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.decoding: dict[ImageChoice, Future[Surface]] = {}
+
+    @property
+    def progress(self) -> float:
+        return self.loaded / self.total if self.pending else 1.
+
+    @property
+    def is_done(self) -> bool:
+        return not self.pending
+
+    def start_decoding(self) -> None:
+        """Baked images are only a memory map away, just the webp files go to the thread pool"""
+        self.executor = ThreadPoolExecutor(ASSET_LOADER_THREADS, thread_name_prefix="asset_loader")
+        for image_key in self.pending:
+            if not self.asset_manager.is_baked(image_key):
+                self.decoding[image_key] = self.executor.submit(image.load, image_key.value)
+        self.executor.shutdown(wait=False)
+
+    def load_next(self) -> None:
+        image_key = self.pending.pop(0)
+        future = self.decoding.pop(image_key, None)
+        if not self.asset_manager.preload(image_key, future.result() if future else None):
+            self.stop()
+            return
+        self.loaded += 1
+
+    def stop(self) -> None:
+        """The preload budget is full, images not decoded yet are left alone"""
+        self.pending.clear()
+        for future in self.decoding.values():
+            future.cancel()
+        self.decoding.clear()
+
+    def is_next_ready(self) -> bool:
+        future = self.decoding.get(self.pending[0])
+        return future is None or future.done()
+
+    def step(self, slice_ms: float = ASSET_LOADING_SLICE_MS) -> None:
+        if self.use_threads and not self.executor:
+            self.start_decoding()
+
+        slice_end = perf_counter() + slice_ms / 1000
+        while self.pending and perf_counter() < slice_end:
+            if self.use_threads and not self.is_next_ready(): return
+            self.load_next()
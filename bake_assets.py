@@ -0,0 +1,153 @@
+"""
+Asset bake step.
+
+Downscales every ImageChoice to the largest size the game ever draws it at and stores the decoded RGBA pixels
+in one indexed bundle, which the asset manager memory-maps at startup instead of decoding the webp files.
+Re-run it after changing any image. The game trusts the bundle without opening the webp files, --check lists
+images whose source changed size or modification time since the bake and exits with 1 if there are any.
+
+    python bake_assets.py
+    python bake_assets.py --check
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import sys
+from typing import Final
+
+import pygame
+
+from assets.images import ImageChoice, BakedBundle, BAKED_BUNDLE_PATH, BAKED_INDEX_PATH, BAKED_FORMAT_VERSION
+from settings import Vector, DISPLAY_WIDTH, DISPLAY_HEIGHT, DEFAULT_HOVER_SCALE_RATIO
+
+
+BUNDLE_ALIGNMENT: Final[int] = 16
+
+
+def get_max_drawn_sizes() -> dict[ImageChoice, Vector]:
+    """Largest size each image is scaled to anywhere in the game, images not listed here are kept at full size"""
+    from rules.character import Character
+    from components.character import TOOLTIP_WIDTH, TOOLTIP_HEIGHT, RANGE_ICON_WIDTH, HEALTH_ICON_SIZE, \
+        DAMAGE_ICON_SIZE
+    from components.character_slot import CharacterSlot, BUY_BUTTON_WIDTH, BUY_BUTTON_HEIGHT
+    from states.combat_state import CHARACTER_HOVER_SCALE_RATIO
+    from states.shop_state import FIGHT_BUTTON_SIZE, REROLL_BUTTON_SIZE, GOLD_ICON_SIZE, GOLD_BACK_WIDTH, GOLD_BACK_HEIGHT
+
+    character_scale_ratio = max(DEFAULT_HOVER_SCALE_RATIO, CHARACTER_HOVER_SCALE_RATIO)
+    character_size = (math.ceil(Character.width_pixels * character_scale_ratio), math.ceil(Character.height_pixels * character_scale_ratio))
+    slot_size = (max(CharacterSlot.width_pixels, RANGE_ICON_WIDTH), CharacterSlot.height_pixels)
+    tier_egg_size = (80, 80)
+    tier_icon_size = (30, 30)
+
+    sizes: dict[ImageChoice, Vector] = {
+        ImageChoice.BACKGROUND_COMBAT_JUNGLE:   (DISPLAY_WIDTH, DISPLAY_HEIGHT),
+        ImageChoice.BACKGROUND_SHOP_JUNGLE:     (DISPLAY_WIDTH, DISPLAY_HEIGHT),
+        ImageChoice.CHARACTER_TOOLTIP:          (TOOLTIP_WIDTH, TOOLTIP_HEIGHT),
+        ImageChoice.SLOT:                       slot_size,
+        ImageChoice.SLOT_HOVER:                 slot_size,
+        ImageChoice.COMBAT_TARGET:              character_size,
+        ImageChoice.HEALTH_ICON:                (HEALTH_ICON_SIZE, HEALTH_ICON_SIZE),
+        ImageChoice.DAMAGE_ICON:                (DAMAGE_ICON_SIZE, DAMAGE_ICON_SIZE),
+        ImageChoice.REROLL_BUTTON:              (REROLL_BUTTON_SIZE, REROLL_BUTTON_SIZE),
+        ImageChoice.FIGHT_BUTTON:               (FIGHT_BUTTON_SIZE, FIGHT_BUTTON_SIZE),
+        ImageChoice.BUY_BUTTON:                 (BUY_BUTTON_WIDTH, BUY_BUTTON_HEIGHT),
+        ImageChoice.GOLD_ICON:                  (GOLD_ICON_SIZE, GOLD_ICON_SIZE),
+        ImageChoice.GOLD_BACK:                  (GOLD_BACK_WIDTH, GOLD_BACK_HEIGHT),
+        ImageChoice.COMMON_TIER_EGG:            tier_egg_size,
+        ImageChoice.UNCOMMON_TIER_EGG:          tier_egg_size,
+        ImageChoice.RARE_TIER_EGG:              tier_egg_size,
+        ImageChoice.LEGENDARY_TIER_EGG:         tier_egg_size,
+        ImageChoice.COMMON_TIER_ICON:           tier_icon_size,
+        ImageChoice.UNCOMMON_TIER_ICON:         tier_icon_size,
+        ImageChoice.RARE_TIER_ICON:             tier_icon_size,
+        ImageChoice.LEGENDARY_TIER_ICON:        tier_icon_size,
+    }
+    for image_key in ImageChoice:
+        if image_key not in sizes and image_key.name.startswith("CHARACTER_"):
+            sizes[image_key] = character_size
+    return sizes
+
+
+def get_bake_size(original_size: Vector, max_drawn_size: Vector) -> Vector:
+    """Keep the aspect ratio and shrink only as far as both sides still cover the largest drawn size"""
+    ratio = min(1., max(max_drawn_size[0] / original_size[0], max_drawn_size[1] / original_size[1]))
+    return (math.ceil(original_size[0] * ratio), math.ceil(original_size[1] * ratio))
+
+
+def load_rgba(image_key: ImageChoice) -> pygame.Surface:
+    loaded = pygame.image.load(image_key.value)
+    rgba = pygame.Surface(loaded.get_size(), pygame.SRCALPHA, 32)
+    rgba.blit(loaded, (0, 0))
+    return rgba
+
+
+def bake(bundle_path: str = BAKED_BUNDLE_PATH, index_path: str = BAKED_INDEX_PATH) -> dict:
+    max_drawn_sizes = get_max_drawn_sizes()
+    os.makedirs(os.path.dirname(bundle_path), exist_ok=True)
+
+    images: dict[str, dict[str, int]] = {}
+    with open(bundle_path, "wb") as bundle_file:
+        for image_key in ImageChoice:
+            surface = load_rgba(image_key)
+            bake_size = get_bake_size(surface.get_size(), max_drawn_sizes.get(image_key, surface.get_size()))
+            if bake_size != surface.get_size():
+                surface = pygame.transform.smoothscale(surface, bake_size)
+
+            padding = -bundle_file.tell() % BUNDLE_ALIGNMENT
+            bundle_file.write(bytes(padding))
+            source_stat = os.stat(image_key.value)
+            images[image_key.name] = {
+                "offset":           bundle_file.tell(),
+                "width":            bake_size[0],
+                "height":           bake_size[1],
+                "source_bytes":     source_stat.st_size,
+                "source_mtime_ns":  source_stat.st_mtime_ns,
+            }
+            bundle_file.write(pygame.image.tobytes(surface, "RGBA"))
+
+    index = {"version": BAKED_FORMAT_VERSION, "images": images}
+    with open(index_path, "w") as index_file:
+        json.dump(index, index_file, indent=4)
+    return index
+
+
+def find_stale_images(bundle_path: str = BAKED_BUNDLE_PATH, index_path: str = BAKED_INDEX_PATH) -> list[ImageChoice]:
+    """Images missing from the bundle or whose webp changed size or modification time since the bake"""
+    bundle = BakedBundle.open(bundle_path, index_path)
+    if not bundle: return list(ImageChoice)
+    stale: list[ImageChoice] = []
+    for image_key in ImageChoice:
+        baked_image = bundle.images.get(image_key)
+        source_stat = os.stat(image_key.value)
+        if not baked_image or (source_stat.st_size, source_stat.st_mtime_ns) != (baked_image.source_bytes, baked_image.source_mtime_ns):
+            stale.append(image_key)
+    return stale
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bake all images into one pre-decoded, memory-mappable bundle")
+    parser.add_argument("--bundle", default=BAKED_BUNDLE_PATH)
+    parser.add_argument("--index", default=BAKED_INDEX_PATH)
+    parser.add_argument("--check", action="store_true", help="only list stale images, exit with 1 if there are any")
+    args = parser.parse_args()
+
+    if args.check:
+        stale = find_stale_images(args.bundle, args.index)
+        for image_key in stale:
+            print(f"stale: {image_key.value}")
+        return 1 if stale else 0
+
+    pygame.init()
+    index = bake(args.bundle, args.index)
+    pygame.quit()
+
+    bundle_bytes = os.path.getsize(args.bundle)
+    print(f"Baked {len(index['images'])} images into {args.bundle} ({bundle_bytes / 2**20:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,10 @@
 from core.input_listener import DeafInputListener, PygameInputListener
 from core.engine import PygameEngine
-from components.stages import StageEnemyGenerator
+from rules.stages import StageEnemyGenerator
 from states.shop_state import ShopState, ShopRenderer
 from states.preparation_state import PreparationState, PreparationRenderer
 from states.reward_state import RewardState, RewardRenderer
-from components.character_pool import Stabiraptor
+from rules.character_pool import Stabiraptor
 from components.character_slot import CharacterSlot, CombatSlot, BATTLE_SLOT_COLOR, ShopSlot
 from core.logger import logging
 logging.getLogger().setLevel(logging.DEBUG)
@@ -1,23 +1,24 @@
 from math import sqrt
-from dataclasses import dataclass
-from typing import Optional, Final, Self
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import NamedTuple, Optional, Final, Self
 from enum import Enum, auto
 import pygame
 from core.interfaces import UserInput
-from settings import Vector, BLUE_COLOR, GREEN_COLOR, BLACK_COLOR
+from settings import Vector, BLUE_COLOR, GREEN_COLOR, RED_COLOR, BLACK_COLOR
 
 
 CELL_PIXEL_SIZE: Final[int] = 30
+ROTATE_KEY: Final[int] = pygame.K_r
+MIRROR_KEY: Final[int] = pygame.K_f
 
 
-@dataclass
+@dataclass(frozen=True, order=True)
 class Point:
+    """Immutable, hashable and ordered, so chassis can look up their cells by point and shapes can be sorted"""
     x: int
     y: int
 
-    def __eq__(self, other) -> bool:
-        return self.x == other.x and self.y == other.y
-
     def __add__(self, other) -> "Point":
         return Point(self.x + other.x, self.y + other.y)
 
@@ -28,6 +29,69 @@ class Point:
         return sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2)
 
 
+class ShapeMask(NamedTuple):
+    """A shape as one bit per point, row after row of the given stride, starting at the shape's top left corner"""
+    corner: Point
+    width: int
+    height: int
+    bits: int
+
+
+@lru_cache(maxsize=None)
+def get_shape_mask(points: tuple[Point, ...], stride: int) -> ShapeMask:
+    corner = Point(min(point.x for point in points), min(point.y for point in points))
+    width = max(point.x for point in points) - corner.x + 1
+    height = max(point.y for point in points) - corner.y + 1
+    bits = 0
+    for point in points:
+        bits |= 1 << ((point.y - corner.y) * stride + point.x - corner.x)
+    return ShapeMask(corner, width, height, bits)
+
+
+def normalize_shape(points: tuple[Point, ...]) -> tuple[Point, ...]:
+    """The shape moved to start at (0, 0), sorted, so equal shapes compare equal wherever they are"""
+    corner = Point(min(point.x for point in points), min(point.y for point in points))
+    return tuple(sorted(Point(point.x - corner.x, point.y - corner.y) for point in points))
+
+
+class Orientations(NamedTuple):
+    """
+    The distinct orientations of a shape and which one a quarter turn or a mirror leads to. Orientations turn
+    and mirror around (0, 0), so the point held by the mouse stays under it.
+    """
+    shapes: tuple[tuple[Point, ...], ...]
+    rotated: tuple[int, ...]
+    mirrored: tuple[int, ...]
+
+
+@lru_cache(maxsize=None)
+def get_orientations(shape: tuple[Point, ...]) -> Orientations:
+    # Transform m * 4 + r mirrors x m times and then turns r quarters clockwise, mirroring a turned shape turns it back
+    transforms: list[tuple[Point, ...]] = []
+    for is_mirrored in (False, True):
+        points = tuple(Point(-point.x, point.y) for point in shape) if is_mirrored else shape
+        for _ in range(4):
+            transforms.append(points)
+            points = tuple(Point(-point.y, point.x) for point in points)
+
+    shapes: list[tuple[Point, ...]] = []
+    normalized_indices: dict[tuple[Point, ...], int] = {}
+    transform_indices: list[int] = []
+    for points in transforms:
+        normalized = normalize_shape(points)
+        if normalized not in normalized_indices:
+            normalized_indices[normalized] = len(shapes)
+            shapes.append(points)
+        transform_indices.append(normalized_indices[normalized])
+
+    rotated, mirrored = [0] * len(shapes), [0] * len(shapes)
+    for transform, index in enumerate(transform_indices):
+        mirror, turns = divmod(transform, 4)
+        rotated[index] = transform_indices[mirror * 4 + (turns + 1) % 4]
+        mirrored[index] = transform_indices[(1 - mirror) * 4 + -turns % 4]
+    return Orientations(tuple(shapes), tuple(rotated), tuple(mirrored))
+
+
 class ComponentRenderer:
     radius: int = CELL_PIXEL_SIZE//2
 
@@ -59,8 +123,9 @@ class ComponentRenderer:
 
 
 class Component:
-    def __init__(self, points: list[Point], render: ComponentRenderer, content = None) -> None:
-        self.points = points
+    def __init__(self, points: list[Point], render: ComponentRenderer, content = None, orientations: Optional[Orientations] = None) -> None:
+        self.orientations = orientations or get_orientations(tuple(points))
+        self.orientation: int = 0
         self.render = render
         self.attachment_point: Optional[Point] = None
         self.attachment_cells: list["Cell"] = []
@@ -83,6 +148,22 @@ class Component:
     def draw_on_mouse(self, frame: pygame.Surface, mouse_position: Vector) -> None:
         self.render.draw_on_mouse(frame, mouse_position, self)
 
+    @property
+    def shape(self) -> tuple[Point, ...]:
+        return self.orientations.shapes[self.orientation]
+
+    @property
+    def points(self) -> tuple[Point, ...]:
+        return self.shape
+
+    def rotate(self) -> None:
+        assert not self.attachment_cells
+        self.orientation = self.orientations.rotated[self.orientation]
+
+    def mirror(self) -> None:
+        assert not self.attachment_cells
+        self.orientation = self.orientations.mirrored[self.orientation]
+
 
 class CellRenderer:
     @staticmethod
@@ -95,16 +176,30 @@ class CellRenderer:
         box = get_cell_box(position, cell.point)
         pygame.draw.rect(frame, rect=box, color=GREEN_COLOR)
 
+    @staticmethod
+    def draw_preview(frame: pygame.Surface, position: Vector, footprint: "Footprint") -> None:
+        for point, is_free in footprint.points:
+            box = get_cell_box(position, point)
+            pygame.draw.rect(frame, rect=box, color=GREEN_COLOR if is_free else RED_COLOR, width=4)
+
 
 class CellHoverDetector:
     def __init__(self) -> None:
         self.is_hovered: bool = False
 
     def detect(self, origin_position: Vector, mouse_position: Vector, cell: "Cell") -> bool:
-        box = get_cell_box(origin_position, cell.point)
-        self.is_hovered = box.collidepoint(mouse_position)
+        self.is_hovered = get_cell_point(origin_position, mouse_position) == cell.point
         return self.is_hovered
 
+def get_cell_point(origin_position: Vector, pixel_position: Vector) -> Point:
+    """The point of the cell whose box contains the pixel, cells are centered on their point"""
+    origin_x, origin_y = origin_position
+    pixel_x, pixel_y = pixel_position
+    return Point(
+        int(pixel_x - origin_x + CELL_PIXEL_SIZE // 2) // CELL_PIXEL_SIZE,
+        int(pixel_y - origin_y + CELL_PIXEL_SIZE // 2) // CELL_PIXEL_SIZE
+    )
+
 def get_cell_box(origin_position: Vector, cell_point: Point) -> pygame.Rect:
     origin_x, origin_y = origin_position
     cell_position_x = origin_x + cell_point.x * CELL_PIXEL_SIZE - CELL_PIXEL_SIZE/2
@@ -146,85 +241,179 @@ class Cell:
 
 
 class ChassiRenderer:
+    """
+    Draws the grid and the placed components once into a surface covering the chassis' bounding box, each frame
+    blits it and only draws the hovered cell and component on top. The chassis invalidates it when its cells or
+    components change.
+    """
+    def __init__(self) -> None:
+        self.surface: Optional[pygame.Surface] = None
+
+    def invalidate(self) -> None:
+        self.surface = None
+
     @staticmethod
-    def draw(frame: pygame.Surface, chassi: "Chassi") -> None:
+    def get_surface_offset(chassi: "Chassi") -> Vector:
+        """Where the surface starts relative to the chassis position, at the top left corner of its top left cell"""
+        return (chassi.corner.x * CELL_PIXEL_SIZE - CELL_PIXEL_SIZE // 2, chassi.corner.y * CELL_PIXEL_SIZE - CELL_PIXEL_SIZE // 2)
+
+    def build(self, chassi: "Chassi") -> pygame.Surface:
+        surface = pygame.Surface((chassi.stride * CELL_PIXEL_SIZE, chassi.height * CELL_PIXEL_SIZE), pygame.SRCALPHA)
+        if pygame.display.get_surface():
+            surface = surface.convert_alpha()
+        offset_x, offset_y = self.get_surface_offset(chassi)
+        position = (-offset_x, -offset_y)
         for cell in chassi.cells:
-            cell.draw(frame, chassi.position)
-
+            cell.renderer.draw(surface, position, cell)
         for component in chassi.components:
-            component.draw(frame, chassi.position)
+            component.render.draw(surface, position, component)
+        return surface
+
+    def draw(self, frame: pygame.Surface, chassi: "Chassi") -> None:
+        if not self.surface:
+            self.surface = self.build(chassi)
+        offset_x, offset_y = self.get_surface_offset(chassi)
+        frame.blit(self.surface, (chassi.position[0] + offset_x, chassi.position[1] + offset_y))
+
+        hovered_cell = chassi.hovered_cell
+        if not (hovered_cell and hovered_cell.hover_detector.is_hovered): return
+        hovered_cell.renderer.draw_filled(frame, chassi.position, hovered_cell)
+        if hovered_cell.component:
+            hovered_cell.component.render.draw_highlight(frame, chassi.position, hovered_cell.component)
 
 
 class NoSpaceException(Exception):
     """Raised when attempting to insert a component into a cell where it cannot fit"""
     pass
 
+class Footprint(NamedTuple):
+    """The chassis points a component would cover when dropped on a target point, and whether each of them is free"""
+    points: list[tuple[Point, bool]]
+    is_fitting: bool
+
+NEIGHBOR_OFFSETS: Final[tuple[Point, ...]] = (Point(0, 0), Point(1, 0), Point(-1, 0), Point(0, 1), Point(0, -1))
+
+
 @dataclass
 class Chassi:
+    """
+    Cells are kept in drawing order and indexed by point, so lookups and hover don't depend on the chassis size.
+    The cells and the occupied cells are also kept as bitmasks over the chassis' bounding box, one row of
+    stride bits after the other, so whether a component fits somewhere is a shift and an AND.
+    """
     position: Vector
     cells: list[Cell]
     render: ChassiRenderer
     components: list[Component]
+    cell_map: dict[Point, Cell] = field(init=False, repr=False)
+    hovered_cell: Optional[Cell] = field(default=None, init=False, repr=False)
+    corner: Point = field(default=Point(0, 0), init=False, repr=False)
+    stride: int = field(default=0, init=False, repr=False)
+    height: int = field(default=0, init=False, repr=False)
+    cell_bits: int = field(default=0, init=False, repr=False)
+    occupied_bits: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.cell_map = {cell.point: cell for cell in self.cells}
+        self.update_bits()
+
+    def update_bits(self) -> None:
+        """Lay the masks out again, only needed when the bounding box may have changed"""
+        if not self.cells: return
+        self.corner = Point(min(cell.point.x for cell in self.cells), min(cell.point.y for cell in self.cells))
+        self.stride = max(cell.point.x for cell in self.cells) - self.corner.x + 1
+        self.height = max(cell.point.y for cell in self.cells) - self.corner.y + 1
+        self.cell_bits = self.occupied_bits = 0
+        for cell in self.cells:
+            self.cell_bits |= self.get_bit(cell.point)
+            if cell.component:
+                self.occupied_bits |= self.get_bit(cell.point)
+
+    def get_bit(self, point: Point) -> int:
+        return 1 << ((point.y - self.corner.y) * self.stride + point.x - self.corner.x)
+
+    def get_placement_bits(self, component: Component, target_point: Point) -> Optional[int]:
+        """The component's shape shifted onto the target point, None if it sticks out of the bounding box"""
+        shape_mask = get_shape_mask(component.shape, self.stride)
+        x = target_point.x + shape_mask.corner.x - self.corner.x
+        y = target_point.y + shape_mask.corner.y - self.corner.y
+        if x < 0 or y < 0 or x + shape_mask.width > self.stride or y + shape_mask.height > self.height:
+            return None
+        return shape_mask.bits << (y * self.stride + x)
+
+    def is_free(self, bits: int) -> bool:
+        return not bits & (self.occupied_bits | ~self.cell_bits)
+
+    def can_fit(self, component: Component, target_point: Point) -> bool:
+        placement_bits = self.get_placement_bits(component, target_point)
+        return placement_bits is not None and self.is_free(placement_bits)
+
+    def get_footprint(self, component: Component, target_point: Point) -> Footprint:
+        points: list[tuple[Point, bool]] = []
+        for component_point in component.points:
+            point = target_point + component_point
+            is_inside = 0 <= point.x - self.corner.x < self.stride and 0 <= point.y - self.corner.y < self.height
+            points.append((point, is_inside and self.is_free(self.get_bit(point))))
+        return Footprint(points, all(is_free for _, is_free in points))
 
     def add_cell(self, cell: Cell) -> None:
         assert not self.is_cell_occupied(cell)
         assert self.is_cell_adjacent(cell)
         self.cells.append(cell)
+        self.cell_map[cell.point] = cell
+        self.update_bits()
+        self.render.invalidate()
 
     def is_cell_occupied(self, cell: Cell) -> bool:
-        return cell in self.cells
+        return cell.point in self.cell_map
 
     def is_cell_adjacent(self, cell: Cell) -> bool:
-        for frame_cell in self.cells:
-            if frame_cell.point.distance(cell.point) <= 1:
-                return True
-        return False
+        return any(cell.point + offset in self.cell_map for offset in NEIGHBOR_OFFSETS)
 
     def get_cell(self, point: Point) -> Optional[Cell]:
-        for cell in self.cells:
-            if cell.point == point:
-                return cell
+        return self.cell_map.get(point)
 
     def get_hovered_cell(self, mouse_position: Vector) -> Optional[Cell]:
-        hover_cell: Optional[Cell] = None
-        for cell in self.cells:
-            if cell.is_hovered(self.position, mouse_position):
-                hover_cell = cell
-        return hover_cell
+        hovered_cell = self.get_cell(get_cell_point(self.position, mouse_position))
+        if hovered_cell is not self.hovered_cell:
+            if self.hovered_cell:
+                self.hovered_cell.hover_detector.is_hovered = False
+            if hovered_cell:
+                hovered_cell.hover_detector.is_hovered = True
+            self.hovered_cell = hovered_cell
+        return hovered_cell
 
     # CellCluster class from above methods?
 
     def add_component(self, target_cell: Cell, component: Component) -> None:
-        assert target_cell in self.cells
+        assert self.get_cell(target_cell.point) is target_cell
 
-        candidate_cells = []
-        for component_point in component.points:
-            frame_point = target_cell.point + component_point
-            frame_cell = self.get_cell(frame_point)
-            if not frame_cell: raise NoSpaceException(f"{component_point} does not exist in {self.cells}")
-            if not frame_cell.is_vacant: raise NoSpaceException(f"{frame_cell} is not vacant")
-            candidate_cells.append(frame_cell)
+        placement_bits = self.get_placement_bits(component, target_cell.point)
+        if placement_bits is None or not self.is_free(placement_bits):
+            raise NoSpaceException(f"{component.points} does not fit at {target_cell.point}")
 
+        candidate_cells = [self.cell_map[target_cell.point + component_point] for component_point in component.points]
         self.components.append(component)
         component.attach(target_cell.point, candidate_cells)
         for candidate_cell in candidate_cells:
             candidate_cell.set_content(component)
+        self.occupied_bits |= placement_bits
+        self.render.invalidate()
 
     def remove_component(self, component: Component) -> None:
-        for cell in self.cells:
-            if cell.component == component:
-                cell.clear()
+        for cell in component.attachment_cells:
+            cell.clear()
+            self.occupied_bits &= ~self.get_bit(cell.point)
         self.components.remove(component)
         component.deattach()
+        self.render.invalidate()
 
     def draw(self, frame: pygame.Surface) -> None:
         self.render.draw(frame, self)
 
     def get_hovered_component(self, mouse_position: Vector) -> Optional[Component]:
         hovered_cell = self.get_hovered_cell(mouse_position)
-        for component in self.components:
-            if hovered_cell in component.attachment_cells:
-                return component
+        return hovered_cell.component if hovered_cell else None
 
     @classmethod # Not really necessary anymore
     def create_empty(cls, position: Vector, cells: list[Cell]) -> Self:
@@ -245,6 +434,9 @@ class ComponentDragDropper:
         self.detached: Optional[Component] = None
         self.previous_attached_cell: Optional[Cell] = None
         self.previous_attached_chassi: Optional[Chassi] = None
+        self.previous_orientation: int = 0
+        self.preview_chassi: Optional[Chassi] = None
+        self.preview: Optional[Footprint] = None
 
     def loop(self, user_input: UserInput) -> None:
         self.mouse_position = user_input.mouse_position # Just to avoid passing user_input to renderer...
@@ -270,6 +462,7 @@ class ComponentDragDropper:
         assert hovered_chassi and hovered_component.attachment_point
         self.previous_attached_cell = hovered_chassi.get_cell(hovered_component.attachment_point)
         self.previous_attached_chassi = hovered_chassi
+        self.previous_orientation = hovered_component.orientation
 
         hovered_chassi.remove_component(hovered_component)
         self.detached = hovered_component
@@ -283,23 +476,29 @@ class ComponentDragDropper:
             hovered_cell = chassi.get_hovered_cell(user_input.mouse_position)
             if hovered_cell: break
 
-        if not user_input.is_mouse1_up:
-            return
+        assert self.detached
+        if ROTATE_KEY in user_input.keys_down:
+            self.detached.rotate()
+        if MIRROR_KEY in user_input.keys_down:
+            self.detached.mirror()
+
+        if hovered_cell and hovered_chassi:
+            self.preview_chassi = hovered_chassi
+            self.preview = hovered_chassi.get_footprint(self.detached, hovered_cell.point)
+        else:
+            self.preview_chassi = self.preview = None
 
-        if not hovered_cell:
-            assert self.previous_attached_cell and self.previous_attached_chassi and self.detached
-            self.previous_attached_chassi.add_component(self.previous_attached_cell, self.detached)
-            self.state = DragdropperState.HOVERING
+        if not user_input.is_mouse1_up:
             return
 
-        assert hovered_chassi and self.detached
         self.state = DragdropperState.HOVERING
-
-        try:
+        if hovered_cell and hovered_chassi and hovered_chassi.can_fit(self.detached, hovered_cell.point):
             hovered_chassi.add_component(hovered_cell, self.detached)
-        except NoSpaceException:
-            assert self.previous_attached_cell and self.previous_attached_chassi and self.detached
+        else:
+            assert self.previous_attached_cell and self.previous_attached_chassi
+            self.detached.orientation = self.previous_orientation
             self.previous_attached_chassi.add_component(self.previous_attached_cell, self.detached)
+        self.preview_chassi = self.preview = None
 
     def draw(self, frame: pygame.Surface) -> None:
 
@@ -309,6 +508,9 @@ class ComponentDragDropper:
         if not self.state == DragdropperState.DRAGGING:
             return
 
+        if self.preview_chassi and self.preview:
+            CellRenderer.draw_preview(frame, self.preview_chassi.position, self.preview)
+
         assert self.detached
         self.detached.draw_on_mouse(frame, self.mouse_position)
 
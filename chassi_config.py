@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+from typing import Any, Final, NamedTuple, Optional
+
+import chassi
+from chassi import Cell, Chassi, Component, ComponentRenderer, Orientations, Point, ShapeMask, get_orientations, get_shape_mask
+from settings import Vector
+
+
+CHASSIS_CONFIG_PATH: Final[str] = "config/chassis.json"
+COMPONENTS_CONFIG_PATH: Final[str] = "config/components.json"
+CONFIG_CACHE_PATH: Final[str] = "config/compiled/config.pickle"
+CONFIG_FORMAT_VERSION: Final[int] = 1
+COMPONENT_TYPES: Final[frozenset[str]] = frozenset(("weapon", "shield", "booster", "plating"))
+
+
+class ConfigError(Exception):
+    """Raised when a chassis or component config is malformed"""
+    pass
+
+
+class ChassiConfig(NamedTuple):
+    points: tuple[Point, ...]
+    mask: ShapeMask
+
+    def create(self, position: Vector) -> Chassi:
+        return Chassi.create_empty(position, [Cell.create(point) for point in self.points])
+
+
+class ComponentConfig(NamedTuple):
+    name: str
+    type: str
+    points: tuple[Point, ...]
+    mask: ShapeMask
+    orientations: Orientations
+
+    def create(self) -> Component:
+        return Component(list(self.points), ComponentRenderer(), orientations=self.orientations)
+
+
+class CompiledConfig(NamedTuple):
+    chassis: tuple[ChassiConfig, ...]
+    components: tuple[ComponentConfig, ...]
+
+
+def parse_shape(coordinates: Any, where: str) -> tuple[Point, ...]:
+    """A non-empty list of unique [x, y] integer pairs, connected through their edges"""
+    if not isinstance(coordinates, list) or not coordinates:
+        raise ConfigError(f"{where}: coordinates must be a non-empty list")
+    points: list[Point] = []
+    seen: set[Point] = set()
+    for coordinate in coordinates:
+        if not (isinstance(coordinate, list) and len(coordinate) == 2 and all(type(value) is int for value in coordinate)):
+            raise ConfigError(f"{where}: {coordinate!r} is not an [x, y] pair of integers")
+        point = Point(*coordinate)
+        if point in seen: raise ConfigError(f"{where}: {coordinate} appears twice")
+        seen.add(point)
+        points.append(point)
+
+    connected = {points[0]}
+    frontier = [points[0]]
+    while frontier:
+        point = frontier.pop()
+        for neighbor in (Point(point.x + 1, point.y), Point(point.x - 1, point.y), Point(point.x, point.y + 1), Point(point.x, point.y - 1)):
+            if neighbor in seen and neighbor not in connected:
+                connected.add(neighbor)
+                frontier.append(neighbor)
+    if len(connected) != len(points):
+        raise ConfigError(f"{where}: {[point for point in points if point not in connected]} are not connected to {points[0]}")
+    return tuple(points)
+
+
+def compile_shape(points: tuple[Point, ...]) -> ShapeMask:
+    """Laid out with the shape's own width as stride"""
+    width = max(point.x for point in points) - min(point.x for point in points) + 1
+    return get_shape_mask(points, width)
+
+
+def compile_config(chassis_data: Any, components_data: Any) -> CompiledConfig:
+    if not (isinstance(chassis_data, dict) and isinstance(chassis_data.get("chassis"), list)):
+        raise ConfigError("chassis config must be an object with a \"chassis\" list")
+    if not isinstance(components_data, list):
+        raise ConfigError("components config must be a list")
+
+    chassis: list[ChassiConfig] = []
+    for index, chassi_data in enumerate(chassis_data["chassis"]):
+        if not isinstance(chassi_data, dict): raise ConfigError(f"chassis {index}: must be an object")
+        points = parse_shape(chassi_data.get("coordinates"), f"chassis {index}")
+        chassis.append(ChassiConfig(points, compile_shape(points)))
+
+    components: list[ComponentConfig] = []
+    for index, component_data in enumerate(components_data):
+        if not isinstance(component_data, dict): raise ConfigError(f"component {index}: must be an object")
+        name, component_type = component_data.get("name"), component_data.get("type")
+        if not isinstance(name, str) or not name: raise ConfigError(f"component {index}: needs a name")
+        if component_type not in COMPONENT_TYPES:
+            raise ConfigError(f"component {name}: unknown type {component_type!r}, expected one of {sorted(COMPONENT_TYPES)}")
+        points = parse_shape(component_data.get("coordinates"), f"component {name}")
+        if Point(0, 0) not in points:
+            raise ConfigError(f"component {name}: coordinates must contain [0, 0], the point it is held and placed by")
+        components.append(ComponentConfig(name, component_type, points, compile_shape(points), get_orientations(points)))
+
+    return CompiledConfig(tuple(chassis), tuple(components))
+
+
+def parse_json(source: bytes, path: str) -> Any:
+    try:
+        return json.loads(source)
+    except json.JSONDecodeError as error:
+        raise ConfigError(f"{path} is not valid JSON: {error}") from error
+
+
+def get_code_sources() -> tuple[bytes, ...]:
+    """The modules that compile and define the cached shapes, changing them makes the cache stale as well"""
+    sources: list[bytes] = []
+    for module_path in (chassi.__file__, __file__):
+        with open(module_path, "rb") as file:
+            sources.append(file.read())
+    return tuple(sources)
+
+
+def get_config_key(*sources: bytes) -> str:
+    digest = hashlib.sha256(str(CONFIG_FORMAT_VERSION).encode())
+    for source in sources + get_code_sources():
+        digest.update(hashlib.sha256(source).digest())
+    return digest.hexdigest()
+
+
+def read_cached_config(cache_path: str, key: str) -> Optional[CompiledConfig]:
+    if not os.path.exists(cache_path): return None
+    try:
+        with open(cache_path, "rb") as file:
+            cached_key, config = pickle.load(file)
+    except Exception as error:  # A cache written by other code can fail in any way, it is rebuilt either way
+        logging.warning(f"Ignoring {cache_path}, it could not be read: {error}")
+        return None
+    return config if cached_key == key else None
+
+
+def write_cached_config(cache_path: str, key: str, config: CompiledConfig) -> None:
+    """Written next to the old cache and swapped in, a cache that cannot be written is only a slower next start"""
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        temporary_path = f"{cache_path}.tmp"
+        with open(temporary_path, "wb") as file:
+            pickle.dump((key, config), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+    except OSError as error:
+        logging.warning(f"Could not cache the compiled config in {cache_path}: {error}")
+
+
+def load_config(chassis_path: str = CHASSIS_CONFIG_PATH, components_path: str = COMPONENTS_CONFIG_PATH, cache_path: str = CONFIG_CACHE_PATH) -> CompiledConfig:
+    """
+    Validates and compiles the chassis and component configs, raising ConfigError on bad data. The compiled result
+    is cached on disk under a hash of both files and of the code compiling them, so unchanged configs are loaded without parsing or validating.
+    """
+    with open(chassis_path, "rb") as file:
+        chassis_source = file.read()
+    with open(components_path, "rb") as file:
+        components_source = file.read()
+
+    key = get_config_key(chassis_source, components_source)
+    config = read_cached_config(cache_path, key)
+    if config: return config
+
+    config = compile_config(parse_json(chassis_source, chassis_path), parse_json(components_source, components_path))
+    write_cached_config(cache_path, key, config)
+    return config
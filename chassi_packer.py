@@ -0,0 +1,202 @@
+from collections import OrderedDict
+from functools import lru_cache
+from time import perf_counter
+from typing import Final, NamedTuple, Optional, Sequence
+
+from chassi import Chassi, Component, ComponentDragDropper, DragdropperState, Point, get_shape_mask
+from core.interfaces import UserInput
+from settings import GAME_FPS
+
+
+AUTO_PACK_TIME_LIMIT_MS: Final[float] = 1000 / GAME_FPS / 2     # Half a frame, so packing never drops one
+SOLVED_PACKINGS_SIZE: Final[int] = 32
+
+
+class ChassiLayout(NamedTuple):
+    """The part of a chassis the packer needs, hashable so results can be cached per layout"""
+    corner: Point
+    stride: int
+    height: int
+    cell_bits: int
+    occupied_bits: int
+
+    @classmethod
+    def from_chassi(cls, chassi: Chassi) -> "ChassiLayout":
+        return cls(chassi.corner, chassi.stride, chassi.height, chassi.cell_bits, chassi.occupied_bits)
+
+
+class Placement(NamedTuple):
+    component_index: int
+    chassi_index: int
+    target_point: Point
+
+
+class PackResult(NamedTuple):
+    placements: tuple[Placement, ...]
+    value: float
+    is_complete: bool   # The search ran to the end, so no packing is worth more
+
+
+class PlacementOption(NamedTuple):
+    chassi_index: int
+    bits: int
+    target_point: Point
+
+
+def get_candidate_options(shape: tuple[Point, ...], layout: ChassiLayout, chassi_index: int) -> tuple[PlacementOption, ...]:
+    """Every placement of the shape that lies on cells of the chassis, whether they are occupied is left to the search"""
+    return get_grid_options(shape, layout.corner, layout.stride, layout.height, layout.cell_bits, chassi_index)
+
+
+@lru_cache(maxsize=None)
+def get_grid_options(shape: tuple[Point, ...], corner: Point, stride: int, height: int, cell_bits: int, chassi_index: int) -> tuple[PlacementOption, ...]:
+    """Cached without the occupancy, which changes with every move, so entries are only added for new chassis"""
+    shape_mask = get_shape_mask(shape, stride)
+    options: list[PlacementOption] = []
+    for y in range(height - shape_mask.height + 1):
+        for x in range(stride - shape_mask.width + 1):
+            bits = shape_mask.bits << (y * stride + x)
+            if bits & ~cell_bits: continue
+            target_point = Point(corner.x + x - shape_mask.corner.x, corner.y + y - shape_mask.corner.y)
+            options.append(PlacementOption(chassi_index, bits, target_point))
+    return tuple(options)
+
+
+class PackSearch:
+    """
+    Branch and bound over the components, most valuable first: each one is either placed at one of its options or
+    left out. Occupancy is one bitmask per chassis, so trying an option is an AND. States reached before with at
+    least the same value are not searched again. Identical components are only placed in increasing option order
+    and skipping one skips the rest, chassis with the same layout and occupancy are only tried once.
+    """
+    def __init__(self, shapes: Sequence[tuple[Point, ...]], values: Sequence[float], layouts: Sequence[ChassiLayout], deadline: float) -> None:
+        self.order = sorted(range(len(shapes)), key=lambda index: (-values[index], -len(shapes[index]), shapes[index]))
+        self.shapes = [shapes[index] for index in self.order]
+        self.values = [values[index] for index in self.order]
+        self.options = [
+            sum((get_candidate_options(shape, layout, chassi_index) for chassi_index, layout in enumerate(layouts)), ())
+            for shape in self.shapes
+        ]
+        self.twins = [self.get_twin(layouts, chassi_index) for chassi_index in range(len(layouts))]
+        self.is_same_as_previous = [
+            index > 0 and (self.shapes[index], self.values[index]) == (self.shapes[index - 1], self.values[index - 1])
+            for index in range(len(self.shapes))
+        ]
+        self.remaining_values = [sum(self.values[index:]) for index in range(len(self.values) + 1)]
+        self.deadline = deadline
+
+        self.best_value: float = 0
+        self.best_path: tuple[tuple[int, PlacementOption], ...] = ()
+        self.seen: dict[tuple[int, tuple[int, ...], int], float] = {}
+        self.has_packing = False     # The first descent places greedily, it always finishes so there is a result
+        self.is_timed_out = False
+
+    @staticmethod
+    def get_twin(layouts: Sequence[ChassiLayout], chassi_index: int) -> Optional[int]:
+        layout = layouts[chassi_index]
+        for index in range(chassi_index):
+            if (layouts[index].stride, layouts[index].height, layouts[index].cell_bits) == (layout.stride, layout.height, layout.cell_bits):
+                return index
+        return None
+
+    def get_group_end(self, index: int) -> int:
+        index += 1
+        while index < len(self.shapes) and self.is_same_as_previous[index]:
+            index += 1
+        return index
+
+    def search(self, index: int, occupied: tuple[int, ...], value: float, min_option: int, path: tuple[tuple[int, PlacementOption], ...]) -> None:
+        if value > self.best_value:
+            self.best_value, self.best_path = value, path
+        if index == len(self.shapes):
+            self.has_packing = True
+            return
+        if value + self.remaining_values[index] <= self.best_value:
+            return
+        if self.has_packing and perf_counter() > self.deadline:
+            self.is_timed_out = True
+            return
+
+        state = (index, occupied, min_option)
+        if self.seen.get(state, -1) >= value: return
+        self.seen[state] = value
+
+        for option_index in range(min_option, len(self.options[index])):
+            option = self.options[index][option_index]
+            if option.bits & occupied[option.chassi_index]: continue
+            twin = self.twins[option.chassi_index]
+            if twin is not None and occupied[twin] == occupied[option.chassi_index]: continue
+
+            placed = occupied[:option.chassi_index] + (occupied[option.chassi_index] | option.bits,) + occupied[option.chassi_index + 1:]
+            next_min_option = option_index + 1 if index + 1 < len(self.shapes) and self.is_same_as_previous[index + 1] else 0
+            self.search(index + 1, placed, value + self.values[index], next_min_option, path + ((index, option),))
+            if self.is_timed_out: return
+
+        self.search(self.get_group_end(index), occupied, value, 0, path)
+
+    def run(self, occupied: tuple[int, ...]) -> PackResult:
+        self.search(0, occupied, 0, 0, ())
+        placements = tuple(sorted(
+            Placement(self.order[index], option.chassi_index, option.target_point) for index, option in self.best_path
+        ))
+        return PackResult(placements, self.best_value, not self.is_timed_out)
+
+
+PackingKey = tuple[tuple[tuple[Point, ...], ...], tuple[float, ...], tuple[ChassiLayout, ...]]
+solved_packings: OrderedDict[PackingKey, PackResult] = OrderedDict()
+
+
+def solve_packing(shapes: tuple[tuple[Point, ...], ...], values: tuple[float, ...], layouts: tuple[ChassiLayout, ...], time_limit_ms: float) -> PackResult:
+    """
+    Complete packings are cached per inventory and chassis occupancy, so packing the same inventory again costs
+    nothing. A search cut short by the time limit is not cached, the next try may get further.
+    """
+    key = (shapes, values, layouts)
+    result = solved_packings.get(key)
+    if result:
+        solved_packings.move_to_end(key)
+        return result
+
+    search = PackSearch(shapes, values, layouts, perf_counter() + time_limit_ms / 1000)
+    result = search.run(tuple(layout.occupied_bits for layout in layouts))
+    if result.is_complete:
+        solved_packings[key] = result
+        if len(solved_packings) > SOLVED_PACKINGS_SIZE:
+            solved_packings.popitem(last=False)
+    return result
+
+
+def auto_pack(chassis: Sequence[Chassi], components: Sequence[Component], values: Optional[Sequence[float]] = None, time_limit_ms: float = AUTO_PACK_TIME_LIMIT_MS) -> PackResult:
+    """
+    Finds where to put the components around what the chassis already hold, worth the most value in total, by default
+    as many components as possible. Nothing is moved, the placements index into the given sequences.
+    """
+    shapes = tuple(component.shape for component in components)
+    component_values = tuple(values) if values is not None else (1.,) * len(components)
+    layouts = tuple(ChassiLayout.from_chassi(chassi) for chassi in chassis)
+    return solve_packing(shapes, component_values, layouts, time_limit_ms)
+
+
+class AutoPackDragDropper(ComponentDragDropper):
+    """Drag and drop, and the space key packs everything from the source chassis into the target chassis"""
+    def __init__(self, chassis: list[Chassi], source_chassi: Chassi, target_chassis: list[Chassi]) -> None:
+        super().__init__(chassis)
+        self.source_chassi = source_chassi
+        self.target_chassis = target_chassis
+
+    def loop(self, user_input: UserInput) -> None:
+        if self.state == DragdropperState.HOVERING and user_input.is_space_key_down:
+            self.pack_source()
+        super().loop(user_input)
+
+    def pack_source(self) -> PackResult:
+        components = list(self.source_chassi.components)
+        result = auto_pack(self.target_chassis, components)
+        for placement in result.placements:
+            component = components[placement.component_index]
+            target_chassi = self.target_chassis[placement.chassi_index]
+            target_cell = target_chassi.get_cell(placement.target_point)
+            assert target_cell
+            self.source_chassi.remove_component(component)
+            target_chassi.add_component(target_cell, component)
+        return result
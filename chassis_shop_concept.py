@@ -1,30 +1,14 @@
-import json
 import random
 from core.input_listener import PygameInputListener
 from core.renderer import PygameRenderer
 from core.engine import PygameEngine
-from chassi import (
-    Cell,
-    Point,
-    Chassi,
-    Component,
-    ComponentRenderer,
-    ComponentDragDropper,
-)
+from chassi import Cell, Point, Chassi
+from chassi_config import load_config
+from chassi_packer import AutoPackDragDropper
 import pygame
 
-# Define the file path
-chassis_path = "./config/chassis.json"
-component_path = "./config/components.json"
-
-# Read the JSON files
-with open(chassis_path, "r") as f:
-    data = json.load(f)
-    chassis_options = data["chassis"]
-
-with open(component_path, "r") as f:
-    data = json.load(f)
-    component_options = data
+# Validated and compiled, from the on-disk cache when the configs did not change
+config = load_config()
 
 # Special "shop" and "toolbox" chassis
 shop_width = 20
@@ -35,27 +19,24 @@ toolbox_height = 4
 shop_cells = [Cell.create(Point(x, y)) for y in range(shop_height) for x in range(shop_width)]
 toolbox_cells = [Cell.create(Point(x, y)) for y in range(toolbox_height) for x in range(toolbox_width)]
 
-shop_selection = random.sample(component_options, 4)
+shop_selection = random.sample(config.components, 4)
 shop_chassi = Chassi.create_empty((100, 40), shop_cells)
 
 shop_loc = 0
-for component_data in shop_selection:
-    component_cells = [Point(x, y) for x, y in component_data["coordinates"]]
-    component = Component(component_cells, ComponentRenderer())
-    shop_chassi.add_component(shop_cells[shop_loc], component)
+for component_config in shop_selection:
+    shop_chassi.add_component(shop_cells[shop_loc], component_config.create())
     shop_loc += 5
 
-chassi_selection = random.sample(chassis_options, 2)
+chassi_selection = random.sample(config.chassis, 2)
 chassi_loc_x = 300
 chassis = []
 
-for chassi_data in chassi_selection:
-    chassi_cells = [Cell.create(Point(x, y)) for x, y in chassi_data["coordinates"]]
-    chassis.append(Chassi.create_empty((chassi_loc_x, 250), chassi_cells))
+for chassi_config in chassi_selection:
+    chassis.append(chassi_config.create((chassi_loc_x, 250)))
     chassi_loc_x += 100
 
 toolbox_chassi = Chassi.create_empty((300, 450), toolbox_cells)
-drag_dropper = ComponentDragDropper([shop_chassi, toolbox_chassi] + chassis)
+drag_dropper = AutoPackDragDropper([shop_chassi, toolbox_chassi] + chassis, toolbox_chassi, chassis)
 
 class MockRenderer(PygameRenderer):
     def __init__(self):
@@ -73,7 +54,7 @@ class MockRenderer(PygameRenderer):
 
         # Draw labels for the shop, toolbox, and chassis
         self.draw_label("Shop", (20, 50))
-        self.draw_label("Toolbox", (300, 420))
+        self.draw_label("Toolbox (space to auto-pack, r/f to rotate/mirror while dragging)", (300, 420))
         self.draw_label("Unit 1", (300, 200))  # Adjust based on chassis coordinates
         self.draw_label("Unit 2", (400, 200))  # Adjust as needed
 
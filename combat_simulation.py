@@ -3,7 +3,7 @@ from core.input_listener import PygameInputListener
 from core.engine import PygameEngine
 from core.renderer import PygameRenderer
 from core.state_machine import StateMachine, State, StateChoice
-from components.character_pool import *
+from rules.character_pool import *
 from components.character_slot import CharacterSlot, CombatSlot, create_shop_slots, ShopSlot, create_trash_slot, \
     create_reward_slots
 from states.combat_state import CombatState
@@ -11,7 +11,7 @@ from states.preparation_state import PreparationState
 from states.reward_state import RewardState
 from states.shop_state import ShopState
 from states.game import create_ally_slots, create_enemy_slots, create_bench_slots, GameRenderer
-from components.stages import StageEnemyGenerator
+from rules.stages import StageEnemyGenerator
 
 logging.getLogger().setLevel(logging.DEBUG)
 
@@ -1,9 +1,10 @@
-from pygame import Surface, Rect, transform
-from typing import Final, Optional
-from components.interactable import Interactable,Button
-from components.character import Character
-from settings import Color, Vector, BLACK_COLOR, DISPLAY_WIDTH
-from assets.images import ImageChoice, IMAGES
+from pygame import Surface, Rect
+from typing import Final, Optional, Sequence
+from components.interactable import Interactable, Button, is_opaque_at
+from components.character import get_scaled_image
+from rules.character import Character
+from settings import Color, Vector, BLACK_COLOR, DISPLAY_WIDTH, PIXEL_PERFECT_HOVER
+from assets.images import ImageChoice, ImageVariant, ASSETS
 
 SCREEN_CENTER: Final[int] = round(DISPLAY_WIDTH / 2)
 BATTLE_SLOT_COLOR: Final[Color] = (57, 122, 65)
@@ -27,7 +28,6 @@ REWARD_SLOT_NR: Final[int] = 2
 
 BUY_BUTTON_WIDTH = 70
 BUY_BUTTON_HEIGHT = 55
-buy_button_image = transform.scale(IMAGES[ImageChoice.BUY_BUTTON], (BUY_BUTTON_WIDTH, BUY_BUTTON_HEIGHT))
 
 
 class CharacterSlot(Interactable):
@@ -35,10 +35,32 @@ class CharacterSlot(Interactable):
     height_pixels: int = 50
     _content: Optional[Character] = None
     
-    def __init__(self, position: Vector, color: Color) -> None:
+    def __init__(self, position: Vector, color: Color, is_enemy: bool = False) -> None:
         super().__init__(position)
         self._position = position
         self.color = color
+        self.is_enemy = is_enemy
+
+    def get_art_rect(self, size: Vector) -> Rect:
+        """Where the character art of this size stands on the slot, at rest"""
+        art_rect = Rect((0, 0), size)
+        art_rect.midbottom = self.center_coordinate
+        return art_rect
+
+    def is_hit(self, mouse_position: Vector) -> bool:
+        """The slot itself, or with pixel perfect hover also the opaque pixels of the character standing on it"""
+        if super().is_hit(mouse_position): return True
+        if not (PIXEL_PERFECT_HOVER and self.content): return False
+
+        image_key = self.content.corpse_image if self.content.is_dead() else self.content.character_image
+        art_rect = self.get_art_rect((self.content.width_pixels, self.content.height_pixels))
+        if not art_rect.collidepoint(mouse_position): return False
+        return is_opaque_at(ASSETS.get_mask(image_key, art_rect.size, self.is_enemy), art_rect.topleft, mouse_position)
+
+    def get_hit_bounds(self) -> Rect:
+        bounds = super().get_hit_bounds()
+        if not PIXEL_PERFECT_HOVER: return bounds
+        return bounds.union(self.get_art_rect((Character.width_pixels, Character.height_pixels)))
 
     @property
     def content(self):
@@ -47,19 +69,20 @@ class CharacterSlot(Interactable):
     @content.setter
     def content(self, character: Optional[Character]):
         self._content = character
+        self.invalidate_hover()    # The character art is part of the hit area
 
 
 class CombatSlot(CharacterSlot):
 
-    def __init__(self, position: Vector, coordinate: int, color: Color) -> None:
+    def __init__(self, position: Vector, coordinate: int, color: Color, is_enemy: bool = False) -> None:
         self.coordinate = coordinate
-        super().__init__(position, color)
+        super().__init__(position, color, is_enemy)
 
 class ShopSlot(CharacterSlot):
 
     def __init__(self, position: Vector, color: Color) -> None:
         super().__init__(position, color)
-        self.buy_button = Button((position[0], position[1] -130), "Buy", buy_button_image)
+        self.buy_button = Button((position[0], position[1] -130), "Buy", ImageVariant(ImageChoice.BUY_BUTTON, (BUY_BUTTON_WIDTH, BUY_BUTTON_HEIGHT)))
 
 
 def create_ally_slots() -> list[CombatSlot]:
@@ -78,7 +101,7 @@ def create_enemy_slots() -> list[CombatSlot]:
     for slot_nr in range(NR_BATTLE_SLOTS_PER_TEAM):
         position_x = first_slot_position + slot_nr * (DISTANCE_BETWEEN_SLOTS + CharacterSlot.width_pixels)
         coordinate = slot_nr + 1 + NR_BATTLE_SLOTS_PER_TEAM
-        slots.append(CombatSlot((position_x, SLOT_HEIGHT), coordinate, BATTLE_SLOT_COLOR))
+        slots.append(CombatSlot((position_x, SLOT_HEIGHT), coordinate, BATTLE_SLOT_COLOR, is_enemy=True))
     return slots
 
 
@@ -124,13 +147,17 @@ def create_reward_slots() -> list[ShopSlot]:
     return slots
 
 
+def get_slot_layout(slots: Sequence[CharacterSlot]) -> tuple[tuple[Vector, Vector], ...]:
+    return tuple((slot.position, slot.size) for slot in slots)
+
+
+def draw_idle_slot(frame: Surface, character_slot: CharacterSlot) -> None:
+    slot_image = get_scaled_image(ImageChoice.SLOT, character_slot.size)
+    frame.blit(slot_image, character_slot.position)
+
+
 def draw_slot(frame: Surface, character_slot: CharacterSlot) -> None:
-    slot_rect = Rect(character_slot.position, character_slot.size)
-
-    if character_slot.is_hovered:
-        slot_image = IMAGES[ImageChoice.SLOT_HOVER].convert_alpha()
-        slot_image = transform.scale(slot_image, slot_rect.size)
-    else:
-        slot_image = IMAGES[ImageChoice.SLOT].convert_alpha()
-        slot_image = transform.scale(slot_image, slot_rect.size)
-    frame.blit(slot_image, slot_rect.topleft)
+    image_key = ImageChoice.SLOT_HOVER if character_slot.is_hovered else ImageChoice.SLOT
+    slot_image = get_scaled_image(image_key, character_slot.size)
+    frame.blit(slot_image, character_slot.position)
+
@@ -1,10 +1,8 @@
 from typing import Optional
 import logging
-import pygame
-from components.character_slot import CharacterSlot, ShopSlot, draw_slot
-from components.character import draw_character
+from components.character_slot import CharacterSlot, ShopSlot
 from core.interfaces import UserInput, Loopable
-from settings import Vector, DEFAULT_HOVER_SCALE_RATIO
+from settings import Vector
 
 
 def switch_slots(slot_a: CharacterSlot, slot_b: CharacterSlot) -> None:
@@ -18,7 +16,8 @@ def switch_slots(slot_a: CharacterSlot, slot_b: CharacterSlot) -> None:
 
 class DragDropper(Loopable):
     """
-    Governs the nasty logic needed to drag-drop characters between slots
+    Governs the nasty logic needed to drag-drop characters between slots.
+    The hover state of the slots is resolved by the owning state's InteractionManager.
     """
     def __init__(self, slots: list[CharacterSlot], shop_state: "ShopState" = None) -> None:
         self.slots = slots
@@ -39,9 +38,6 @@ class DragDropper(Loopable):
     def loop(self, user_input: UserInput) -> None:
         self._mouse_position = user_input.mouse_position # Stored to be able to draw later...
 
-        for slot in self.slots:
-            slot.refresh(user_input.mouse_position)
-
         hover_slot: Optional[CharacterSlot] = self.get_hover_slot()
 
         if self.detached_slot:
@@ -61,52 +57,3 @@ class DragDropper(Loopable):
                 if not hover_slot.content:
                     return
                 self.detached_slot = hover_slot
-
-
-def draw_drag_dropper(frame: pygame.Surface, drag_dropper: DragDropper) -> None:
-
-        # Draw the slots first
-        for slot in drag_dropper.slots:
-            draw_slot(frame, slot)
-
-
-        # Draw characters on top of slots, except for the hovered slot
-        hovered_slot = None
-        for slot in drag_dropper.slots:
-            if not slot.content:
-                continue
-
-            if slot.is_hovered:
-                hovered_slot = slot  # Save the hovered slot for later
-                continue
-
-            position = (
-                drag_dropper.mouse_position
-                if slot is drag_dropper.detached_slot
-                else slot.center_coordinate
-            )
-            scale_ratio = DEFAULT_HOVER_SCALE_RATIO if slot.is_hovered else 1
-
-            draw_character(
-                frame,
-                position,
-                slot.content,
-                scale_ratio=scale_ratio,
-                slot_is_hovered=slot.is_hovered,
-            )
-
-        # Draw the hovered slot's character last to ensure its on top
-        if hovered_slot:
-            position = (
-                drag_dropper.mouse_position
-                if hovered_slot is drag_dropper.detached_slot
-                else hovered_slot.center_coordinate
-            )
-            assert hovered_slot.content
-            draw_character(
-                frame,
-                position,
-                hovered_slot.content,
-                scale_ratio=DEFAULT_HOVER_SCALE_RATIO,
-                slot_is_hovered=True,
-            )
@@ -1,8 +1,14 @@
 from abc import ABC
-from typing import Final
-from pygame import Rect, draw, Surface, font, transform
+from typing import TYPE_CHECKING, Final, Optional
+from functools import lru_cache
+from pygame import Rect, Mask, draw, Surface, font, SRCALPHA
 
-from settings import Vector, Color, BLACK_COLOR, DEFAULT_TEXT_SIZE
+from assets.images import ASSETS, ImageVariant
+from settings import Vector, Color, BLACK_COLOR, DEFAULT_TEXT_SIZE, DEFAULT_HOVER_SCALE_RATIO, HOVER_ANIMATION_FRAMES, \
+    PIXEL_PERFECT_HOVER
+
+if TYPE_CHECKING:
+    from components.interaction_manager import InteractionManager
 
 BUTTON_COLOR: Final[Color] = (9, 97, 59)
 
@@ -14,6 +20,22 @@ def detect_hover_box(top_left: Vector, size: Vector, mouse_position: Vector) ->
     is_mouse_in_box_y = top_left_y <= mouse_y <= top_left_y + height
     return is_mouse_in_box_x and is_mouse_in_box_y
 
+def ease_in_out(progress: float) -> float:
+    return progress * progress * (3 - 2 * progress)
+
+@lru_cache(maxsize=8)
+def get_hover_scale_ratios(max_scale_ratio: float = DEFAULT_HOVER_SCALE_RATIO) -> tuple[float, ...]:
+    """Scale ratio for each frame of the hover animation, from resting (index 0) to fully hovered"""
+    return tuple(
+        1 + (max_scale_ratio - 1) * ease_in_out(frame / HOVER_ANIMATION_FRAMES)
+        for frame in range(HOVER_ANIMATION_FRAMES + 1)
+    )
+
+def is_opaque_at(image_mask: Mask, topleft: Vector, position: Vector) -> bool:
+    x, y = position[0] - topleft[0], position[1] - topleft[1]
+    width, height = image_mask.get_size()
+    return 0 <= x < width and 0 <= y < height and bool(image_mask.get_at((x, y)))
+
 class Interactable(ABC):
     width_pixels: int
     height_pixels: int
@@ -21,6 +43,8 @@ class Interactable(ABC):
     def __init__(self, position: Vector) -> None:
         self._position = position
         self._is_hovered: bool = False
+        self._hover_frame: int = 0
+        self.interaction_managers: list["InteractionManager"] = []
 
     @property
     def size(self) -> Vector:
@@ -30,13 +54,34 @@ class Interactable(ABC):
     def position(self) -> Vector:
         return self._position
 
-    def refresh(self, mouse_position: Vector) -> None:
-        self._is_hovered = detect_hover_box(self.position, self.size, mouse_position)
+    def is_hit(self, mouse_position: Vector) -> bool:
+        return detect_hover_box(self.position, self.size, mouse_position)
+
+    def get_hit_bounds(self) -> Rect:
+        """Everything is_hit() can ever answer True for, widgets grow while hovered so the fully grown size counts"""
+        return Rect(self.position, self.size).scale_by(DEFAULT_HOVER_SCALE_RATIO, DEFAULT_HOVER_SCALE_RATIO)
+
+    def invalidate_hover(self) -> None:
+        """What is_hit() answers changed without the mouse moving, every manager tests this widget again"""
+        for interaction_manager in self.interaction_managers:
+            interaction_manager.retest(self)
+
+    def set_hovered(self, is_hovered: bool) -> None:
+        """Hover is resolved by the InteractionManager the widget is registered with"""
+        self._is_hovered = is_hovered
+
+    def step_hover_animation(self) -> None:
+        step = 1 if self._is_hovered else -1
+        self._hover_frame = min(max(self._hover_frame + step, 0), HOVER_ANIMATION_FRAMES)
 
     @property
     def is_hovered(self) -> bool:
         return self._is_hovered
 
+    @property
+    def hover_frame(self) -> int:
+        return self._hover_frame
+
     @property
     def bottom_mid_coordinate(self) -> Vector:
         x_position, y_position = self.position
@@ -47,10 +92,18 @@ class Interactable(ABC):
         x_position, y_position = self.position
         return (x_position + round(self.width_pixels / 2), y_position + round(self.height_pixels / 2))
 
+@lru_cache(maxsize=128)
+def get_cached_font(font_name: str, font_size: int) -> font.Font:
+    return font.SysFont(name=font_name, size=font_size)
+
+@lru_cache(maxsize=256)
+def get_text_surface(text_content: str, font_name: str, font_size: int, color: Color) -> Surface:
+    """Rendered text, most labels (stats, gold, button texts) repeat from frame to frame"""
+    return get_cached_font(font_name, font_size).render(text_content, True, color)
+
 def draw_text(text_content: str, window: Surface, center_position: Vector, scale_ratio: float = 1) -> None:
     font_size: int = round(DEFAULT_TEXT_SIZE * scale_ratio)
-    text_font = font.SysFont(name="comicsans", size=font_size)
-    text = text_font.render(text_content, 1, BLACK_COLOR)
+    text = get_text_surface(text_content, "comicsans", font_size, BLACK_COLOR)
     (text_size_x, text_size_y) = text.get_size()
     (center_x, center_y) = center_position
     text_topleft_position = (center_x - text_size_x / 2, center_y - text_size_y / 2)
@@ -58,36 +111,50 @@ def draw_text(text_content: str, window: Surface, center_position: Vector, scale
     window.blit(text, text_topleft_position)
 
 class Button(Interactable):
-    def __init__(self, position: Vector, text: str, image: Surface = None) -> None:
+    def __init__(self, position: Vector, text: str, image: Optional[ImageVariant] = None) -> None:
         super().__init__(position)
         self.text = text
         self.image = image
 
         if self.image:
             # Set dimensions based on image
-            self.width_pixels, self.height_pixels = self.image.get_size()
-            self.rect = self.image.get_rect(topleft=position)
+            assert self.image.size
+            self.width_pixels, self.height_pixels = self.image.size
+            self.rect = Rect(position, self.image.size)
         else:
             # Set default dimensions if no image is provided
             self.width_pixels = 150
             self.height_pixels = 50
             self.rect = Rect(position, (self.width_pixels, self.height_pixels))
 
-    def refresh(self, mouse_position: Vector) -> None:
+    def is_hit(self, mouse_position: Vector) -> bool:
         if self.image:
-            # Update hover status using image rect
-            self._is_hovered = self.rect.collidepoint(mouse_position)
-        else:
-            # Use size for non-image buttons
-            self._is_hovered = detect_hover_box(self.position, self.size, mouse_position)
-
-def draw_button(frame: Surface, button: Button) -> None:
+            # Update hover status using image rect, then the transparent corners are left out pixel by pixel
+            if not self.rect.collidepoint(mouse_position): return False
+            if not PIXEL_PERFECT_HOVER: return True
+            image_mask = ASSETS.get_hover_mask(self.image, get_hover_scale_ratios(), self.hover_frame)
+            if image_mask.get_size() != self.rect.size: return True  # The rect is from a frame not drawn yet
+            return is_opaque_at(image_mask, self.rect.topleft, mouse_position)
+        # Use size for non-image buttons
+        return detect_hover_box(self.position, self.size, mouse_position)
+
+@lru_cache(maxsize=32)
+def get_text_button_frames(text: str, size: Vector) -> tuple[tuple[Surface, Vector], ...]:
+    """Plain buttons pre-drawn at every hover frame, with the offset of each frame from the resting top left"""
+    frames = []
+    for scale_ratio in get_hover_scale_ratios():
+        rect = Rect((0, 0), size).scale_by(scale_ratio, scale_ratio)
+        button_surface = Surface(rect.size, SRCALPHA)
+        draw.rect(button_surface, BUTTON_COLOR, button_surface.get_rect())
+        draw_text(text, button_surface, (rect.width / 2, rect.height / 2), scale_ratio=scale_ratio)
+        frames.append((button_surface, rect.topleft))
+    return tuple(frames)
+
+def get_button_frame(button: Button) -> tuple[Surface, Vector]:
+    """The button's current hover frame and where to draw it"""
     if button.image:
-        # Scale the image if the button is hovered
-        scale_ratio = 1.5 if button.is_hovered else 1
-        new_width = round(button.width_pixels * scale_ratio)
-        new_height = round(button.height_pixels * scale_ratio)
-        scaled_image = transform.scale(button.image, (new_width, new_height))
+        scaled_image = ASSETS.get_hover_frame(button.image, get_hover_scale_ratios(), button.hover_frame)
+        new_width, new_height = scaled_image.get_size()
 
         # Calculate the new position to keep the button centered correctly after scaling
         new_position = (
@@ -95,17 +162,15 @@ def draw_button(frame: Surface, button: Button) -> None:
             button.position[1] - (new_height - button.height_pixels) // 2,
         )
 
-        # Update button rect for accurate collision detection
-        button.rect = scaled_image.get_rect(topleft=new_position)
+        # Update button rect for accurate collision detection, only when the animation moved on
+        if button.rect.size != (new_width, new_height):
+            button.rect = scaled_image.get_rect(topleft=new_position)
 
-        # Draw the scaled image
-        frame.blit(scaled_image, new_position)
+        return scaled_image, new_position
 
-    else:
-        # Draw a simple rectangle if no image is provided
-        rect = Rect(button.position, button.size)
-        scale_ratio = 1.5 if button.is_hovered else 1
-        rect = rect.scale_by(scale_ratio, scale_ratio)
+    # Plain rectangle with text if no image is provided
+    button_surface, (offset_x, offset_y) = get_text_button_frames(button.text, button.size)[button.hover_frame]
+    return button_surface, (button.position[0] + offset_x, button.position[1] + offset_y)
 
-        draw.rect(frame, BUTTON_COLOR, rect)
-        draw_text(button.text, frame, rect.center, scale_ratio=scale_ratio)
+def draw_button(frame: Surface, button: Button) -> None:
+    frame.blit(*get_button_frame(button))
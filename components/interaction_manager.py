@@ -0,0 +1,78 @@
+from typing import TYPE_CHECKING, Final, Iterator, Optional
+
+from settings import Vector, HOVER_ANIMATION_FRAMES
+
+if TYPE_CHECKING: # Annotations only, so the state machine can be imported without pygame
+    from pygame import Rect
+    from components.interactable import Interactable
+
+
+INTERACTION_GRID_CELL_SIZE: Final[int] = 64
+
+Cell = tuple[int, int]
+
+
+class InteractionManager:
+    """
+    Resolves hover for all interactables of a state. The widgets are indexed in a uniform grid, so when the
+    mouse moves only the widgets registered in the cell under it are hit tested, and only the widgets whose
+    hover state changed are told about it. Widgets whose hit area changed under a still mouse ask to be tested
+    again. Widgets are stepped every frame until their hover animation settles.
+    """
+    def __init__(self, cell_size: int = INTERACTION_GRID_CELL_SIZE) -> None:
+        self.cell_size = cell_size
+        self.interactables: list["Interactable"] = []
+        self.grid: dict[Cell, list["Interactable"]] = {}
+        self.hovered: set["Interactable"] = set()
+        self.animating: set["Interactable"] = set()
+        self.retesting: set["Interactable"] = set()
+        self.mouse_position: Optional[Vector] = None
+
+    def register(self, *interactables: "Interactable") -> None:
+        for interactable in interactables:
+            if interactable in self.interactables: continue
+            self.interactables.append(interactable)
+            interactable.interaction_managers.append(self)
+            for cell in self.get_cells(interactable.get_hit_bounds()):
+                self.grid.setdefault(cell, []).append(interactable)
+        self.invalidate()
+
+    def get_cells(self, rect: "Rect") -> Iterator[Cell]:
+        for cell_x in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+            for cell_y in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                yield (cell_x, cell_y)
+
+    def get_candidates(self, mouse_position: Vector) -> list["Interactable"]:
+        cell = (mouse_position[0] // self.cell_size, mouse_position[1] // self.cell_size)
+        return self.grid.get(cell, [])
+
+    def invalidate(self) -> None:
+        """Hit test every widget on the next update, e.g. after other states changed the hover of shared slots"""
+        self.mouse_position = None
+
+    def retest(self, interactable: "Interactable") -> None:
+        """Hit test this widget on the next update even if the mouse stays put, e.g. after its content changed"""
+        self.retesting.add(interactable)
+
+    def resolve_hover(self, mouse_position: Vector) -> None:
+        is_full_pass = self.mouse_position is None
+        candidates = self.interactables if is_full_pass else self.retesting.union(self.get_candidates(mouse_position))
+        hovered = {interactable for interactable in candidates if interactable.is_hit(mouse_position)}
+
+        changed = self.interactables if is_full_pass else self.hovered.symmetric_difference(hovered)
+        for interactable in changed:
+            interactable.set_hovered(interactable in hovered)
+            self.animating.add(interactable)
+
+        self.hovered = hovered
+        self.mouse_position = mouse_position
+        self.retesting.clear()
+
+    def update(self, mouse_position: Vector) -> None:
+        if mouse_position != self.mouse_position or self.retesting:
+            self.resolve_hover(mouse_position)
+
+        for interactable in tuple(self.animating):
+            interactable.step_hover_animation()
+            if interactable.hover_frame == (HOVER_ANIMATION_FRAMES if interactable.is_hovered else 0):
+                self.animating.discard(interactable)
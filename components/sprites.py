@@ -0,0 +1,238 @@
+from typing import Any, Callable, Final, Iterable, Optional, Sequence
+from weakref import WeakKeyDictionary
+from pygame import Surface, Rect
+from pygame.sprite import Sprite, LayeredUpdates
+
+from components.character import CharacterVisual, TooltipContent, get_character_composite, get_character_topleft, \
+    get_tooltip_surface, get_text_element, get_scaled_image, TOOLTIP_WIDTH, TOOLTIP_HEIGHT
+from components.character_slot import CharacterSlot
+from rules.character import Character
+from components.drag_dropper import DragDropper
+from components.interactable import Button, get_button_frame
+from assets.images import ImageChoice
+from settings import Vector, Color, BLACK_COLOR, DEFAULT_HOVER_SCALE_RATIO, DISPLAY_WIDTH, DISPLAY_HEIGHT
+
+
+SLOT_LAYER: Final[int] = 0
+BUTTON_LAYER: Final[int] = 1
+CHARACTER_LAYER: Final[int] = 2
+HOVERED_CHARACTER_LAYER: Final[int] = 3
+TOOLTIP_LAYER: Final[int] = 4
+
+EMPTY_SURFACE: Final[Surface] = Surface((0, 0))
+SCREEN_RECT: Final[Rect] = Rect(0, 0, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+
+
+class SceneSprite(Sprite):
+    """Persistent sprite that refreshes its image and rect in update(), and is skipped while not visible"""
+    _layer: int = SLOT_LAYER
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.image: Surface = EMPTY_SURFACE
+        self.rect: Rect = Rect(0, 0, 0, 0)
+        self.visible: bool = True
+
+    def set_layer(self, layer: int) -> None:
+        if self._layer == layer: return
+        for group in self.groups():
+            if isinstance(group, LayeredUpdates):
+                group.change_layer(self, layer)
+        self._layer = layer
+
+
+class SceneGroup(LayeredUpdates):
+    """Layered group that draws all visible sprites with a single blits() call"""
+
+    def draw(self, surface: Surface, bgsurf: Any = None, special_flags: int = 0) -> list[Rect]:
+        surface.blits([(sprite.image, sprite.rect) for sprite in self.sprites() if sprite.visible], doreturn=False)
+        return []
+
+
+class SceneCache:
+    """Keeps one sprite group per state object, built on first draw"""
+    def __init__(self, build: Callable[[Any], SceneGroup]) -> None:
+        self.build = build
+        self.scenes: WeakKeyDictionary[Any, SceneGroup] = WeakKeyDictionary()
+
+    def get(self, state: Any) -> SceneGroup:
+        if state not in self.scenes:
+            self.scenes[state] = self.build(state)
+        return self.scenes[state]
+
+
+class SlotHighlightSprite(SceneSprite):
+    """Idle slots live in the static layer, this only covers a slot while it is hovered"""
+    _layer = SLOT_LAYER
+
+    def __init__(self, slot: CharacterSlot) -> None:
+        super().__init__()
+        self.slot = slot
+        self.image = get_scaled_image(ImageChoice.SLOT_HOVER, slot.size)
+        self.rect = Rect(slot.position, slot.size)
+
+    def update(self) -> None:
+        self.visible = self.slot.is_hovered
+
+
+class ButtonSprite(SceneSprite):
+    _layer = BUTTON_LAYER
+
+    def __init__(self, button: Button, is_visible: Callable[[], bool] = lambda: True) -> None:
+        super().__init__()
+        self.button = button
+        self.is_visible = is_visible
+
+    def update(self) -> None:
+        self.visible = self.is_visible()
+        if not self.visible: return
+        self.image, position = get_button_frame(self.button)
+        if self.rect.topleft != position or self.rect.size != self.image.get_size():
+            self.rect = self.image.get_rect(topleft=position)
+
+
+class TextSprite(SceneSprite):
+    _layer = BUTTON_LAYER
+
+    def __init__(self, get_text: Callable[[], Optional[str]], center_position: Vector, scale_ratio: float = 1, font_name: str = "pixel_font", get_color: Callable[[], Color] = lambda: BLACK_COLOR) -> None:
+        super().__init__()
+        self.get_text = get_text
+        self.get_color = get_color
+        self.center_position = center_position
+        self.scale_ratio = scale_ratio
+        self.font_name = font_name
+        self.shown: Optional[tuple[str, Color]] = None
+
+    def update(self) -> None:
+        text = self.get_text()
+        self.visible = bool(text)
+        if not text: return
+        shown = (text, self.get_color())
+        if shown == self.shown: return
+        self.image, position = get_text_element(text, self.center_position, self.scale_ratio, self.font_name, shown[1])
+        self.rect = self.image.get_rect(topleft=position)
+        self.shown = shown
+
+
+class TooltipSprite(SceneSprite):
+    """Shared by all characters of a scene, owned by whichever character is hovered"""
+    _layer = TOOLTIP_LAYER
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.visible = False
+        self.owner: Optional[Sprite] = None
+        self.content: Optional[TooltipContent] = None
+
+    def hide(self, owner: Sprite) -> None:
+        if self.owner is not owner: return
+        self.visible = False
+        self.owner = None
+
+    def show(self, owner: Sprite, content: TooltipContent, mid_bottom: Vector, character_height: int) -> None:
+        self.owner = owner
+        if content != self.content:
+            self.image = get_tooltip_surface(content, DEFAULT_HOVER_SCALE_RATIO)
+            self.content = content
+
+        tooltip_rect = Rect(
+            (mid_bottom[0] - TOOLTIP_WIDTH / 2, mid_bottom[1] - character_height - TOOLTIP_HEIGHT - 40),
+            (TOOLTIP_WIDTH, TOOLTIP_HEIGHT)
+        )
+        # Clamp the tooltip position to ensure it stays within the screen boundaries
+        self.rect = tooltip_rect.clamp(SCREEN_RECT)
+        self.visible = True
+
+
+class CharacterSprite(SceneSprite):
+    """
+    A slot's character as one pre-composited image. The image is only looked up again when the visual
+    state of the character changes, and the sprite moves to the hovered layer to draw on top of its neighbors.
+    """
+    _layer = CHARACTER_LAYER
+
+    def __init__(self, slot: CharacterSlot, tooltip: TooltipSprite, is_enemy: bool = False) -> None:
+        super().__init__()
+        self.slot = slot
+        self.tooltip = tooltip
+        self.is_enemy = is_enemy
+        self.visual: Optional[CharacterVisual] = None
+        self.anchor: Vector = (0, 0)
+
+    def get_position(self) -> Vector:
+        return self.slot.center_coordinate
+
+    def get_scale_ratio(self) -> float:
+        return 1
+
+    def get_hover_frame(self) -> int:
+        return self.slot.hover_frame
+
+    def is_on_top(self) -> bool:
+        return self.slot.is_hovered
+
+    def update(self) -> None:
+        character = self.slot.content
+        self.visible = bool(character)
+        if not character:
+            self.tooltip.hide(self)
+            return
+
+        visual = CharacterVisual.from_character(character, self.is_enemy, self.get_scale_ratio(), self.get_hover_frame())
+        if visual != self.visual:
+            self.image, self.anchor = get_character_composite(visual)
+            self.visual = visual
+
+        mid_bottom = self.get_position()
+        self.rect = self.image.get_rect(topleft=get_character_topleft(self.anchor, mid_bottom))
+        self.set_layer(HOVERED_CHARACTER_LAYER if self.is_on_top() else CHARACTER_LAYER)
+
+        if self.slot.is_hovered:
+            self.tooltip.show(self, TooltipContent.from_character(character), mid_bottom, character.height_pixels)
+        else:
+            self.tooltip.hide(self)
+
+
+class DraggableCharacterSprite(CharacterSprite):
+    def __init__(self, slot: CharacterSlot, tooltip: TooltipSprite, drag_dropper: DragDropper) -> None:
+        super().__init__(slot, tooltip)
+        self.drag_dropper = drag_dropper
+
+    def is_dragged(self) -> bool:
+        return self.slot is self.drag_dropper.detached_slot
+
+    def get_position(self) -> Vector:
+        return self.drag_dropper.mouse_position if self.is_dragged() else self.slot.center_coordinate
+
+    def is_on_top(self) -> bool:
+        return self.slot.is_hovered or self.is_dragged()
+
+
+def create_slot_sprites(slots: Sequence[CharacterSlot], tooltip: TooltipSprite, is_enemy: bool = False) -> list[SceneSprite]:
+    sprites: list[SceneSprite] = []
+    for slot in slots:
+        sprites.append(SlotHighlightSprite(slot))
+        sprites.append(CharacterSprite(slot, tooltip, is_enemy))
+    return sprites
+
+
+def create_drag_dropper_sprites(drag_dropper: DragDropper, tooltip: TooltipSprite) -> list[SceneSprite]:
+    sprites: list[SceneSprite] = []
+    for slot in drag_dropper.slots:
+        sprites.append(SlotHighlightSprite(slot))
+        sprites.append(DraggableCharacterSprite(slot, tooltip, drag_dropper))
+    return sprites
+
+
+def draw_scene(frame: Surface, scene: SceneGroup) -> None:
+    scene.update()
+    scene.draw(frame)
+
+
+def warm_character_caches(characters: Iterable[Optional[Character]], is_enemy: bool = False, scale_ratios: Sequence[float] = (1,)) -> None:
+    """Composite and tooltip of characters about to be shown, so their first frame doesn't have to scale any images"""
+    for character in characters:
+        if not character: continue
+        for scale_ratio in scale_ratios:
+            get_character_composite(CharacterVisual.from_character(character, is_enemy, scale_ratio))
+        get_tooltip_surface(TooltipContent.from_character(character), DEFAULT_HOVER_SCALE_RATIO)
@@ -1,25 +1,88 @@
+import asyncio
+import logging
 import traceback
 import pygame
-from time import sleep
+from time import perf_counter
+from typing import Awaitable, Callable, NamedTuple, Optional
 
-from core.interfaces import Engine, Loopable, Renderer, InputListener
-from settings import GAME_FPS
+from core.interfaces import Engine, Loopable, Renderer, InputListener, UserInput
+from core.input_listener import NoInputListener
+from core.renderer import NoRenderer
+from core.profiler import FRAME_PROFILER
+from settings import GAME_FPS, IDLE_FPS, IDLE_AFTER_FRAMES
+
+
+def has_user_activity(user_input: Optional[UserInput]) -> bool:
+    if not user_input: return True
+    return bool(user_input.is_mouse_moved or user_input.events or user_input.is_space_key_down
+                or user_input.is_mouse1_down or user_input.is_mouse1_up)
+
+
+def is_loopable_animating(loopable: Loopable) -> bool:
+    """Loopables that can't tell are assumed to always be animating, so they are never slowed down"""
+    is_animating = getattr(loopable, "is_animating", None)
+    return is_animating() if is_animating else True
+
+
+class FramePacer:
+    """
+    Sleeps only for what is left of the frame budget after the frame's work, and yields to the event loop
+    even when there is nothing left. After a stretch of frames without input or animation the budget is
+    stretched to the low-power idle rate, the first busy frame brings it back. The clock and sleep can be
+    swapped out, so tests can drive the pacer without waiting.
+    """
+    def __init__(self, fps: int = GAME_FPS, idle_fps: int = IDLE_FPS, idle_after_frames: int = IDLE_AFTER_FRAMES,
+                 clock: Callable[[], float] = perf_counter, sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> None:
+        self.clock = clock
+        self.sleep = sleep
+        self.frame_budget_s = 1 / fps
+        self.idle_frame_budget_s = 1 / idle_fps
+        self.idle_after_frames = idle_after_frames
+        self.idle_frames: int = 0
+        self.next_frame_start: Optional[float] = None
+        self.overruns: int = 0
+
+    @property
+    def is_idle(self) -> bool:
+        return self.idle_frames >= self.idle_after_frames
+
+    def report_frame(self, is_busy: bool) -> None:
+        self.idle_frames = 0 if is_busy else self.idle_frames + 1
+
+    async def wait_for_next_frame(self) -> None:
+        now = self.clock()
+        if self.next_frame_start is None:
+            self.next_frame_start = now
+        self.next_frame_start += self.idle_frame_budget_s if self.is_idle else self.frame_budget_s
+
+        remaining_s = self.next_frame_start - now
+        if remaining_s > 0:
+            await self.sleep(remaining_s)
+            return
+
+        # Over budget, start right away and don't try to catch up on the lost time
+        self.overruns += 1
+        FRAME_PROFILER.record_overrun(-remaining_s * 1000)
+        logging.debug(f"Frame budget overrun by {-remaining_s * 1000:.1f} ms")
+        self.next_frame_start = now
+        await self.sleep(0)
 
 
 class PygameEngine(Engine):
     def __init__(self, loopable: Loopable, renderer: Renderer, input_listener: InputListener):
         super().__init__(loopable, renderer, input_listener)
         pygame.init()
-        self.clock = pygame.time.Clock()
+        self.pacer = FramePacer()
 
-    def run(self) -> None:
+    async def run_async(self) -> None:
         try:
-            super().run()
+            await super().run_async()
         except Exception: 
             traceback.print_exc()
             
-    def wait_for_next_frame(self) -> None:
-        self.clock.tick(GAME_FPS)
+    async def wait_for_next_frame(self) -> None:
+        self.pacer.report_frame(has_user_activity(self.last_input) or is_loopable_animating(self.loopable))
+        await self.pacer.wait_for_next_frame()
         
     def quit(self) -> None:
         print("Exiting...")
@@ -27,8 +90,67 @@ class PygameEngine(Engine):
 
 
 class CommandlineEngine(Engine):
-    def wait_for_next_frame(self) -> None:
-        sleep(1/GAME_FPS)
+    def __init__(self, loopable: Loopable, renderer: Renderer, input_listener: InputListener):
+        super().__init__(loopable, renderer, input_listener)
+        self.pacer = FramePacer()
+
+    async def wait_for_next_frame(self) -> None:
+        await self.pacer.wait_for_next_frame()
 
     def quit(self) -> None:
         print("Exiting...")
+
+
+class TurboReport(NamedTuple):
+    steps: int
+    wall_time_s: float
+    virtual_time_s: float
+
+    @property
+    def loops_per_second(self) -> float:
+        return self.steps / self.wall_time_s if self.wall_time_s else 0.
+
+    @property
+    def speedup(self) -> float:
+        return self.virtual_time_s / self.wall_time_s if self.wall_time_s else 0.
+
+
+class TurboEngine(Engine):
+    """
+    Runs the loop back to back without ever waiting, for integration tests and soak runs. Time in the game only
+    advances by frames, so the virtual clock counts 1/GAME_FPS per step, and the run stops after max_steps if given.
+    """
+    def __init__(self, loopable: Loopable, renderer: Optional[Renderer] = None, input_listener: Optional[InputListener] = None,
+                 max_steps: Optional[int] = None):
+        super().__init__(loopable, renderer or NoRenderer(), input_listener or NoInputListener())
+        self.max_steps = max_steps
+        self.frame_duration_ms = 1000 / GAME_FPS
+        self.steps: int = 0
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+
+    @property
+    def virtual_time_ms(self) -> float:
+        return self.steps * self.frame_duration_ms
+
+    async def wait_for_next_frame(self) -> None:
+        if self.start_time is None:
+            self.start_time = perf_counter()
+
+    def step(self) -> UserInput:
+        user_input = super().step()
+        self.steps += 1
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            self.running = False
+        return user_input
+
+    def report(self) -> TurboReport:
+        start_time = self.start_time if self.start_time is not None else perf_counter()
+        end_time = self.end_time if self.end_time is not None else perf_counter()
+        return TurboReport(self.steps, end_time - start_time, self.virtual_time_ms / 1000)
+
+    def quit(self) -> None:
+        self.end_time = perf_counter()
+        report = self.report()
+        print(f"{report.steps} loops in {report.wall_time_s:.2f} s, {report.loops_per_second:.0f} loops/s "
+              f"({report.speedup:.0f}x real time)")
@@ -1,6 +1,9 @@
-from pygame import event, QUIT, MOUSEBUTTONDOWN, MOUSEBUTTONUP, KEYDOWN, K_SPACE, mouse, key
+import struct
+from typing import Final, Optional
+from pygame import event, mouse, time, QUIT, MOUSEMOTION, MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEWHEEL, KEYDOWN, KEYUP, \
+    BUTTON_LEFT, K_SPACE, K_F3
 #from keyboard import is_pressed
-from core.interfaces import UserInput, InputListener
+from core.interfaces import UserInput, InputEvent, InputListener
 
 
 class NoInputListener(InputListener):
@@ -20,42 +23,66 @@ class NoInputListener(InputListener):
 
 class PygameInputListener(InputListener):
     """
-    Collect user input from pygame's built in event queue and functions.
+    Collect user input from pygame's built in event queue, in a single pass over the events of the frame.
+    The same UserInput record is refilled on every capture.
     Requires pygame to be initialized
     """
-
-    def capture(self) -> UserInput:
-        self.events = event.get()
-
-        return UserInput(
-            self._is_quit(),
-            self._is_mouse1_down(),
-            self._is_mouse1_up(),
-            self._is_space_key_down(),
-            self._mouse_position()
+    def __init__(self) -> None:
+        self.user_input = UserInput(
+            is_quit = False,
+            is_mouse1_down = False,
+            is_mouse1_up = False,
+            is_space_key_down = False,
+            mouse_position = mouse.get_pos(),
+            is_mouse_moved = True  # Hover state is unknown until the first hit test
         )
+        self.is_first_capture = True
 
-    @property
-    def event_types(self) -> list[int]:
-        return [event.type for event in self.events]
-
-    def _is_quit(self) -> bool:
-        return QUIT in self.event_types
-    
-    def _is_mouse1_down(self) -> bool:
-        return MOUSEBUTTONDOWN in self.event_types
-    
-    def _is_mouse1_up(self) -> bool:
-        return MOUSEBUTTONUP in self.event_types
-    
-    def _is_space_key_down(self) -> bool:
-        #key_presses = [event for event in self.events if event.type == KEYDOWN]
-        #space_pressed = K_SPACE in [key_press.key for key_press in key_presses]
-        space_pressed = key.get_pressed()[K_SPACE]
-        return space_pressed
-
-    def _mouse_position(self) -> tuple[int, int]:
-        return mouse.get_pos()
+    def capture(self) -> UserInput:
+        user_input = self.user_input
+        if self.is_first_capture:
+            self.is_first_capture = False
+        else:
+            user_input.clear_frame()
+
+        now = time.get_ticks()
+        motion_x, motion_y = 0, 0
+        wheel_x, wheel_y = 0, 0
+        for pygame_event in event.get():
+            event_type = pygame_event.type
+            if event_type == MOUSEMOTION:
+                user_input.mouse_position = pygame_event.pos
+                motion_x += pygame_event.rel[0]
+                motion_y += pygame_event.rel[1]
+                user_input.is_mouse_moved = True
+            elif event_type == MOUSEBUTTONDOWN:
+                user_input.mouse_buttons_down.add(pygame_event.button)
+                user_input.events.append(InputEvent(event_type, pygame_event.button, now))
+            elif event_type == MOUSEBUTTONUP:
+                user_input.mouse_buttons_up.add(pygame_event.button)
+                user_input.events.append(InputEvent(event_type, pygame_event.button, now))
+            elif event_type == MOUSEWHEEL:
+                wheel_x += pygame_event.x
+                wheel_y += pygame_event.y
+            elif event_type == KEYDOWN:
+                user_input.keys_down.add(pygame_event.key)
+                user_input.events.append(InputEvent(event_type, pygame_event.key, now))
+                if pygame_event.key == K_SPACE:
+                    user_input.is_space_key_down = True
+            elif event_type == KEYUP:
+                user_input.keys_up.add(pygame_event.key)
+                user_input.events.append(InputEvent(event_type, pygame_event.key, now))
+                if pygame_event.key == K_SPACE:
+                    user_input.is_space_key_down = False  # Stays True while space is held, like key.get_pressed()
+            elif event_type == QUIT:
+                user_input.is_quit = True
+
+        user_input.mouse_motion = (motion_x, motion_y)
+        user_input.mouse_wheel = (wheel_x, wheel_y)
+        user_input.is_mouse1_down = BUTTON_LEFT in user_input.mouse_buttons_down
+        user_input.is_mouse1_up = BUTTON_LEFT in user_input.mouse_buttons_up
+        user_input.is_overlay_key_down = K_F3 in user_input.keys_down
+        return user_input
 
 
 class DeafInputListener(InputListener):
@@ -96,6 +123,103 @@ class CrazyInputListener(InputListener):
         )
 
 
+RECORDING_MAGIC: Final[bytes] = b"RTIN"
+RECORDING_VERSION: Final[int] = 1
+RECORDING_HEADER: Final[struct.Struct] = struct.Struct("<4sBq")     # magic, version, seed
+FRAME_RECORD: Final[struct.Struct] = struct.Struct("<BhhhhbbB")     # flags, mouse position, motion, wheel, number of events
+EVENT_RECORD: Final[struct.Struct] = struct.Struct("<BII")          # event kind, key or button, timestamp
+RECORDED_EVENT_TYPES: Final[tuple[int, ...]] = (MOUSEBUTTONDOWN, MOUSEBUTTONUP, KEYDOWN, KEYUP)
+FRAME_FLAGS: Final[tuple[str, ...]] = (
+    "is_quit", "is_mouse1_down", "is_mouse1_up", "is_space_key_down", "is_overlay_key_down", "is_mouse_moved"
+)
+
+
+def encode_user_input(user_input: UserInput) -> bytes:
+    flags = sum(1 << bit for bit, flag in enumerate(FRAME_FLAGS) if getattr(user_input, flag))
+    events = [input_event for input_event in user_input.events if input_event.type in RECORDED_EVENT_TYPES][:255]
+    wheel_x, wheel_y = (max(-128, min(127, wheel)) for wheel in user_input.mouse_wheel)
+    return FRAME_RECORD.pack(flags, *user_input.mouse_position, *user_input.mouse_motion, wheel_x, wheel_y, len(events)) + b"".join(
+        EVENT_RECORD.pack(RECORDED_EVENT_TYPES.index(input_event.type), input_event.code, input_event.timestamp_ms)
+        for input_event in events
+    )
+
+
+def decode_user_input(record: bytes, offset: int) -> tuple[UserInput, int]:
+    """The user input stored at offset, and the offset of the next frame"""
+    flags, mouse_x, mouse_y, motion_x, motion_y, wheel_x, wheel_y, nr_events = FRAME_RECORD.unpack_from(record, offset)
+    offset += FRAME_RECORD.size
+    user_input = UserInput(
+        is_quit = False,
+        is_mouse1_down = False,
+        is_mouse1_up = False,
+        is_space_key_down = False,
+        mouse_position = (mouse_x, mouse_y),
+        mouse_motion = (motion_x, motion_y),
+        mouse_wheel = (wheel_x, wheel_y)
+    )
+    for bit, flag in enumerate(FRAME_FLAGS):
+        setattr(user_input, flag, bool(flags & (1 << bit)))
+
+    event_sets = (user_input.mouse_buttons_down, user_input.mouse_buttons_up, user_input.keys_down, user_input.keys_up)
+    for _ in range(nr_events):
+        kind, code, timestamp_ms = EVENT_RECORD.unpack_from(record, offset)
+        offset += EVENT_RECORD.size
+        event_sets[kind].add(code)
+        user_input.events.append(InputEvent(RECORDED_EVENT_TYPES[kind], code, timestamp_ms))
+    return user_input, offset
+
+
+class RecordingInputListener(InputListener):
+    """
+    Passes through the input of another listener and appends every frame to a file, a dozen bytes per frame
+    plus a few per key or button event. The seed the game was started with is stored in the header.
+    """
+    def __init__(self, input_listener: InputListener, file_path: str, seed: int) -> None:
+        self.input_listener = input_listener
+        self.file = open(file_path, "wb")
+        self.file.write(RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, seed))
+
+    def capture(self) -> UserInput:
+        user_input = self.input_listener.capture()
+        self.file.write(encode_user_input(user_input))
+        return user_input
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ReplayInputListener(InputListener):
+    """
+    Feeds a recording back frame by frame. Seed random with .seed before creating the game to replay the same
+    session, once the recording runs out it keeps producing quit. A live listener, if given, is still captured
+    every frame to keep the window responsive and to let the player close it.
+    """
+    def __init__(self, file_path: str, live_input_listener: Optional[InputListener] = None) -> None:
+        self.live_input_listener = live_input_listener
+        with open(file_path, "rb") as file:
+            self.record = file.read()
+        magic, version, self.seed = RECORDING_HEADER.unpack_from(self.record)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"{file_path} is not an input recording of version {RECORDING_VERSION}")
+        self.offset = RECORDING_HEADER.size
+        self.frame_counter = 0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.offset >= len(self.record)
+
+    def capture(self) -> UserInput:
+        is_live_quit = bool(self.live_input_listener and self.live_input_listener.capture().is_quit)
+        if self.is_finished or is_live_quit:
+            user_input = NoInputListener().capture()
+            user_input.is_quit = True
+            return user_input
+
+        user_input, self.offset = decode_user_input(self.record, self.offset)
+        self.frame_counter += 1
+        return user_input
+
+
 class KeyboardInputListener(InputListener):
     """
     Listens to keyboard presses using the Keyboard module.
@@ -1,15 +1,61 @@
 from abc import ABC, abstractmethod
-from typing import Protocol
-from dataclasses import dataclass
+from typing import NamedTuple, Optional, Protocol
+from dataclasses import dataclass, field, replace
 
+from core.profiler import FrameSection, FRAME_PROFILER
 
-@dataclass(frozen=True)
+
+class InputEvent(NamedTuple):
+    type: int           # pygame event type, e.g. KEYDOWN or MOUSEBUTTONUP
+    code: int           # Key code or mouse button
+    timestamp_ms: int
+
+
+@dataclass
 class UserInput:
+    """
+    Everything the player did since the last frame. PygameInputListener fills the same record every frame,
+    so keep a copy() of it if it is needed after the next capture.
+    """
     is_quit: bool
     is_mouse1_down: bool
     is_mouse1_up: bool
     is_space_key_down: bool
     mouse_position: tuple[int, int]
+    is_overlay_key_down: bool = False
+    mouse_buttons_down: set[int] = field(default_factory=set)
+    mouse_buttons_up: set[int] = field(default_factory=set)
+    keys_down: set[int] = field(default_factory=set)
+    keys_up: set[int] = field(default_factory=set)
+    mouse_motion: tuple[int, int] = (0, 0)
+    mouse_wheel: tuple[int, int] = (0, 0)
+    is_mouse_moved: bool = False
+    events: list[InputEvent] = field(default_factory=list)
+
+    def clear_frame(self) -> None:
+        """Forget the events of the previous frame, the mouse position carries over"""
+        self.is_quit = False
+        self.is_mouse1_down = False
+        self.is_mouse1_up = False
+        self.is_overlay_key_down = False
+        self.mouse_buttons_down.clear()
+        self.mouse_buttons_up.clear()
+        self.keys_down.clear()
+        self.keys_up.clear()
+        self.mouse_motion = (0, 0)
+        self.mouse_wheel = (0, 0)
+        self.is_mouse_moved = False
+        self.events.clear()
+
+    def copy(self) -> "UserInput":
+        return replace(
+            self,
+            mouse_buttons_down = set(self.mouse_buttons_down),
+            mouse_buttons_up = set(self.mouse_buttons_up),
+            keys_down = set(self.keys_down),
+            keys_up = set(self.keys_up),
+            events = list(self.events)
+        )
 
 
 class InputListener(Protocol):
@@ -31,29 +77,52 @@ class Renderer(Protocol):
 
 
 class Engine(ABC):
+    """
+    Runs the input, loop and render cycle as a coroutine, so the same engine works on desktop and under
+    pygbag's asyncio loop. Subclasses decide how long to wait between frames.
+    """
     def __init__(self, loopable: Loopable, renderer: Renderer, input_listener: InputListener):
         self.loopable = loopable
         self.renderer = renderer
         self.input_listener = input_listener
         self.running = True
+        self.last_input: Optional[UserInput] = None
 
     def run(self) -> None:
-        while self.running:
-            self.wait_for_next_frame()
+        import asyncio  # Only needed when the engine owns the event loop, pygbag brings its own
+        asyncio.run(self.run_async())
 
-            user_input: UserInput = self.input_listener.capture()
-
-            self.loopable.loop(user_input)
-
-            self.renderer.render()
+    async def run_async(self) -> None:
+        while self.running:
+            await self.wait_for_next_frame()
+            user_input = self.step()
 
             if user_input.is_quit: 
                 self.running = False
 
         self.quit()
 
+    def step(self) -> UserInput:
+        """A single frame of input, game logic and rendering"""
+        FRAME_PROFILER.begin_frame()
+
+        user_input: UserInput = self.input_listener.capture()
+        FRAME_PROFILER.mark(FrameSection.INPUT)
+
+        if user_input.is_overlay_key_down:
+            FRAME_PROFILER.toggle_overlay()
+
+        self.loopable.loop(user_input)
+        FRAME_PROFILER.mark(FrameSection.LOOP)
+
+        self.renderer.render()
+        FRAME_PROFILER.end_frame()
+
+        self.last_input = user_input
+        return user_input
+
     @abstractmethod
-    def wait_for_next_frame(self) -> None:
+    async def wait_for_next_frame(self) -> None:
         ...
 
     @abstractmethod
@@ -0,0 +1,85 @@
+from collections import deque
+from enum import Enum
+from time import perf_counter
+from typing import Optional
+
+from settings import PERFORMANCE_HISTORY_FRAMES, SHOW_PERFORMANCE_OVERLAY
+
+
+class FrameSection(Enum):
+    INPUT   = "input"
+    LOOP    = "loop"
+    DRAW    = "draw"
+    DISPLAY = "display"
+
+
+class FrameProfiler:
+    """
+    Splits every frame into sections and keeps the time spent in each for the last few hundred frames.
+    The engine and renderer call mark() when a section ends, time between frames (waiting) is not counted.
+    """
+    def __init__(self, history_frames: int = PERFORMANCE_HISTORY_FRAMES) -> None:
+        self.history_frames = history_frames
+        self.section_history: dict[FrameSection, deque[float]] = {section: deque(maxlen=history_frames) for section in FrameSection}
+        self.frame_history: deque[float] = deque(maxlen=history_frames)
+        self.frame_intervals: deque[float] = deque(maxlen=history_frames)
+        self.frame_count: int = 0
+        self.overrun_count: int = 0
+        self.last_overrun: float = 0.
+        self.is_overlay_visible: bool = SHOW_PERFORMANCE_OVERLAY
+
+        self._current_frame: dict[FrameSection, float] = {section: 0. for section in FrameSection}
+        self._frame_start: Optional[float] = None
+        self._last_mark: float = 0.
+
+    def toggle_overlay(self) -> None:
+        self.is_overlay_visible = not self.is_overlay_visible
+
+    def begin_frame(self) -> None:
+        now = perf_counter()
+        if self._frame_start is not None:
+            self.frame_intervals.append((now - self._frame_start) * 1000)
+        self._frame_start = now
+        self._last_mark = now
+        for section in FrameSection:
+            self._current_frame[section] = 0.
+
+    def mark(self, section: FrameSection) -> None:
+        now = perf_counter()
+        self._current_frame[section] += (now - self._last_mark) * 1000
+        self._last_mark = now
+
+    def skip(self) -> None:
+        """Leave the time since the last mark out of every section, e.g. the overlay drawing itself"""
+        self._last_mark = perf_counter()
+
+    def end_frame(self) -> None:
+        for section, duration_ms in self._current_frame.items():
+            self.section_history[section].append(duration_ms)
+        self.frame_history.append(sum(self._current_frame.values()))
+        self.frame_count += 1
+
+    def record_overrun(self, overrun_ms: float) -> None:
+        """Called by the frame pacer when a frame took longer than its budget"""
+        self.overrun_count += 1
+        self.last_overrun = overrun_ms
+
+    def last_frame(self, section: FrameSection) -> float:
+        history = self.section_history[section]
+        return history[-1] if history else 0.
+
+    def average(self, section: FrameSection) -> float:
+        history = self.section_history[section]
+        return sum(history) / len(history) if history else 0.
+
+    @property
+    def worst_frame(self) -> float:
+        return max(self.frame_history, default=0.)
+
+    @property
+    def fps(self) -> float:
+        if not self.frame_intervals: return 0.
+        return 1000 * len(self.frame_intervals) / sum(self.frame_intervals)
+
+
+FRAME_PROFILER = FrameProfiler()
@@ -1,13 +1,38 @@
-from pygame import display, time, Surface
-from typing import Final
+from pygame import display, draw, Surface, Rect, SRCALPHA
+from typing import Final, Optional, Callable, Hashable, Any
 from abc import ABC, abstractmethod
 
 from core.interfaces import Renderer, Loopable
-from components.interactable import draw_text
-from settings import DISPLAY_WIDTH, DISPLAY_HEIGHT, GAME_NAME, Vector
+from core.profiler import FrameProfiler, FrameSection, FRAME_PROFILER
+from components.interactable import get_cached_font, get_text_surface
+from components.character import get_tooltip_surface
+from assets.images import ASSETS
+from assets.preloader import AssetPreloader
+from settings import DISPLAY_WIDTH, DISPLAY_HEIGHT, GAME_NAME, GAME_FPS, DEFAULT_TEXT_SIZE, Vector, Color, \
+    WHITE_COLOR, GREEN_COLOR, YELLOW_COLOR
 
 
-FPS_SCREEN_POSITION: Final[Vector] = (750,50)
+OVERLAY_WIDTH: Final[int] = 300
+OVERLAY_HEIGHT: Final[int] = 185
+OVERLAY_POSITION: Final[Vector] = (DISPLAY_WIDTH - OVERLAY_WIDTH - 10, 10)
+OVERLAY_BACKGROUND: Final[tuple[int, int, int, int]] = (0, 0, 0, 170)
+OVERLAY_FONT_SIZE: Final[int] = 15
+OVERLAY_LINE_HEIGHT: Final[int] = 15
+GRAPH_HEIGHT: Final[int] = 60
+GRAPH_MS_RANGE: Final[float] = 2 * 1000 / GAME_FPS  # Two frame budgets from bottom to top
+SECTION_COLORS: Final[dict[FrameSection, Color]] = {
+    FrameSection.INPUT:     YELLOW_COLOR,
+    FrameSection.LOOP:      (80, 160, 255),
+    FrameSection.DRAW:      GREEN_COLOR,
+    FrameSection.DISPLAY:   (255, 110, 110),
+}
+LOADING_BACKGROUND_COLOR: Final[Color] = (20, 32, 24)
+LOADING_BAR_RECT: Final[Rect] = Rect(DISPLAY_WIDTH // 4, DISPLAY_HEIGHT // 2, DISPLAY_WIDTH // 2, 30)
+OVERLAY_CACHES: Final[dict[str, Any]] = {
+    "image":    ASSETS,
+    "text":     get_text_surface,
+    "tooltip":  get_tooltip_surface,
+}
 
 
 class NoRenderer(Renderer):
@@ -15,27 +40,142 @@ class NoRenderer(Renderer):
         pass
 
 
+class StaticLayer:
+    """
+    Pre-composited full screen surface with everything that stays put while a state is active
+    (background, empty slots, fixed decorations). It is rebuilt only when the layout key changes,
+    so a frame starts with a single blit instead of re-drawing the scenery.
+    """
+    def __init__(self, build: Callable[[Surface, Any], None]) -> None:
+        self.build = build
+        self.surface: Optional[Surface] = None
+        self.layout_key: Optional[Hashable] = None
+
+    def invalidate(self) -> None:
+        self.surface = None
+
+    def is_valid(self, frame: Surface, layout_key: Hashable) -> bool:
+        if not self.surface: return False
+        return self.layout_key == layout_key and self.surface.get_size() == frame.get_size()
+
+    def prepare(self, frame: Surface, state: Any, layout_key: Hashable) -> None:
+        if not self.is_valid(frame, layout_key):
+            self.surface = Surface(frame.get_size()).convert()
+            self.build(self.surface, state)
+            self.layout_key = layout_key
+
+    def draw(self, frame: Surface, state: Any, layout_key: Hashable) -> None:
+        self.prepare(frame, state, layout_key)
+        assert self.surface
+        frame.blit(self.surface, (0, 0))
+
+
+def get_hit_rate(cached_function: Any) -> float:
+    cache_info = cached_function.cache_info()
+    lookups = cache_info.hits + cache_info.misses
+    return cache_info.hits / lookups if lookups else 0.
+
+
+class PerformanceOverlay:
+    """
+    Frame time breakdown with a rolling graph of the recent frames. The graph is scrolled one column per
+    frame instead of being redrawn, and the overlay text bypasses the text cache it reports on.
+    """
+    def __init__(self) -> None:
+        self.graph = Surface((OVERLAY_WIDTH, GRAPH_HEIGHT), SRCALPHA)
+        self.graph_frame_count: int = 0
+
+    def draw_graph_column(self, profiler: FrameProfiler, column: int, history_index: int) -> None:
+        bottom = GRAPH_HEIGHT
+        for section in FrameSection:
+            duration_ms = profiler.section_history[section][history_index]
+            height = round(duration_ms * GRAPH_HEIGHT / GRAPH_MS_RANGE)
+            if height <= 0: continue
+            top = max(bottom - height, 0)
+            draw.line(self.graph, SECTION_COLORS[section], (column, bottom - 1), (column, top))
+            bottom = top
+
+    def update_graph(self, profiler: FrameProfiler) -> None:
+        new_frames = profiler.frame_count - self.graph_frame_count
+        if not new_frames: return
+        recorded_frames = len(profiler.frame_history)
+
+        if new_frames > 1:
+            self.graph.fill((0, 0, 0, 0))
+            for history_index in range(recorded_frames):
+                self.draw_graph_column(profiler, OVERLAY_WIDTH - recorded_frames + history_index, history_index)
+        else:
+            self.graph.scroll(dx=-1)
+            self.graph.fill((0, 0, 0, 0), (OVERLAY_WIDTH - 1, 0, 1, GRAPH_HEIGHT))
+            self.draw_graph_column(profiler, OVERLAY_WIDTH - 1, recorded_frames - 1)
+
+        budget_y = GRAPH_HEIGHT - round(GRAPH_HEIGHT * (1000 / GAME_FPS) / GRAPH_MS_RANGE)
+        draw.line(self.graph, WHITE_COLOR, (0, budget_y), (OVERLAY_WIDTH, budget_y))
+        self.graph_frame_count = profiler.frame_count
+
+    def get_lines(self, profiler: FrameProfiler) -> list[tuple[str, Color]]:
+        lines = [(f"{profiler.fps:5.1f} fps   worst {profiler.worst_frame:6.2f} ms   over {profiler.overrun_count}", WHITE_COLOR)]
+        for section in FrameSection:
+            lines.append((f"{section.value:8} {profiler.last_frame(section):6.2f} ms   avg {profiler.average(section):6.2f} ms", SECTION_COLORS[section]))
+        cache_rates = "  ".join(f"{name} {get_hit_rate(cached_function):.0%}" for name, cached_function in OVERLAY_CACHES.items())
+        lines.append((f"hits: {cache_rates}", WHITE_COLOR))
+        image_cache = ASSETS.cache_info()
+        lines.append((f"images {image_cache.resident_bytes / 2**20:5.1f} / {image_cache.budget_bytes / 2**20:.0f} MB", WHITE_COLOR))
+        return lines
+
+    def draw(self, frame: Surface, profiler: FrameProfiler) -> None:
+        self.update_graph(profiler)
+
+        panel = Surface((OVERLAY_WIDTH, OVERLAY_HEIGHT), SRCALPHA)
+        panel.fill(OVERLAY_BACKGROUND)
+        overlay_font = get_cached_font("pixel_font", OVERLAY_FONT_SIZE)
+        for line_number, (line, color) in enumerate(self.get_lines(profiler)):
+            panel.blit(overlay_font.render(line, True, color), (5, 5 + line_number * OVERLAY_LINE_HEIGHT))
+        panel.blit(self.graph, (0, OVERLAY_HEIGHT - GRAPH_HEIGHT))
+
+        frame.blit(panel, OVERLAY_POSITION)
+
+
 class PygameRenderer(ABC):
     def __init__(self) -> None:
         self.frame = display.set_mode((DISPLAY_WIDTH, DISPLAY_HEIGHT))
         display.set_caption(GAME_NAME)
-        self.fps_clock = time.Clock()  # Second clock with only purpose to record fps...
+        self.performance_overlay = PerformanceOverlay()
 
-    def draw_fps(self) -> None:
-        self.fps_clock.tick()
-        fps = round(self.fps_clock.get_fps())
-        draw_text(str(fps), self.frame, center_position=FPS_SCREEN_POSITION, scale_ratio=1.5)
+    def draw_performance_overlay(self) -> None:
+        if not FRAME_PROFILER.is_overlay_visible: return
+        self.performance_overlay.draw(self.frame, FRAME_PROFILER)
+        FRAME_PROFILER.skip()
 
     def render(self) -> None:
         self.draw_frame()
-        self.draw_fps()
+        FRAME_PROFILER.mark(FrameSection.DRAW)
+        self.draw_performance_overlay()
         display.update()
+        FRAME_PROFILER.mark(FrameSection.DISPLAY)
 
     @abstractmethod
     def draw_frame(self):
         ...
 
 
+class LoadingRenderer(PygameRenderer):
+    """Shown from the first frame while the preloader fills the asset cache, only uses fonts and plain shapes"""
+    def __init__(self, preloader: AssetPreloader) -> None:
+        super().__init__()
+        self.preloader = preloader
+
+    def draw_frame(self) -> None:
+        self.frame.fill(LOADING_BACKGROUND_COLOR)
+        title = get_text_surface(GAME_NAME, "pixel_font", 2 * DEFAULT_TEXT_SIZE, WHITE_COLOR)
+        self.frame.blit(title, title.get_rect(midbottom=(DISPLAY_WIDTH // 2, LOADING_BAR_RECT.top - 20)))
+
+        draw.rect(self.frame, WHITE_COLOR, LOADING_BAR_RECT, width=2)
+        filled_rect = LOADING_BAR_RECT.inflate(-8, -8)
+        filled_rect.width = round(filled_rect.width * self.preloader.progress)
+        draw.rect(self.frame, GREEN_COLOR, filled_rect)
+
+
 class CommandlineRenderer(Renderer):
     def __init__(self) -> None:
         self.ascii_graphic = "----<>----"
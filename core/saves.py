@@ -0,0 +1,119 @@
+import base64
+import logging
+import os
+import struct
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from rules.save_game import RunSnapshot, encode_run, decode_run
+from settings import IS_WEB_BUILD, SAVE_FILE_PATH, SAVE_STORAGE_KEY
+
+
+class SaveStorage(ABC):
+    @abstractmethod
+    def read(self) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def write(self, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self) -> None:
+        ...
+
+
+class FileSaveStorage(SaveStorage):
+    """Writes next to the old save and swaps it in, so a crash mid-write never leaves a broken save behind"""
+    def __init__(self, file_path: str = SAVE_FILE_PATH) -> None:
+        self.file_path = file_path
+
+    def read(self) -> Optional[bytes]:
+        if not os.path.exists(self.file_path): return None
+        with open(self.file_path, "rb") as file:
+            return file.read()
+
+    def write(self, data: bytes) -> None:
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        temporary_path = f"{self.file_path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, self.file_path)
+
+    def delete(self) -> None:
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+
+class LocalStorageSaveStorage(SaveStorage):
+    """The browser's localStorage under pygbag, which only holds strings"""
+    def __init__(self, key: str = SAVE_STORAGE_KEY) -> None:
+        import platform  # pygbag replaces the platform module with one exposing the browser window
+        self.local_storage = platform.window.localStorage  # type: ignore[attr-defined]
+        self.key = key
+
+    def read(self) -> Optional[bytes]:
+        encoded = self.local_storage.getItem(self.key)
+        return base64.b64decode(encoded) if encoded else None
+
+    def write(self, data: bytes) -> None:
+        self.local_storage.setItem(self.key, base64.b64encode(data).decode("ascii"))
+
+    def delete(self) -> None:
+        self.local_storage.removeItem(self.key)
+
+
+def create_save_storage() -> SaveStorage:
+    return LocalStorageSaveStorage() if IS_WEB_BUILD else FileSaveStorage()
+
+
+class RunSaver:
+    """
+    Encodes a snapshot of the run on every state transition and writes it out in the background, skipping the
+    write when nothing changed since the last save. Under pygbag there are no threads, but a save is only a
+    few hundred bytes, so it is written right away.
+    """
+    def __init__(self, storage: SaveStorage, use_threads: bool = not IS_WEB_BUILD) -> None:
+        self.storage = storage
+        self.executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(1, thread_name_prefix="run_saver") if use_threads else None
+        self.last_saved: Optional[bytes] = None
+
+    def save(self, snapshot: RunSnapshot) -> None:
+        data = encode_run(snapshot)
+        if data == self.last_saved: return
+        self.last_saved = data
+        if self.executor:
+            self.executor.submit(self.write, data)
+        else:
+            self.write(data)
+
+    def write(self, data: bytes) -> None:
+        try:
+            self.storage.write(data)
+        except OSError as error:
+            logging.warning(f"Could not save the run: {error}")
+
+    def load(self) -> Optional[RunSnapshot]:
+        """The saved run, an unreadable save is deleted so it can never block the next start"""
+        data = self.storage.read()
+        if not data: return None
+        try:
+            return decode_run(data)
+        except (ValueError, IndexError, KeyError, struct.error) as error:
+            logging.warning(f"Deleting unreadable save: {error}")
+            self.delete()
+            return None
+
+    def delete(self) -> None:
+        self.last_saved = None
+        try:
+            self.storage.delete()
+        except OSError as error:
+            logging.warning(f"Could not delete the save: {error}")
+
+    def close(self) -> None:
+        """Wait for the last save to be written"""
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
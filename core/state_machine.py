@@ -3,6 +3,7 @@ from typing import Optional
 from enum import Enum, auto
 
 from core.interfaces import UserInput
+from components.interaction_manager import InteractionManager
 
 
 class StateChoice(Enum):
@@ -16,6 +17,7 @@ class State(ABC):
     """Handles the specific behavior of a certain state"""
     def __init__(self) -> None:
         self.next_state: Optional[StateChoice] = None
+        self.interactions = InteractionManager()
 
     def is_state_done(self) -> bool:
         return bool(self.next_state)
@@ -27,6 +29,10 @@ class State(ABC):
         if not self.next_state: raise Exception("Trying to switch state without specifying where.")
         return self.next_state
 
+    def is_animating(self) -> bool:
+        """Whether the state changes on screen without any input, the engine idles at a lower rate otherwise"""
+        return bool(self.interactions.animating)
+
     def cleanup_state(self) -> None:
         self.next_state: Optional[StateChoice] = None
 
@@ -34,6 +40,18 @@ class State(ABC):
     def start_state(self) -> None:
         ...
 
+    def get_upcoming_state(self) -> Optional[StateChoice]:
+        """The state the player is about to go to, e.g. while hovering the button that leads there"""
+        return None
+
+    def prepare(self) -> None:
+        """Build what start_state needs ahead of the transition, it must stay valid whatever the player does meanwhile"""
+        pass
+
+    def resume_state(self) -> None:
+        """Called instead of start_state when a saved run continues here, the slots are already restored"""
+        pass
+
     @abstractmethod
     def loop(self, user_input: UserInput) -> None:
         ...
@@ -41,19 +59,37 @@ class State(ABC):
 
 class StateMachine(ABC):
     """Handles switching and activation of different states"""
-    def __init__(self, states: dict[StateChoice, State], start_state: StateChoice) -> None:
+    def __init__(self, states: dict[StateChoice, State], start_state: StateChoice, is_resumed: bool = False) -> None:
         self.states = states
         self.state: State = states[start_state]
-        self.state.start_state()
+        self.prepared_state: Optional[State] = None
+        if is_resumed:
+            self.state.resume_state()
+        else:
+            self.state.start_state()
 
     def switch_state(self, next_state: StateChoice) -> None:
         self.state.cleanup_state()
         self.state = self.states[next_state]
+        self.state.interactions.invalidate()  # Slots are shared between states, their hover may be stale
         self.state.start_state()
-        
+        self.prepared_state = None
+
+    def prepare_upcoming_state(self) -> None:
+        """Prepare the next state once while its transition is in sight, so switching to it only costs one frame"""
+        upcoming_state = self.state.get_upcoming_state()
+        if not upcoming_state: return
+        if self.states[upcoming_state] is self.prepared_state: return
+        self.prepared_state = self.states[upcoming_state]
+        self.prepared_state.prepare()
+
+    def is_animating(self) -> bool:
+        return self.state.is_state_done() or self.state.is_animating()
+
     def loop(self, user_input: UserInput) -> None:
         if self.state.is_state_done():
             next_state = self.state.get_next_state()
             self.switch_state(next_state)
 
         self.state.loop(user_input)
+        self.prepare_upcoming_state()
@@ -1,35 +1,83 @@
+import argparse
 import asyncio
+import random
+import time
 import pygame
-from core.interfaces import UserInput
-from core.input_listener import PygameInputListener
+from typing import Optional
+from core.interfaces import InputListener
+from core.engine import FramePacer, PygameEngine
+from core.input_listener import PygameInputListener, RecordingInputListener, ReplayInputListener
+from core.renderer import LoadingRenderer
+from core.saves import RunSaver, create_save_storage
+from assets.preloader import AssetPreloader
 from states.game import Game, GameRenderer
-from settings import GAME_FPS
+from settings import GAME_NAME
 
 pygame.init()
-clock = pygame.time.Clock()
 
-async def main() -> None:
+async def load_assets(input_listener: PygameInputListener) -> bool:
+    """
+    Show the loading screen until every image is preloaded, returns False if the window was closed meanwhile.
+    Paced like the engine, so under pygbag the browser gets control back between frames.
+    """
+    preloader = AssetPreloader()
+    loading_renderer = LoadingRenderer(preloader)
+    pacer = FramePacer()
+
+    while not preloader.is_done:
+        if input_listener.capture().is_quit:
+            return False
+        preloader.step()
+        loading_renderer.render()
+        await pacer.wait_for_next_frame()
+    return True
 
-    game = Game.new_game()
-    renderer = GameRenderer(game)
-    input_listener = PygameInputListener()
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=f"Play {GAME_NAME}")
+    parser.add_argument("--record", metavar="FILE", help="record every frame of input to this file")
+    parser.add_argument("--replay", metavar="FILE", help="play back a recording instead of reading input")
+    parser.add_argument("--seed", type=int, help="seed for the shop, rewards and abilities")
+    parser.add_argument("--new", action="store_true", help="start a new run instead of continuing the saved one")
+    arguments, _ = parser.parse_known_args()  # pygbag may pass arguments of its own
+    return arguments
 
-    running = True
-    while running:
-        clock.tick(GAME_FPS)
+def create_input_listener(arguments: argparse.Namespace, pygame_input_listener: PygameInputListener) -> tuple[InputListener, int]:
+    """The input listener for the game and the seed to start it with, a replay brings its own seed"""
+    if arguments.replay:
+        replay_input_listener = ReplayInputListener(arguments.replay, pygame_input_listener)
+        return replay_input_listener, replay_input_listener.seed
 
-        user_input: UserInput = input_listener.capture()
+    seed = arguments.seed if arguments.seed is not None else time.time_ns() % 2**32
+    if arguments.record:
+        return RecordingInputListener(pygame_input_listener, arguments.record, seed), seed
+    return pygame_input_listener, seed
 
-        game.loop(user_input)
+def create_game(arguments: argparse.Namespace) -> tuple[Game, Optional[RunSaver]]:
+    """Continue the saved run if there is one, recordings and replays always start a new run without saving"""
+    if arguments.record or arguments.replay:
+        return Game.new_game(), None
 
-        renderer.render()
+    saver = RunSaver(create_save_storage())
+    game = Game.new_game(saver) if arguments.new else Game.load_or_new_game(saver)
+    return game, saver
+
+async def main() -> None:
+    arguments = parse_arguments()
+    pygame_input_listener = PygameInputListener()
+    if not await load_assets(pygame_input_listener):
+        pygame.quit()
+        return
 
-        await asyncio.sleep(0)
+    input_listener, seed = create_input_listener(arguments, pygame_input_listener)
+    random.seed(seed)
+    game, saver = create_game(arguments)
 
-        if user_input.is_quit:
-            running = False
+    engine = PygameEngine(game, GameRenderer(game), input_listener)
+    await engine.run_async()
 
-    print("Exiting...")
-    pygame.quit()
+    if isinstance(input_listener, RecordingInputListener):
+        input_listener.close()
+    if saver:
+        saver.close()
 
-asyncio.run(main())
\ No newline at end of file
+asyncio.run(main())
@@ -0,0 +1,245 @@
+"""
+Headless render benchmark.
+
+Builds representative scenes offscreen with the SDL dummy video driver and times each renderer's draw_frame.
+A session recorded with `python main.py --record session.rti` can be replayed as well, timing loop and draw per frame.
+
+    python render_benchmark.py --frames 500 --output bench.json
+    python render_benchmark.py --baseline bench.json
+    python render_benchmark.py --replay session.rti
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import sys
+from time import perf_counter
+from typing import Callable, Final, Optional
+
+import pygame
+
+from core.interfaces import UserInput
+from core.input_listener import ReplayInputListener
+from core.renderer import PygameRenderer
+from rules import character_pool
+from components.character_slot import create_ally_slots, create_enemy_slots, create_bench_slots, create_shop_slots, \
+    create_trash_slot, create_reward_slots
+from rules.stages import StageEnemyGenerator
+from states.combat_state import CombatState, CombatRenderer
+from states.preparation_state import PreparationState, PreparationRenderer
+from states.reward_state import RewardState, RewardRenderer
+from states.shop_state import ShopState, ShopRenderer
+from states.game import Game, GameRenderer
+
+
+DEFAULT_FRAMES: Final[int] = 300
+WARMUP_FRAMES: Final[int] = 30
+DEFAULT_TOLERANCE: Final[float] = 0.10
+PERCENTILES: Final[tuple[int, ...]] = (50, 95, 99)
+
+
+def mouse_input(mouse_position: tuple[int, int], is_mouse1_down: bool = False) -> UserInput:
+    return UserInput(
+        is_quit = False,
+        is_mouse1_down = is_mouse1_down,
+        is_mouse1_up = False,
+        is_space_key_down = False,
+        mouse_position = mouse_position
+    )
+
+
+def fill_allies(ally_slots, bench_slots) -> None:
+    ally_slots[0].content = character_pool.Spinoswordaus()
+    ally_slots[1].content = character_pool.Macedon()
+    ally_slots[2].content = character_pool.Healamimus()
+    ally_slots[3].content = character_pool.Archeryptrx()
+    bench_slots[0].content = character_pool.Tripiketops()
+    bench_slots[1].content = character_pool.Dilophmageras()
+
+
+def build_shop_scene() -> PygameRenderer:
+    """Full shop and bench, with the mouse resting on a shop character so its tooltip shows"""
+    ally_slots, bench_slots = create_ally_slots(), create_bench_slots()
+    fill_allies(ally_slots, bench_slots)
+    shop_state = ShopState(ally_slots, bench_slots, create_shop_slots(), create_trash_slot())
+    shop_state.start_state()
+
+    renderer = ShopRenderer(shop_state)
+    hover_input = mouse_input(shop_state.shop_slots[1].center_coordinate)
+    for _ in range(WARMUP_FRAMES):
+        shop_state.loop(hover_input)
+        renderer.draw_frame()
+    return renderer
+
+
+def build_combat_scene() -> PygameRenderer:
+    """Four against four, frozen while an ability is highlighting its targets"""
+    ally_slots, enemy_slots = create_ally_slots(), create_enemy_slots()
+    fill_allies(ally_slots, create_bench_slots())
+    enemy_slots[0].content = character_pool.Tankylosaurus()
+    enemy_slots[1].content = character_pool.Dilophmageras()
+    enemy_slots[2].content = character_pool.Tripiketops()
+    enemy_slots[3].content = character_pool.Archeryptrx()
+
+    combat_state = CombatState(ally_slots, enemy_slots)
+    combat_state.start_state()
+
+    idle_input = mouse_input((0, 0))
+    for _ in range(1000):
+        combat_state.loop(idle_input)
+        characters = [slot.content for slot in ally_slots + enemy_slots if slot.content]
+        if any(character.is_attacking for character in characters) and any(character.is_defending for character in characters):
+            break
+    else:
+        raise RuntimeError("Combat never reached an ability, the scene would not be representative")
+
+    return CombatRenderer(combat_state)
+
+
+def build_drag_drop_scene() -> PygameRenderer:
+    """Preparation screen with an ally picked up and dragged across the field"""
+    ally_slots, bench_slots, enemy_slots = create_ally_slots(), create_bench_slots(), create_enemy_slots()
+    fill_allies(ally_slots, bench_slots)
+    preparation_state = PreparationState(ally_slots, bench_slots, enemy_slots, StageEnemyGenerator())
+    preparation_state.start_state()
+
+    renderer = PreparationRenderer(preparation_state)
+    preparation_state.loop(mouse_input(ally_slots[0].center_coordinate, is_mouse1_down=True))
+    assert preparation_state.drag_dropper.detached_slot
+    drag_input = mouse_input((400, 300))
+    for _ in range(WARMUP_FRAMES):
+        preparation_state.loop(drag_input)
+        renderer.draw_frame()
+    return renderer
+
+
+def build_reward_scene() -> PygameRenderer:
+    """Reward choice with the mouse over a buy button"""
+    ally_slots, bench_slots = create_ally_slots(), create_bench_slots()
+    fill_allies(ally_slots, bench_slots)
+    reward_state = RewardState(ally_slots, bench_slots, create_reward_slots(), create_trash_slot())
+    reward_state.start_state()
+
+    renderer = RewardRenderer(reward_state)
+    hover_input = mouse_input(reward_state.reward_slots[0].buy_button.rect.center)
+    for _ in range(WARMUP_FRAMES):
+        reward_state.loop(hover_input)
+        renderer.draw_frame()
+    return renderer
+
+
+SCENES: Final[dict[str, Callable[[], PygameRenderer]]] = {
+    "shop_tooltip":     build_shop_scene,
+    "combat_ability":   build_combat_scene,
+    "drag_drop":        build_drag_drop_scene,
+    "reward":           build_reward_scene,
+}
+
+
+def percentile(sorted_samples: list[float], percent: int) -> float:
+    index = min(len(sorted_samples) - 1, round(percent / 100 * (len(sorted_samples) - 1)))
+    return sorted_samples[index]
+
+
+def summarize(samples_ms: list[float]) -> dict[str, float]:
+    samples_ms = sorted(samples_ms)
+    result = {f"p{percent}_ms": round(percentile(samples_ms, percent), 4) for percent in PERCENTILES}
+    result["mean_ms"] = round(sum(samples_ms) / len(samples_ms), 4)
+    return result
+
+
+def time_draw_frame(renderer: PygameRenderer, frames: int) -> dict[str, float]:
+    samples_ms: list[float] = []
+    for _ in range(frames):
+        start = perf_counter()
+        renderer.draw_frame()
+        samples_ms.append((perf_counter() - start) * 1000)
+    return summarize(samples_ms)
+
+
+def time_replay(file_path: str) -> dict[str, float]:
+    """Game loop and draw of every recorded frame, started from the seed of the recording"""
+    input_listener = ReplayInputListener(file_path)
+    random.seed(input_listener.seed)
+    game = Game.new_game()
+    renderer = GameRenderer(game)
+
+    samples_ms: list[float] = []
+    while not input_listener.is_finished:
+        user_input = input_listener.capture()
+        start = perf_counter()
+        game.loop(user_input)
+        renderer.draw_frame()
+        samples_ms.append((perf_counter() - start) * 1000)
+    return summarize(samples_ms)
+
+
+def run_benchmark(frames: int, scene_names: list[str], replay_path: Optional[str] = None) -> dict:
+    random.seed(0)  # Same shop and reward rolls on every run
+    pygame.init()
+
+    results = {}
+    for scene_name in scene_names:
+        renderer = SCENES[scene_name]()
+        results[scene_name] = {"renderer": type(renderer).__name__, **time_draw_frame(renderer, frames)}
+    if replay_path:
+        results["replay"] = {"renderer": GameRenderer.__name__, **time_replay(replay_path)}
+
+    pygame.quit()
+    return {"frames": frames, "scenes": results}
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for scene_name, result in report["scenes"].items():
+        if scene_name not in baseline["scenes"]: continue
+        for percent in PERCENTILES:
+            key = f"p{percent}_ms"
+            before, after = baseline["scenes"][scene_name][key], result[key]
+            change = (after - before) / before if before else 0
+            print(f"{scene_name:16} {key:7} {before:8.3f} -> {after:8.3f} ms ({change:+.1%})")
+            if change > tolerance:
+                regressions.append(f"{scene_name} {key}")
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print(f"{'scene':16} {'renderer':20} " + " ".join(f"{'p' + str(percent):>8}" for percent in PERCENTILES) + " (ms)")
+    for scene_name, result in report["scenes"].items():
+        percentiles = " ".join(f"{result[f'p{percent}_ms']:8.3f}" for percent in PERCENTILES)
+        print(f"{scene_name:16} {result['renderer']:20} {percentiles}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time each renderer's draw_frame offscreen")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="measured frames per scene")
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=list(SCENES))
+    parser.add_argument("--replay", help="also time a recorded session, see main.py --record")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previously written JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown before failing, 0.1 = 10%%")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.frames, args.scenes, args.replay)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"Slower than baseline: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
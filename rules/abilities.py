@@ -1,10 +1,10 @@
 import logging
 import random
 from typing import TYPE_CHECKING, Optional
-from components.ability_handler import Ability, Delay, TriggerType
+from rules.ability_handler import Ability, Delay, TriggerType
 if TYPE_CHECKING: # Forward reference
-    from character import Character
-    from character_slot import CombatSlot
+    from rules.character import Character
+    from rules.slots import CombatSlot
 
 WAITING_DURATION_S = 0.3
 
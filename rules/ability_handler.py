@@ -5,8 +5,8 @@ from settings import GAME_FPS
 import logging
 
 if TYPE_CHECKING: # Forward reference
-    from character import Character
-    from character_slot import CombatSlot
+    from rules.character import Character
+    from rules.slots import CombatSlot
 
 
 ABILITY_DURATION_S: Final[float] = 1
@@ -0,0 +1,81 @@
+from __future__ import annotations
+import logging
+from typing import Optional
+from abc import ABC
+from rules.ability_handler import Ability, TriggerType
+from assets.image_choice import ImageChoice
+
+
+class Character(ABC):
+    name: str = "Character"
+    width_pixels: int = 100
+    height_pixels: int = 100
+    max_health: int = 5
+    damage: int = 2 # Put into basic attack instead?
+    range: int = 1
+    ability_type: Optional[type[Ability]] = None
+    ability_charges = None
+    character_image: ImageChoice
+    corpse_image = ImageChoice.CHARACTER_CORPSE
+    tier: int = 0
+
+    def __init__(self) -> None:
+        self._health = self.max_health
+        self.ability_queue: list[Ability] = []
+
+        self.target = None
+        self.attacker = None
+
+        self.combat_indicator: Optional[str] = None
+        self.is_attacking = False
+        self.is_defending = False
+        self.is_waiting = False
+
+    def attack(self) -> None:
+        self.queue_ability(TriggerType.ATTACK, attacker=None)
+
+    def do_damage(self, amount: int, attacker: Character) -> None:
+        if self.is_dead():
+            logging.debug(f"{attacker} attacks {self.name}, but they are already dead")
+            return
+        self.lose_health(amount)
+        if self.health == 0:
+            self.die(attacker)
+            return
+        self.queue_ability(TriggerType.DEFEND, attacker)
+
+    def lose_health(self, damage: int) -> None:
+        self._health = max(self._health - damage, 0)
+
+    def queue_ability(self, trigger_type: TriggerType, attacker: Optional[Character]) -> None:
+        if not self.ability_type: return
+        if not self.ability_type.trigger_type == trigger_type: return
+        ability = self.ability_type.from_trigger(self, attacker)
+        self.ability_queue.append(ability)
+
+    def die(self, attacker: 'Character') -> None:
+        self.queue_ability(TriggerType.DEATH, attacker)
+        logging.debug(f"{attacker.name} killed {self.name}")
+
+    def is_dead(self) -> bool:
+        return self._health == 0
+    
+    def restore_health(self, healing: int) -> None:
+        self._health = min(self._health + healing, self.max_health)
+
+    def raise_max_health(self, amount: int) -> None:
+        self.max_health += amount # Shared between instances?...
+
+    def is_full_health(self) -> bool:
+        return self._health == self.max_health
+
+    def revive(self) -> None:
+        self._health = self.max_health
+
+    def consume_ability_charge(self) -> None:
+        assert self.ability_charges
+        self.ability_charges -= 1
+
+    @property
+    def health(self) -> int:
+        return self._health
@@ -1,24 +1,30 @@
 from typing import Type, Sequence, Optional
 from random import choices, choice
-from components.character import Character
-from components.character_slot import CharacterSlot
-from assets.images import ImageChoice
-from components.ability_handler import Ability
-from components import abilities
+from rules.character import Character
+from rules.slots import Slot
+from rules.ability_handler import Ability
+from assets.image_choice import ImageChoice
+from rules import abilities
 
 # Configurable probabilities for each tier
 TIER_PROBABILITIES = [0.9, 0.08, 0.015, 0.005]
 # Combined tier dictionary for reference
 
 
-def generate_characters(slots: Sequence[CharacterSlot], character_tiers: dict[int, list[Type[Character]]], tier_probabilities: list[float]) -> None:
-    for slot in slots:
+def roll_characters(nr_characters: int, character_tiers: dict[int, list[Type[Character]]], tier_probabilities: list[float]) -> list[Character]:
+    characters: list[Character] = []
+    for _ in range(nr_characters):
         # Select tier based on configured probabilities
         selected_tier = choices(list(character_tiers.keys()), weights=tier_probabilities, k=1)[0]
         # Randomly select a character type from the chosen tier
         character_type = choice(character_tiers[selected_tier])
-        # Assign character to the slot
-        slot.content = character_type()
+        characters.append(character_type())
+    return characters
+
+
+def generate_characters(slots: Sequence[Slot], character_tiers: dict[int, list[Type[Character]]], tier_probabilities: list[float]) -> None:
+    for slot, character in zip(slots, roll_characters(len(slots), character_tiers, tier_probabilities)):
+        slot.content = character
 
 
 # Function to dynamically create CHARACTER_TIERS dictionary
@@ -0,0 +1,155 @@
+from typing import Optional, Final, Self
+import logging
+
+from rules.character import Character
+from rules.slots import CombatSlot
+from rules.ability_handler import AbilityHandler, TriggerType, Delay
+from rules.abilities import BasicAttack
+
+
+PAUSE_TIME_S: Final[float] = 0.2
+
+
+
+class BattleTurn:
+    def __init__(self, character: Character, acting_slot: CombatSlot, ally_slots: list[CombatSlot], enemy_slots: list[CombatSlot], turn_abilities: AbilityHandler) -> None:
+        self.is_done = False
+        self.acting_slot = acting_slot
+        self.character = character
+        self.ally_slots = ally_slots
+        self.enemy_slots = enemy_slots
+        self.turn_abilities = turn_abilities
+        self.post_attack_delay = Delay(PAUSE_TIME_S)  # Delay after attack or ability
+
+    @classmethod
+    def start_new_turn(cls, acting_slot: CombatSlot, ally_slots: list[CombatSlot], enemy_slots: list[CombatSlot]) -> Self:
+        assert acting_slot.content  # We should never be here if it was empty
+        character: Character = acting_slot.content
+        basic_attack = BasicAttack(character)
+        turn_abilities: AbilityHandler = AbilityHandler.turn_abilities(character, ally_slots, enemy_slots, basic_attack)
+        new_turn = cls(character, acting_slot, ally_slots, enemy_slots, turn_abilities)
+        return new_turn
+
+    def end_turn(self) -> None:
+        # Potential end of turn effects
+        self.is_done = True
+
+    def loop(self) -> None:
+        # subscribe to stream of new triggered abilities for characters
+        if not self.turn_abilities.is_done:
+            self.turn_abilities.activate()
+            return
+        
+        # Delay slightly after attack
+        if not self.post_attack_delay.is_done:
+            self.post_attack_delay.tick()
+            return
+        
+        self.end_turn()
+            
+
+def create_alternating_turn_order(ally_slots: list[CombatSlot], enemy_slots: list[CombatSlot]) -> list[CombatSlot]:
+    return [slot for pair in zip(ally_slots, enemy_slots) for slot in pair if slot.content and not slot.content.is_dead()] + ally_slots[len(enemy_slots):] + enemy_slots[len(ally_slots):]
+
+def create_simple_turn_order(ally_slots: list[CombatSlot], enemy_slots: list[CombatSlot]) -> list[CombatSlot]:
+    return [slot for slot in ally_slots + enemy_slots if slot.content and not slot.content.is_dead() ]
+
+
+def cleanup_dead_units(ally_slots: list[CombatSlot], enemy_slots: list[CombatSlot]) -> None:
+    """Remove dead characters from slots after a round."""
+    for slot in ally_slots + enemy_slots:
+        if slot.content and slot.content.is_dead():
+            character_name = slot.content.name  # Store the character's name before removing
+            logging.debug(f"Removing {character_name} from battlefield as they are dead.")
+            slot.content = None
+
+
+def shift_units_forward(ally_slots: list[CombatSlot], enemy_slots: list[CombatSlot]) -> None:
+    """Move all units forward to fill empty slots after a round."""
+    for slots in [ally_slots, enemy_slots]:
+        # Collect all non-empty characters
+        non_empty_slots = [slot.content for slot in slots if slot.content is not None]
+        
+        # Set all slots to None initially
+        for slot in slots:
+            slot.content = None
+        
+        # Fill the slots with non-empty characters
+        for i, character in enumerate(non_empty_slots):
+            slots[i].content = character
+
+
+
+class BattleRound:
+    def __init__(self, ally_slots: list[CombatSlot], enemy_slots: list[CombatSlot], slot_turn_order: list[CombatSlot], starting_abilities: AbilityHandler) -> None:
+        self.is_done = False
+        self.ally_slots = ally_slots
+        self.enemy_slots = enemy_slots
+        self.slot_turn_order: list[CombatSlot] = slot_turn_order
+        self.starting_abilities: AbilityHandler = starting_abilities
+        self.current_turn: Optional[BattleTurn] = None
+        self.round_start_delay = Delay(PAUSE_TIME_S)
+        self.round_end_delay = Delay(PAUSE_TIME_S)
+
+    @classmethod
+    def start_new_round(cls, ally_slots: list[CombatSlot], enemy_slots: list[CombatSlot]) -> Self:
+        slot_turn_order: list[CombatSlot] = create_alternating_turn_order(ally_slots, enemy_slots)
+        assert slot_turn_order # Something is wrong if this is empty, no loving characters?
+        starting_abilities = AbilityHandler.from_trigger(ally_slots, enemy_slots, TriggerType.ROUND_START)
+        new_round = cls(ally_slots, enemy_slots, slot_turn_order, starting_abilities)
+        return new_round
+
+    def start_next_turn(self) -> None:
+        next_slot = self.slot_turn_order.pop(0)
+        assert next_slot.content
+
+        if next_slot.content.is_dead():
+            logging.debug(f"{next_slot.content.name} is dead, skipping turn")
+            return # Try again next frame
+
+        self.current_turn = BattleTurn.start_new_turn(next_slot, self.ally_slots, self.enemy_slots)
+
+    def end_round(self) -> None:
+        cleanup_dead_units(self.ally_slots, self.enemy_slots)  # Clean up dead units at the end of the round
+        shift_units_forward(self.ally_slots, self.enemy_slots)  # Shift units forward to fill empty slots
+        self.is_done = True
+    
+    def any_turns_left(self) -> bool:
+        return bool(self.slot_turn_order)
+
+    def loop(self) -> None:
+        if not self.starting_abilities.is_done:
+            self.starting_abilities.activate()
+            return
+
+        if not self.round_start_delay.is_done:
+            self.round_start_delay.tick()
+            return
+
+        if not self.current_turn: # Allows us to wait for start of round abilities, happens exactly once
+            self.start_next_turn()
+            return
+
+        if not self.current_turn.is_done:
+            self.current_turn.loop()
+            return
+        
+        if self.any_turns_left():
+            self.start_next_turn()
+            return
+
+        if not self.round_end_delay.is_done:
+            self.round_end_delay.tick()
+            return
+
+        self.end_round()
+
+
+def revive_ally_characters(slots: list[CombatSlot]) -> None:
+    for slot in slots:
+        if slot.content:
+            slot.content.revive()
+            logging.debug(f"Revived {slot.content.name}")
+
+def is_everyone_dead(slots: list[CombatSlot]) -> bool:
+    return all(slot.content is None or slot.content.is_dead() for slot in slots)
@@ -0,0 +1,146 @@
+import struct
+from dataclasses import dataclass
+from typing import Final, Optional, Sequence
+
+from rules import character_pool
+from rules.character import Character
+from rules.slots import Slot
+
+
+SAVE_MAGIC: Final[bytes] = b"RTSV"
+SAVE_VERSION: Final[int] = 1
+SAVE_HEADER: Final[struct.Struct] = struct.Struct("<4sBBHHB")      # magic, version, state, gold, stage, number of slot groups
+SLOT_GROUP_HEADER: Final[struct.Struct] = struct.Struct("<B")       # number of slots
+CHARACTER_RECORD: Final[struct.Struct] = struct.Struct("<BHHHB")    # class id, health, max health, damage, ability charges
+EMPTY_SLOT_ID: Final[int] = 0
+NO_ABILITY_CHARGES: Final[int] = 255
+MAX_SAVED_VALUE: Final[int] = 0xFFFF                       # Gold, stage and stats are saved as unsigned shorts
+MAX_SAVED_ABILITY_CHARGES: Final[int] = NO_ABILITY_CHARGES - 1
+
+# Ids are written into saves, never reuse or renumber one, only append new characters
+CHARACTER_IDS: Final[dict[type[Character], int]] = {
+    character_pool.Pterapike:       1,
+    character_pool.Archeryptrx:     2,
+    character_pool.Stabiraptor:     3,
+    character_pool.Healamimus:      4,
+    character_pool.Tripiketops:     5,
+    character_pool.Tankylosaurus:   6,
+    character_pool.Macedon:         7,
+    character_pool.Velocirougue:    8,
+    character_pool.Bardomimus:      9,
+    character_pool.Triceros:        10,
+    character_pool.Dilophmageras:   11,
+    character_pool.Ateratops:       12,
+    character_pool.Krytoraptor:     13,
+    character_pool.Naturalis:       14,
+    character_pool.Alchemixus:      15,
+    character_pool.Spinoswordaus:   16,
+    character_pool.Battlemagodon:   17,
+    character_pool.Necrorex:        18,
+    character_pool.Quetza:          19,
+    character_pool.Aepycamelus:     20,
+    character_pool.Brontotherium:   21,
+    character_pool.Cranioceras:     22,
+    character_pool.Glypto:          23,
+    character_pool.Gorgono:         24,
+    character_pool.Mammoth:         25,
+    character_pool.Phorus:          26,
+    character_pool.Sabre:           27,
+    character_pool.Sloth:           28,
+    character_pool.Trilo:           29,
+}
+CHARACTER_TYPES: Final[dict[int, type[Character]]] = {class_id: character_type for character_type, class_id in CHARACTER_IDS.items()}
+
+
+def clamp_saved_value(value: int, maximum: int = MAX_SAVED_VALUE) -> int:
+    """Fit a value into its field of the save, a stat beyond what a run reaches is not worth a save that fails"""
+    return max(0, min(value, maximum))
+
+
+@dataclass(frozen=True)
+class CharacterRecord:
+    """The class and the stats that can change during a run, everything else comes from the class again"""
+    class_id: int
+    health: int
+    max_health: int
+    damage: int
+    ability_charges: Optional[int]
+
+    @classmethod
+    def from_character(cls, character: Character) -> "CharacterRecord":
+        ability_charges = None if character.ability_charges is None else clamp_saved_value(character.ability_charges, MAX_SAVED_ABILITY_CHARGES)
+        return cls(
+            CHARACTER_IDS[type(character)], clamp_saved_value(character.health), clamp_saved_value(character.max_health),
+            clamp_saved_value(character.damage), ability_charges
+        )
+
+    def to_character(self) -> Character:
+        character = CHARACTER_TYPES[self.class_id]()
+        character.max_health = self.max_health
+        character.damage = self.damage
+        character.ability_charges = self.ability_charges
+        character.revive()
+        character.lose_health(self.max_health - self.health)
+        return character
+
+
+SlotGroup = tuple[Optional[CharacterRecord], ...]
+
+
+@dataclass(frozen=True)
+class RunSnapshot:
+    """A whole run between two states, the slot groups are in the order the game hands them out"""
+    state: int
+    gold: int
+    stage: int
+    slot_groups: tuple[SlotGroup, ...]
+
+
+def record_slots(slots: Sequence[Slot]) -> SlotGroup:
+    return tuple(CharacterRecord.from_character(slot.content) if slot.content else None for slot in slots)
+
+
+def restore_slots(slots: Sequence[Slot], slot_group: SlotGroup) -> None:
+    if len(slots) != len(slot_group):
+        raise ValueError(f"Saved {len(slot_group)} slots, but there are {len(slots)} to restore")
+    for slot, record in zip(slots, slot_group):
+        slot.content = record.to_character() if record else None
+
+
+def encode_run(snapshot: RunSnapshot) -> bytes:
+    chunks = [SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, snapshot.state, snapshot.gold, snapshot.stage, len(snapshot.slot_groups))]
+    for slot_group in snapshot.slot_groups:
+        chunks.append(SLOT_GROUP_HEADER.pack(len(slot_group)))
+        for record in slot_group:
+            if not record:
+                chunks.append(bytes((EMPTY_SLOT_ID,)))
+                continue
+            ability_charges = NO_ABILITY_CHARGES if record.ability_charges is None else record.ability_charges
+            chunks.append(CHARACTER_RECORD.pack(record.class_id, record.health, record.max_health, record.damage, ability_charges))
+    return b"".join(chunks)
+
+
+def decode_run(data: bytes) -> RunSnapshot:
+    magic, version, state, gold, stage, nr_slot_groups = SAVE_HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC or version != SAVE_VERSION:
+        raise ValueError(f"Not a save of version {SAVE_VERSION}")
+    offset = SAVE_HEADER.size
+
+    slot_groups: list[SlotGroup] = []
+    for _ in range(nr_slot_groups):
+        (nr_slots,) = SLOT_GROUP_HEADER.unpack_from(data, offset)
+        offset += SLOT_GROUP_HEADER.size
+        slot_group: list[Optional[CharacterRecord]] = []
+        for _ in range(nr_slots):
+            if data[offset] == EMPTY_SLOT_ID:
+                slot_group.append(None)
+                offset += 1
+                continue
+            class_id, health, max_health, damage, ability_charges = CHARACTER_RECORD.unpack_from(data, offset)
+            if class_id not in CHARACTER_TYPES:
+                raise ValueError(f"Unknown character id {class_id} in save")
+            offset += CHARACTER_RECORD.size
+            slot_group.append(CharacterRecord(class_id, health, max_health, damage, None if ability_charges == NO_ABILITY_CHARGES else ability_charges))
+        slot_groups.append(tuple(slot_group))
+
+    return RunSnapshot(state, gold, stage, tuple(slot_groups))
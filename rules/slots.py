@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Protocol
+
+if TYPE_CHECKING: # Forward reference
+    from rules.character import Character
+
+
+NR_BATTLE_SLOTS_PER_TEAM = 4
+
+
+class Slot(Protocol):
+    """Anything a character can stand in, the rules only look at what is in it"""
+    content: Optional["Character"]
+
+
+class CombatSlot(Slot, Protocol):
+    """A slot on the battle line, the distance between two coordinates is the range needed to reach"""
+    coordinate: int
+
+
+@dataclass(eq=False)
+class SimulationSlot:
+    """Battle line slot without any position on screen, for running combat headless"""
+    coordinate: int
+    content: Optional["Character"] = None
+
+
+def create_simulation_slots() -> tuple[list[SimulationSlot], list[SimulationSlot]]:
+    """Allies and enemies facing each other with the same coordinates as on the battle screen"""
+    ally_slots = [SimulationSlot(NR_BATTLE_SLOTS_PER_TEAM - slot_nr) for slot_nr in range(NR_BATTLE_SLOTS_PER_TEAM)]
+    enemy_slots = [SimulationSlot(slot_nr + 1 + NR_BATTLE_SLOTS_PER_TEAM) for slot_nr in range(NR_BATTLE_SLOTS_PER_TEAM)]
+    return ally_slots, enemy_slots
@@ -0,0 +1,60 @@
+from typing import Final, Optional, Protocol
+from abc import ABC, abstractmethod
+from random import choice
+from rules import character_pool
+from rules.character import Character
+from rules.slots import CombatSlot
+
+
+ENEMY_POOL: Final[list[type[Character]]] = [
+    character_pool.Aepycamelus,
+    character_pool.Brontotherium,
+    character_pool.Cranioceras,
+    character_pool.Glypto,
+    character_pool.Gorgono,
+    character_pool.Mammoth,
+    character_pool.Phorus,
+    character_pool.Sabre,
+    character_pool.Sloth,
+    character_pool.Trilo,
+]
+
+# Character types only, the enemies are created when their stage starts
+ENEMY_STAGES: Final[list[list[type[Character]]]] = [
+    [character_pool.Trilo,            character_pool.Trilo],
+    [character_pool.Mammoth],
+    [character_pool.Aepycamelus,      character_pool.Aepycamelus,   character_pool.Aepycamelus],
+    [character_pool.Sloth,            character_pool.Sloth,         character_pool.Sloth],
+    [character_pool.Phorus,           character_pool.Sabre],
+    [character_pool.Brontotherium,    character_pool.Cranioceras],
+    [character_pool.Glypto,           character_pool.Gorgono]
+    ]
+
+
+class EnemyGenerator(ABC):
+    def __init__(self) -> None:
+        self.stage: int = 0
+
+    @abstractmethod
+    def create_enemies(self, nr_slots: int) -> list[Character]:
+        """The enemies of the next stage, without moving on to it"""
+        ...
+
+    def generate(self, slots: list[CombatSlot], enemies: Optional[list[Character]] = None) -> None:
+        """Place the next stage's enemies, or the ones created for it ahead of time"""
+        if enemies is None:
+            enemies = self.create_enemies(len(slots))
+        for enemy_index, enemy in enumerate(enemies):
+            slots[enemy_index].content = enemy
+        self.stage += 1
+
+
+class RandomEnemyGenerator(EnemyGenerator):
+    def create_enemies(self, nr_slots: int) -> list[Character]:
+        return [choice(ENEMY_POOL)() for _ in range(nr_slots)]
+
+
+class StageEnemyGenerator(EnemyGenerator):
+    def create_enemies(self, nr_slots: int) -> list[Character]:
+        stage_enemies: list[type[Character]] = ENEMY_STAGES[self.stage]
+        return [enemy_type() for enemy_type in stage_enemies]
@@ -1,9 +1,11 @@
+import sys
 from typing import Final, TypeAlias
 
 Vector: TypeAlias = tuple[int, int]
 Color: TypeAlias = tuple[int,int,int]
 
 GAME_NAME: Final[str] = "Rogue Troupe"
+IS_WEB_BUILD: Final[bool] = sys.platform == "emscripten"
 GAME_FPS: Final[int] = 60
 DISPLAY_WIDTH:  Final[int] = 800
 DISPLAY_HEIGHT: Final[int] = 600
@@ -16,4 +18,19 @@ BLUE_COLOR: Final[Color] = (0, 0, 255)
 YELLOW_COLOR: Final[Color] = (255, 255, 0)
 
 DEFAULT_TEXT_SIZE: Final[int] = 16
-DEFAULT_HOVER_SCALE_RATIO: Final[float] = 1.5
\ No newline at end of file
+DEFAULT_HOVER_SCALE_RATIO: Final[float] = 1.5
+HOVER_ANIMATION_FRAMES: Final[int] = 6
+PIXEL_PERFECT_HOVER: Final[bool] = True
+IMAGE_CACHE_BUDGET_BYTES: Final[int] = 48 * 1024 * 1024
+PRELOAD_BUDGET_SHARE: Final[float] = 0.5     # Of the image cache, the rest is left for the scaled variants
+
+SHOW_PERFORMANCE_OVERLAY: Final[bool] = False
+PERFORMANCE_HISTORY_FRAMES: Final[int] = 300
+
+ASSET_LOADER_THREADS: Final[int] = 4
+ASSET_LOADING_SLICE_MS: Final[float] = 12
+IDLE_FPS: Final[int] = 10
+IDLE_AFTER_FRAMES: Final[int] = GAME_FPS // 2
+
+SAVE_FILE_PATH: Final[str] = "saves/run.rts"
+SAVE_STORAGE_KEY: Final[str] = "rogue_troupe_run"
@@ -0,0 +1,140 @@
+"""
+Startup profile.
+
+Reports how long importing the game takes per module, measured in a fresh interpreter with -X importtime, and how
+long each initialization step takes until the first loading screen frame and the first game frame are shown.
+Exits with 1 if the project's own modules or the time to the first frame are over budget.
+
+    python startup_profile.py
+    python startup_profile.py --module states.game --top 20
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import subprocess
+import sys
+from time import perf_counter
+from typing import Callable, Final, NamedTuple, TypeVar
+
+
+PROJECT_PACKAGES: Final[tuple[str, ...]] = ("settings", "core", "rules", "components", "states", "assets")
+DEFAULT_MODULE: Final[str] = "states.game"
+DEFAULT_TOP: Final[int] = 15
+
+PROJECT_IMPORT_BUDGET_MS: Final[float] = 60
+FIRST_FRAME_BUDGET_MS: Final[float] = 250
+
+T = TypeVar("T")
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_ms: float
+    cumulative_ms: float
+
+    @property
+    def is_project_module(self) -> bool:
+        return self.module.split(".")[0] in PROJECT_PACKAGES
+
+
+class InitTiming(NamedTuple):
+    step: str
+    module: str
+    duration_ms: float
+
+
+def profile_imports(module: str = DEFAULT_MODULE) -> list[ImportTiming]:
+    """Import the module in a fresh interpreter, so nothing is cached from this process"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)) or None
+    )
+    timings: list[ImportTiming] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line: continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        timings.append(ImportTiming(name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return timings
+
+
+def get_project_import_ms(timings: list[ImportTiming]) -> float:
+    """Time spent in the project's own module bodies, third party imports are left out"""
+    return sum(timing.self_ms for timing in timings if timing.is_project_module)
+
+
+def profile_init() -> list[InitTiming]:
+    """The same steps main.py takes, from pygame.init() to the first rendered game frame"""
+    import pygame
+    from core.input_listener import NoInputListener
+    from core.renderer import LoadingRenderer
+    from assets.preloader import AssetPreloader
+    from states.game import Game, GameRenderer
+
+    timings: list[InitTiming] = []
+    def timed(step: str, module: str, run: Callable[[], T]) -> T:
+        start = perf_counter()
+        result = run()
+        timings.append(InitTiming(step, module, (perf_counter() - start) * 1000))
+        return result
+
+    timed("pygame.init", "pygame", pygame.init)
+    preloader = AssetPreloader()
+    loading_renderer = timed("loading screen", "core.renderer", lambda: LoadingRenderer(preloader))
+    timed("first loading frame", "core.renderer", loading_renderer.render)
+
+    def preload() -> None:
+        while not preloader.is_done:
+            preloader.step()
+    timed("asset preload", "assets.preloader", preload)
+
+    game = timed("new game", "states.game", Game.new_game)
+    renderer = timed("game renderer", "states.game", lambda: GameRenderer(game))
+
+    def first_frame() -> None:
+        game.loop(NoInputListener().capture())
+        renderer.render()
+    timed("first game frame", "states.game", first_frame)
+
+    pygame.quit()
+    return timings
+
+
+def get_first_frame_ms(timings: list[InitTiming]) -> float:
+    """Time until the loading screen is up, the rest happens behind it"""
+    first_frame_steps = ("pygame.init", "loading screen", "first loading frame")
+    return sum(timing.duration_ms for timing in timings if timing.step in first_frame_steps)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile import and initialization time at startup")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="module to import, like main.py does")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="number of slowest imports to list")
+    args = parser.parse_args()
+
+    import_timings = profile_imports(args.module)
+    total_import_ms = max((timing.cumulative_ms for timing in import_timings if timing.module == args.module), default=0.)
+    project_import_ms = get_project_import_ms(import_timings)
+
+    print(f"{'import':48} {'self ms':>9} {'total ms':>9}")
+    for timing in sorted(import_timings, key=lambda timing: timing.self_ms, reverse=True)[:args.top]:
+        marker = "*" if timing.is_project_module else " "
+        print(f"{marker}{timing.module:47} {timing.self_ms:9.2f} {timing.cumulative_ms:9.2f}")
+    print(f"import {args.module}: {total_import_ms:.1f} ms, project modules (*) {project_import_ms:.1f} ms "
+          f"of {PROJECT_IMPORT_BUDGET_MS:.0f} ms budget")
+    print()
+
+    init_timings = profile_init()
+    print(f"{'init step':24} {'module':20} {'ms':>9}")
+    for timing in init_timings:
+        print(f"{timing.step:24} {timing.module:20} {timing.duration_ms:9.2f}")
+    first_frame_ms = get_first_frame_ms(init_timings)
+    print(f"first frame after {first_frame_ms:.1f} ms of {FIRST_FRAME_BUDGET_MS:.0f} ms budget")
+
+    is_over_budget = project_import_ms > PROJECT_IMPORT_BUDGET_MS or first_frame_ms > FIRST_FRAME_BUDGET_MS
+    return 1 if is_over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,15 @@
-from typing import Self
+import logging
+from typing import Optional, Self, Sequence
 from pygame import Surface
 
 from core.interfaces import Loopable, UserInput
 from core.renderer import PygameRenderer
 from core.state_machine import StateMachine, State, StateChoice
-from components.character_slot import create_ally_slots, create_enemy_slots, create_bench_slots, create_shop_slots, \
+from core.saves import RunSaver
+from components.character_slot import CharacterSlot, create_ally_slots, create_enemy_slots, create_bench_slots, create_shop_slots, \
     create_trash_slot, create_reward_slots
-from components.stages import StageEnemyGenerator
+from rules.stages import StageEnemyGenerator
+from rules.save_game import RunSnapshot, clamp_saved_value, record_slots, restore_slots
 from states.combat_state import CombatState, CombatRenderer
 from states.preparation_state import PreparationState, PreparationRenderer
 from states.reward_state import RewardState, RewardRenderer
@@ -21,9 +24,13 @@ class NoGame(Loopable):
 
 
 class Game(StateMachine):
+    def __init__(self, states: dict[StateChoice, State], start_state: StateChoice, is_resumed: bool = False, saver: Optional[RunSaver] = None) -> None:
+        super().__init__(states, start_state, is_resumed)
+        self.saver = saver
+        self.save()
 
-    @classmethod
-    def new_game(cls) -> Self:
+    @staticmethod
+    def create_states() -> dict[StateChoice, State]:
         enemy_generator = StageEnemyGenerator()
 
         ally_slots   = create_ally_slots()
@@ -38,24 +45,102 @@ class Game(StateMachine):
         combat_state      = CombatState(ally_slots, enemy_slots)
         reward_state      = RewardState(ally_slots, bench_slots, reward_slots, trash_slot)
 
-        states: dict[StateChoice, State] = {
+        return {
             StateChoice.SHOP:           shop_state,
             StateChoice.PREPARATION:    preparation_state,
             StateChoice.BATTLE:         combat_state,
             StateChoice.REWARD:         reward_state
         }
 
-        return cls(states, start_state=StateChoice.SHOP)
+    @classmethod
+    def new_game(cls, saver: Optional[RunSaver] = None) -> Self:
+        return cls(cls.create_states(), start_state=StateChoice.SHOP, saver=saver)
+
+    @classmethod
+    def resume(cls, snapshot: RunSnapshot, saver: Optional[RunSaver] = None) -> Self:
+        """Rebuild a saved run, it continues in the state it was saved in without generating a new shop or stage"""
+        states = cls.create_states()
+        shop_state, preparation_state = get_shop_state(states), get_preparation_state(states)
+        for slots, slot_group in zip(get_slot_groups(states), snapshot.slot_groups, strict=True):
+            restore_slots(slots, slot_group)
+        shop_state.gold = snapshot.gold
+        preparation_state.enemy_generator.stage = snapshot.stage
+        return cls(states, start_state=StateChoice(snapshot.state), is_resumed=True, saver=saver)
+
+    @classmethod
+    def load_or_new_game(cls, saver: RunSaver) -> Self:
+        """Continue the saved run, a save that no longer fits the game is deleted and a new run is started"""
+        snapshot = saver.load()
+        if snapshot:
+            try:
+                return cls.resume(snapshot, saver)
+            except (ValueError, IndexError, KeyError) as error:
+                logging.warning(f"Deleting save that does not fit the game: {error}")
+                saver.delete()
+        return cls.new_game(saver)
+
+    def to_snapshot(self) -> RunSnapshot:
+        return RunSnapshot(
+            state = self.get_state_choice().value,
+            gold = clamp_saved_value(get_shop_state(self.states).gold),
+            stage = clamp_saved_value(get_preparation_state(self.states).enemy_generator.stage),
+            slot_groups = tuple(record_slots(slots) for slots in get_slot_groups(self.states))
+        )
+
+    def get_state_choice(self) -> StateChoice:
+        return next(state_choice for state_choice, state in self.states.items() if state is self.state)
+
+    def save(self) -> None:
+        if self.saver:
+            self.saver.save(self.to_snapshot())
+
+    def switch_state(self, next_state: StateChoice) -> None:
+        super().switch_state(next_state)
+        self.save()
+
+
+def get_shop_state(states: dict[StateChoice, State]) -> ShopState:
+    shop_state = states[StateChoice.SHOP]
+    assert isinstance(shop_state, ShopState)
+    return shop_state
+
+def get_preparation_state(states: dict[StateChoice, State]) -> PreparationState:
+    preparation_state = states[StateChoice.PREPARATION]
+    assert isinstance(preparation_state, PreparationState)
+    return preparation_state
+
+def get_reward_state(states: dict[StateChoice, State]) -> RewardState:
+    reward_state = states[StateChoice.REWARD]
+    assert isinstance(reward_state, RewardState)
+    return reward_state
+
+def get_slot_groups(states: dict[StateChoice, State]) -> tuple[Sequence[CharacterSlot], ...]:
+    """Every slot that holds a character between states, in the order they are saved"""
+    shop_state = get_shop_state(states)
+    return (
+        shop_state.ally_slots,
+        shop_state.bench_slots,
+        shop_state.shop_slots,
+        [shop_state.trash_slot],
+        get_reward_state(states).reward_slots,
+        get_preparation_state(states).enemy_slots,
+    )
 
 
 class GameRenderer(PygameRenderer):
     def __init__(self, game: Game) -> None:
         super().__init__()
         self.game = game
+        self.warmed_state: Optional[State] = None
 
     def draw_frame(self):
         self.render_game(self.frame, self.game.state)
 
+        if self.game.prepared_state is not self.warmed_state:
+            self.warmed_state = self.game.prepared_state
+            if self.warmed_state:
+                self.warm_state(self.frame, self.warmed_state)
+
     @staticmethod
     def render_game(frame: Surface, state: State):
         # Set the appropriate background image based on the game state
@@ -78,3 +163,19 @@ class GameRenderer(PygameRenderer):
 
             case _:
                 raise Exception(f"Unknown state to render: {state}")
+
+    @staticmethod
+    def warm_state(frame: Surface, state: State) -> None:
+        """Fill the caches of the state the game is about to switch to, after the current frame is drawn"""
+        match state:
+            case CombatState():
+                CombatRenderer.warm_combat_state(frame, state)
+
+            case PreparationState():
+                PreparationRenderer.warm_preparation_state(frame, state)
+
+            case RewardState():
+                RewardRenderer.warm_reward_state(frame, state)
+
+            case _:
+                pass
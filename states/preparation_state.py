@@ -1,16 +1,20 @@
 import pygame
 import logging
+from typing import Optional
 from core.interfaces import UserInput
 from core.state_machine import State, StateChoice
-from core.renderer import PygameRenderer
+from core.renderer import PygameRenderer, StaticLayer
 from components import character
-from components.stages import EnemyGenerator, draw_stage_number
-from components.character_slot import CharacterSlot, CombatSlot, draw_slot
-from components.drag_dropper import DragDropper, draw_drag_dropper
-from components.interactable import Button, draw_button
+from rules.stages import EnemyGenerator
+from rules.character import Character
+from components.character_slot import CharacterSlot, CombatSlot, draw_idle_slot, get_slot_layout
+from components.drag_dropper import DragDropper
+from components.interactable import Button, draw_text
+from components.sprites import SceneGroup, SceneCache, ButtonSprite, TooltipSprite, create_drag_dropper_sprites, \
+    create_slot_sprites, draw_scene, warm_character_caches
 
-from assets.images import IMAGES, ImageChoice
-from settings import DISPLAY_WIDTH, DISPLAY_HEIGHT
+from assets.images import ImageChoice
+from settings import DISPLAY_WIDTH, DISPLAY_HEIGHT, WHITE_COLOR
 
 
 class PreparationState(State):
@@ -20,18 +24,26 @@ class PreparationState(State):
         self.bench_slots = bench_slots
         self.enemy_slots = enemy_slots
         self.enemy_generator = enemy_generator
+        self.prepared_enemies: Optional[list[Character]] = None
         self.drag_dropper = DragDropper(ally_slots + bench_slots)
         self.continue_button = Button((400, 500), "Continue...")
+        self.interactions.register(*enemy_slots, *self.drag_dropper.slots, self.continue_button)
 
     def start_state(self) -> None:
         logging.info("Entering preparation phase")
-        self.enemy_generator.generate(self.enemy_slots)
+        self.enemy_generator.generate(self.enemy_slots, self.prepared_enemies)
+        self.prepared_enemies = None
+
+    def prepare(self) -> None:
+        if self.prepared_enemies is None:
+            self.prepared_enemies = self.enemy_generator.create_enemies(len(self.enemy_slots))
+
+    def get_upcoming_state(self) -> Optional[StateChoice]:
+        return StateChoice.BATTLE if self.continue_button.is_hovered else None
 
     def loop(self, user_input: UserInput) -> None:
-        for slot in self.enemy_slots:
-            slot.refresh(user_input.mouse_position)
+        self.interactions.update(user_input.mouse_position)
 
-        self.continue_button.refresh(user_input.mouse_position)
         if (self.continue_button.is_hovered and user_input.is_mouse1_up) or user_input.is_space_key_down:
             self.next_state = StateChoice.BATTLE
             logging.debug("Continue button clicked, switching states")
@@ -39,8 +51,54 @@ class PreparationState(State):
         self.drag_dropper.loop(user_input)
 
 
+def draw_stage_number(frame: pygame.Surface, stage: int) -> None:
+    center = (700,525)
+    pygame.draw.circle(frame, color=WHITE_COLOR, center = center, radius=25)
+    draw_text(str(stage), frame, center_position=center, scale_ratio=2)
+
+
+def draw_preparation_static_layer(layer: pygame.Surface, preparation_state: PreparationState) -> None:
+    background_image = character.get_scaled_image(ImageChoice.BACKGROUND_COMBAT_JUNGLE, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    layer.blit(background_image, (0, 0))
+
+    for slot in preparation_state.drag_dropper.slots + preparation_state.enemy_slots:
+        draw_idle_slot(layer, slot)
+
+    draw_stage_number(layer, preparation_state.enemy_generator.stage)
+
+
+def highlight_targets_of_hovered(preparation_state: PreparationState) -> None:
+    """Use the defending indicator to highlight who the hovered character will attack"""
+    for slot in preparation_state.enemy_slots:
+        if slot.content:
+            slot.content.is_defending = False
+
+    for slot in preparation_state.ally_slots:
+        has_target = False
+        if slot.content:
+            for enemy_slot in preparation_state.enemy_slots:
+                if not enemy_slot.content: continue
+                if enemy_slot.coordinate - slot.coordinate == slot.content.range:
+                    has_target = True
+                    if slot.is_hovered:
+                        enemy_slot.content.is_defending = True
+            # if not has_target:
+            #     slot.content.is_attacking = True
+
+
+def build_preparation_scene(preparation_state: PreparationState) -> SceneGroup:
+    tooltip = TooltipSprite()
+    return SceneGroup(
+        *create_drag_dropper_sprites(preparation_state.drag_dropper, tooltip),
+        ButtonSprite(preparation_state.continue_button),
+        *create_slot_sprites(preparation_state.enemy_slots, tooltip, is_enemy=True),
+        tooltip
+    )
+
+
 class PreparationRenderer(PygameRenderer):
-    background_image = pygame.transform.scale(IMAGES[ImageChoice.BACKGROUND_COMBAT_JUNGLE], (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    static_layer = StaticLayer(draw_preparation_static_layer)
+    scenes = SceneCache(build_preparation_scene)
 
     def __init__(self, preparation_state: PreparationState) -> None:
         super().__init__()
@@ -51,36 +109,18 @@ class PreparationRenderer(PygameRenderer):
 
     @staticmethod
     def render_preparation_state(frame, preparation_state: PreparationState) -> None:
-        frame.blit(PreparationRenderer.background_image, (0, 0))
-
-        draw_drag_dropper(frame, preparation_state.drag_dropper)
-
-        draw_button(frame, preparation_state.continue_button )
-
-        draw_stage_number(frame, preparation_state.enemy_generator.stage)
+        layout_key = (
+            get_slot_layout(preparation_state.drag_dropper.slots + preparation_state.enemy_slots),
+            preparation_state.enemy_generator.stage
+        )
+        PreparationRenderer.static_layer.draw(frame, preparation_state, layout_key)
 
-        for slot in preparation_state.enemy_slots:
-            draw_slot(frame, slot)
+        highlight_targets_of_hovered(preparation_state)
 
-            scale_ratio = 1.5 if slot.is_hovered else 1
-            is_enemy_slot = slot in preparation_state.enemy_slots
+        draw_scene(frame, PreparationRenderer.scenes.get(preparation_state))
 
-            if not slot.content: continue
-
-            character.draw_character(frame, slot.center_coordinate, slot.content, is_enemy_slot, scale_ratio = scale_ratio, slot_is_hovered = slot.is_hovered)
-            
-            #Reset defend indicator of enemies
-            slot.content.is_defending = False
-
-        # Use the defending indicator to highlight who character will attack
-        for slot in preparation_state.ally_slots:
-            has_target = False
-            if slot.content:
-                for enemy_slot in preparation_state.enemy_slots:
-                    if not enemy_slot.content: continue
-                    if enemy_slot.coordinate - slot.coordinate == slot.content.range:
-                        has_target = True
-                        if slot.is_hovered:
-                            enemy_slot.content.is_defending = True
-                # if not has_target:
-                #     slot.content.is_attacking = True
+    @staticmethod
+    def warm_preparation_state(frame, preparation_state: PreparationState) -> None:
+        # The static layer shows the stage number, which only changes when the state starts
+        PreparationRenderer.scenes.get(preparation_state)
+        warm_character_caches(preparation_state.prepared_enemies or [], is_enemy=True)
@@ -2,17 +2,20 @@ import logging
 import pygame
 from typing import Optional, Sequence, Final
 
-from components.drag_dropper import DragDropper, draw_drag_dropper
-from core.renderer import PygameRenderer
+from components.drag_dropper import DragDropper
+from core.renderer import PygameRenderer, StaticLayer
 from core.interfaces import UserInput
 from core.state_machine import State, StateChoice
-from components.character_slot import CharacterSlot, CombatSlot, ShopSlot, draw_slot
-from components.interactable import Button, draw_button
-from components.character import draw_character
-from components.character_pool import generate_characters, CHARACTER_TIERS, TIER_PROBABILITIES
+from components.character_slot import CharacterSlot, CombatSlot, ShopSlot, draw_idle_slot, get_slot_layout
+from components.interactable import Button
+from components.character import get_scaled_image
+from components.sprites import SceneGroup, SceneCache, ButtonSprite, TooltipSprite, create_drag_dropper_sprites, \
+    create_slot_sprites, draw_scene, warm_character_caches
+from rules.character import Character
+from rules.character_pool import roll_characters, CHARACTER_TIERS, TIER_PROBABILITIES
 from settings import Vector, DISPLAY_WIDTH, DISPLAY_HEIGHT
-from states.shop_state import fight_button_image, TrashButton
-from assets.images import IMAGES, ImageChoice
+from states.shop_state import get_fight_button_image, TrashButton
+from assets.images import ImageChoice
 
 
 SKIP_BUTTON_POSITION: Final[Vector] = (500,400)
@@ -31,23 +34,38 @@ class RewardState(State):
         self.trash_slot = trash_slot
         self.bench_slots = bench_slots
         self.reward_slots = reward_slots
-        self.skip_button = Button( SKIP_BUTTON_POSITION, "Skip", fight_button_image )
+        self.prepared_rewards: Optional[list[Character]] = None
+        self.skip_button = Button( SKIP_BUTTON_POSITION, "Skip", get_fight_button_image() )
         self.trash_button = TrashButton.create_below_slot(trash_slot)
         self.drag_dropper = DragDropper(ally_slots + bench_slots + [trash_slot])
+        self.interactions.register(
+            *self.drag_dropper.slots, *reward_slots, *[slot.buy_button for slot in reward_slots],
+            self.skip_button, self.trash_button
+        )
 
     def start_state(self) -> None:
         logging.info("Entering reward phase")
-        generate_characters(self.reward_slots, CHARACTER_TIERS, TIER_PROBABILITIES)
+        self.prepare()
+        assert self.prepared_rewards
+        for slot, character in zip(self.reward_slots, self.prepared_rewards):
+            slot.content = character
+        self.prepared_rewards = None
+
+    def prepare(self) -> None:
+        if self.prepared_rewards is None:
+            self.prepared_rewards = roll_characters(len(self.reward_slots), CHARACTER_TIERS, TIER_PROBABILITIES)
+
+    def get_upcoming_state(self) -> Optional[StateChoice]:
+        is_leaving = self.skip_button.is_hovered or any(slot.content and slot.buy_button.is_hovered for slot in self.reward_slots)
+        return StateChoice.PREPARATION if is_leaving else None
 
     def exit_state(self) -> None:
         self.next_state = StateChoice.PREPARATION
 
     def loop(self, user_input: UserInput) -> None:
-        for slot in self.ally_slots + self.bench_slots + self.reward_slots:
-            slot.refresh(user_input.mouse_position)
+        self.interactions.update(user_input.mouse_position)
 
         for slot in self.reward_slots:
-            slot.buy_button.refresh(user_input.mouse_position)
             if not slot.content: continue
             if not (slot.buy_button.is_hovered and user_input.is_mouse1_up): continue
 
@@ -60,22 +78,40 @@ class RewardState(State):
             self.exit_state()
             logging.debug("Reward chosen, switching states")
 
-        self.skip_button.refresh(user_input.mouse_position)
         if (self.skip_button.is_hovered and user_input.is_mouse1_up) or user_input.is_space_key_down:
             self.exit_state()
             logging.debug("Skip button clicked, switching states")
 
         self.drag_dropper.loop(user_input)
 
-        self.trash_button.refresh(user_input.mouse_position)
         if self.trash_button.is_hovered and user_input.is_mouse1_up:
             if not self.trash_slot.content: return
             self.trash_slot.content = None
 
 
+def draw_reward_static_layer(layer: pygame.Surface, reward_state: RewardState) -> None:
+    background_image = get_scaled_image(ImageChoice.BACKGROUND_COMBAT_JUNGLE, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    layer.blit(background_image, (0, 0))
+
+    for slot in reward_state.reward_slots + reward_state.drag_dropper.slots:
+        draw_idle_slot(layer, slot)
+
+
+def build_reward_scene(reward_state: RewardState) -> SceneGroup:
+    tooltip = TooltipSprite()
+    return SceneGroup(
+        ButtonSprite(reward_state.skip_button),
+        ButtonSprite(reward_state.trash_button),
+        *[ButtonSprite(slot.buy_button) for slot in reward_state.reward_slots],
+        *create_slot_sprites(reward_state.reward_slots, tooltip),
+        *create_drag_dropper_sprites(reward_state.drag_dropper, tooltip),
+        tooltip
+    )
+
+
 class RewardRenderer(PygameRenderer):
-    background_image = pygame.transform.scale(IMAGES[ImageChoice.BACKGROUND_COMBAT_JUNGLE],
-                                              (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    static_layer = StaticLayer(draw_reward_static_layer)
+    scenes = SceneCache(build_reward_scene)
 
     def __init__(self, reward_state: RewardState) -> None:
         super().__init__()
@@ -86,21 +122,14 @@ class RewardRenderer(PygameRenderer):
 
     @staticmethod
     def render_reward_state(frame, reward_state: RewardState) -> None:
-        frame.blit(RewardRenderer.background_image, (0, 0))
+        layout_key = get_slot_layout(reward_state.reward_slots + reward_state.drag_dropper.slots)
+        RewardRenderer.static_layer.draw(frame, reward_state, layout_key)
 
-        draw_button(frame, reward_state.skip_button)
-        draw_button(frame, reward_state.trash_button)
+        draw_scene(frame, RewardRenderer.scenes.get(reward_state))
 
-        for slot in reward_state.reward_slots:
-            draw_button(frame, slot.buy_button)
-
-        for slot in reward_state.reward_slots:
-            draw_slot(frame, slot)
-
-            scale_ratio = 1.5 if slot.is_hovered else 1
-
-            if not slot.content: continue
-
-            draw_character(frame, slot.center_coordinate, slot.content, is_enemy= False, scale_ratio=scale_ratio, slot_is_hovered=slot.is_hovered)
-
-        draw_drag_dropper(frame, reward_state.drag_dropper)
\ No newline at end of file
+    @staticmethod
+    def warm_reward_state(frame, reward_state: RewardState) -> None:
+        layout_key = get_slot_layout(reward_state.reward_slots + reward_state.drag_dropper.slots)
+        RewardRenderer.static_layer.prepare(frame, reward_state, layout_key)
+        RewardRenderer.scenes.get(reward_state)
+        warm_character_caches(reward_state.prepared_rewards or [])
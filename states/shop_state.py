@@ -1,18 +1,19 @@
-from typing import Final
+from typing import Final, Optional
 import pygame
 import logging
-from functools import lru_cache
 from typing import Self
 
 from core.interfaces import UserInput
 from core.state_machine import State, StateChoice
-from core.renderer import PygameRenderer
-from components.character_slot import CharacterSlot, CombatSlot, ShopSlot
-from components.character_pool import generate_characters, CHARACTER_TIERS, TIER_PROBABILITIES
-from components.drag_dropper import DragDropper, draw_drag_dropper
-from components.interactable import Button, draw_button
-from assets.images import IMAGES, ImageChoice
-from settings import Vector, DISPLAY_WIDTH, DISPLAY_HEIGHT, DEFAULT_TEXT_SIZE, BLACK_COLOR, RED_COLOR
+from core.renderer import PygameRenderer, StaticLayer
+from components.character import get_scaled_image
+from components.character_slot import CharacterSlot, CombatSlot, ShopSlot, draw_idle_slot, get_slot_layout
+from rules.character_pool import generate_characters, CHARACTER_TIERS, TIER_PROBABILITIES
+from components.drag_dropper import DragDropper
+from components.interactable import Button
+from components.sprites import SceneGroup, SceneCache, ButtonSprite, TextSprite, TooltipSprite, create_drag_dropper_sprites, draw_scene
+from assets.images import ImageChoice, ImageVariant
+from settings import Vector, DISPLAY_WIDTH, DISPLAY_HEIGHT, BLACK_COLOR, RED_COLOR
 
 
 STARTING_GOLD: Final[int] = 10
@@ -24,26 +25,18 @@ FIGHT_BUTTON_SIZE = 150
 REROLL_BUTTON_POSITION = (350, 50)
 FIGHT_BUTTON_POSITION = (500, 400)
 
-fight_button_image = pygame.transform.scale(
-    IMAGES[ImageChoice.FIGHT_BUTTON], (FIGHT_BUTTON_SIZE, FIGHT_BUTTON_SIZE)
-)
-reroll_button_image = pygame.transform.scale(
-    IMAGES[ImageChoice.REROLL_BUTTON], (REROLL_BUTTON_SIZE, REROLL_BUTTON_SIZE)
-)
-
 # Gold icon settings
 GOLD_ICON_SIZE = 90
 GOLD_ICON_POSITION = (10, 10)
-gold_icon_image = pygame.transform.scale(
-    IMAGES[ImageChoice.GOLD_ICON], (GOLD_ICON_SIZE, GOLD_ICON_SIZE)
-)
 
 GOLD_BACK_WIDTH = 80
 GOLD_BACK_HEIGHT = 56
 GOLD_BACK_POSITION = (GOLD_ICON_POSITION[0] + 60, GOLD_ICON_POSITION[1] + 16)
-gold_back_image = pygame.transform.scale(
-    IMAGES[ImageChoice.GOLD_BACK], (GOLD_BACK_WIDTH, GOLD_BACK_HEIGHT)
-)
+GOLD_TEXT_POSITION = (GOLD_ICON_POSITION[0] + 103, GOLD_ICON_POSITION[1] + 45)
+
+
+def get_fight_button_image() -> ImageVariant:
+    return ImageVariant(ImageChoice.FIGHT_BUTTON, (FIGHT_BUTTON_SIZE, FIGHT_BUTTON_SIZE))
 
 
 class TrashButton(Button):
@@ -59,34 +52,11 @@ class TrashButton(Button):
         return cls((button_x, button_y), "Trash")
 
 # Utility functions
-@lru_cache(maxsize=128)
-def get_cached_font(font_name: str, font_size: int):
-    return pygame.font.SysFont(name=font_name, size=font_size)
-
-
 def switch_slots(slot_a: CharacterSlot, slot_b: CharacterSlot) -> None:
     slot_a.content, slot_b.content = slot_b.content, slot_a.content
     logging.debug(f"Switched slots between {slot_a.content} and {slot_b.content}")
 
 
-def draw_text(
-    text_content: str,
-    window: pygame.Surface,
-    center_position: Vector,
-    scale_ratio: float = 1,
-    font_name: str = "pixel_font",
-    color: tuple[int, int, int] = BLACK_COLOR,
-) -> None:
-    font_size: int = round(DEFAULT_TEXT_SIZE * scale_ratio)
-    text_font = get_cached_font(font_name, font_size)
-    text = text_font.render(text_content, True, color)
-    text_topleft_position = (
-        center_position[0] - text.get_width() / 2,
-        center_position[1] - text.get_height() / 2,
-    )
-    window.blit(text, text_topleft_position)
-
-
 class ShopState(State):
     def __init__(self, ally_slots: list[CombatSlot], bench_slots: list[CharacterSlot], shop_slots: list[CharacterSlot], trash_slot: CharacterSlot) -> None:
         super().__init__()
@@ -96,14 +66,18 @@ class ShopState(State):
         self.trash_slot = trash_slot
         self.trash_button = TrashButton.create_below_slot(trash_slot)
         self.start_combat_button = Button(
-            FIGHT_BUTTON_POSITION, "Start Combat", fight_button_image
+            FIGHT_BUTTON_POSITION, "Start Combat", get_fight_button_image()
         )
         self.reroll_button = Button(
-            REROLL_BUTTON_POSITION, "Reroll", reroll_button_image
+            REROLL_BUTTON_POSITION, "Reroll", ImageVariant(ImageChoice.REROLL_BUTTON, (REROLL_BUTTON_SIZE, REROLL_BUTTON_SIZE))
         )
         self.gold = STARTING_GOLD
         self.drag_dropper       = DragDropper(ally_slots + bench_slots + [trash_slot], self)
         self.drag_dropper_shop  = DragDropper(self.shop_slots, self)
+        self.interactions.register(
+            *self.drag_dropper.slots, *self.shop_slots, *[slot.buy_button for slot in shop_slots],
+            self.start_combat_button, self.reroll_button, self.trash_button
+        )
 
     def reset_gold(self):
         self.gold = STARTING_GOLD
@@ -111,6 +85,9 @@ class ShopState(State):
     def start_state(self) -> None:
         generate_characters(self.shop_slots, CHARACTER_TIERS, TIER_PROBABILITIES)
 
+    def get_upcoming_state(self) -> Optional[StateChoice]:
+        return StateChoice.PREPARATION if self.start_combat_button.is_hovered and self.is_there_allies() else None
+
     def is_there_allies(self) -> bool:
         return bool(self.ally_slots)
 
@@ -120,25 +97,22 @@ class ShopState(State):
             generate_characters(self.shop_slots, CHARACTER_TIERS, TIER_PROBABILITIES)
 
     def loop(self, user_input: UserInput) -> None:
+        self.interactions.update(user_input.mouse_position)
         self.drag_dropper.loop(user_input)
         self.drag_dropper_shop.loop(user_input)
 
-        self.start_combat_button.refresh(user_input.mouse_position)
         if (self.start_combat_button.is_hovered and user_input.is_mouse1_up) or user_input.is_space_key_down:
             if not self.is_there_allies(): return
             self.next_state = StateChoice.PREPARATION
             self.reset_gold()
 
-        self.reroll_button.refresh(user_input.mouse_position)
         if self.reroll_button.is_hovered and user_input.is_mouse1_up:
             self.reroll_shop()
 
         for slot in self.shop_slots:
-            slot.buy_button.refresh(user_input.mouse_position)
             if slot.content and slot.buy_button.is_hovered and user_input.is_mouse1_up:
                 self.buy_unit(slot)
 
-        self.trash_button.refresh(user_input.mouse_position)
         if self.trash_button.is_hovered and user_input.is_mouse1_up:
             if not self.trash_slot.content: return
             self.trash_slot.content = None
@@ -157,18 +131,41 @@ class ShopState(State):
                 break
 
 
-def draw_gold(shop_frame: pygame.Surface, balance: int):
-    gold_text_position = (GOLD_ICON_POSITION[0] + 103, GOLD_ICON_POSITION[1] + 45)
-    shop_frame.blit(gold_back_image, GOLD_BACK_POSITION)
-    shop_frame.blit(gold_icon_image, GOLD_ICON_POSITION)
+def draw_gold_background(shop_frame: pygame.Surface) -> None:
+    shop_frame.blit(get_scaled_image(ImageChoice.GOLD_BACK, (GOLD_BACK_WIDTH, GOLD_BACK_HEIGHT)), GOLD_BACK_POSITION)
+    shop_frame.blit(get_scaled_image(ImageChoice.GOLD_ICON, (GOLD_ICON_SIZE, GOLD_ICON_SIZE)), GOLD_ICON_POSITION)
 
-    gold_text = f"{balance}"
-    text_color = BLACK_COLOR if balance > 0 else RED_COLOR
-    draw_text(gold_text, shop_frame, gold_text_position, 3.5, "pixel_font", text_color)
+
+def draw_shop_static_layer(layer: pygame.Surface, shop_state: ShopState) -> None:
+    background_image = get_scaled_image(ImageChoice.BACKGROUND_SHOP_JUNGLE, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    layer.blit(background_image, (0, 0))
+
+    draw_gold_background(layer)
+
+    for slot in shop_state.drag_dropper_shop.slots + shop_state.drag_dropper.slots:
+        draw_idle_slot(layer, slot)
+
+
+def build_shop_scene(shop_state: ShopState) -> SceneGroup:
+    tooltip = TooltipSprite()
+    return SceneGroup(
+        TextSprite(
+            lambda: str(shop_state.gold), GOLD_TEXT_POSITION, 3.5,
+            get_color=lambda: BLACK_COLOR if shop_state.gold > 0 else RED_COLOR
+        ),
+        *[ButtonSprite(slot.buy_button, is_visible=lambda slot=slot: bool(slot.content)) for slot in shop_state.shop_slots],
+        ButtonSprite(shop_state.start_combat_button),
+        ButtonSprite(shop_state.reroll_button),
+        ButtonSprite(shop_state.trash_button),
+        *create_drag_dropper_sprites(shop_state.drag_dropper_shop, tooltip),
+        *create_drag_dropper_sprites(shop_state.drag_dropper, tooltip),
+        tooltip
+    )
 
 
 class ShopRenderer(PygameRenderer):
-    background_image = pygame.transform.scale(IMAGES[ImageChoice.BACKGROUND_SHOP_JUNGLE], (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+    static_layer = StaticLayer(draw_shop_static_layer)
+    scenes = SceneCache(build_shop_scene)
 
     def __init__(self, shop_state: ShopState) -> None:
         super().__init__()
@@ -179,18 +176,7 @@ class ShopRenderer(PygameRenderer):
 
     @staticmethod
     def render_shop_state(frame: pygame.Surface, shop_state: ShopState) -> None:
-        frame.blit(ShopRenderer.background_image, (0, 0))
-
-        draw_gold(frame, shop_state.gold)
-
-        for slot in shop_state.shop_slots:
-            if slot.content:
-                draw_button(frame, slot.buy_button)
-
-        draw_button(frame, shop_state.start_combat_button)
-        draw_button(frame, shop_state.reroll_button)
-        draw_button(frame, shop_state.trash_button)
-
-        draw_drag_dropper(frame, shop_state.drag_dropper_shop)
-        draw_drag_dropper(frame, shop_state.drag_dropper)
+        layout_key = get_slot_layout(shop_state.drag_dropper_shop.slots + shop_state.drag_dropper.slots)
+        ShopRenderer.static_layer.draw(frame, shop_state, layout_key)
 
+        draw_scene(frame, ShopRenderer.scenes.get(shop_state))
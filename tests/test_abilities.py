@@ -1,8 +1,8 @@
-from components.character import Character
-from components import character_pool
-from components import abilities
+from rules.character import Character
+from rules import character_pool
+from rules import abilities
 from components.character_slot import CombatSlot
-from states.combat_state import BattleTurn, BattleRound, AbilityHandler
+from rules.combat import BattleTurn, BattleRound, AbilityHandler
 
 
 slot = CombatSlot((0, 0), 0, (0, 0, 0))
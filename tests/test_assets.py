@@ -0,0 +1,86 @@
+from assets.images import AssetManager, BakedBundle, DerivedKey, ImageChoice, ImageVariant, get_resident_bytes
+
+
+def test_asset_manager_stays_within_budget() -> None:
+    # Room for two 100x100 variants, the full resolution originals are too large to be cached at all
+    asset_manager = AssetManager(budget_bytes=2 * 100 * 100 * 4)
+
+    for image_key in (ImageChoice.CHARACTER_SPINO, ImageChoice.CHARACTER_VELO, ImageChoice.CHARACTER_RAPTOR):
+        asset_manager.get_scaled(image_key, (100, 100))
+        assert asset_manager.resident_bytes <= asset_manager.budget_bytes
+
+    assert asset_manager.cache_info().evictions > 0
+    assert set(asset_manager.memory_report()) == {ImageChoice.CHARACTER_VELO, ImageChoice.CHARACTER_RAPTOR}
+
+def test_asset_manager_reuses_scaled_variants() -> None:
+    asset_manager = AssetManager()
+
+    first = asset_manager.get_scaled(ImageChoice.SLOT, (50, 50))
+    second = asset_manager.get_scaled(ImageChoice.SLOT, (50, 50))
+
+    assert first is second
+    assert asset_manager.cache_info().hits == 1
+    assert asset_manager.get_scaled(ImageChoice.SLOT, (50, 50), flip=True) is not first
+
+def test_derived_images_count_towards_the_budget() -> None:
+    asset_manager = AssetManager(budget_bytes=4 * 1024 * 1024)
+    variant, scale_ratios = ImageVariant(ImageChoice.CHARACTER_SPINO, (100, 100)), (1., 1.2, 1.4, 1.5)
+
+    frame = asset_manager.get_hover_frame(variant, scale_ratios, 2)
+    frame_mask = asset_manager.get_hover_mask(variant, scale_ratios, 2)
+    assert frame.get_size() == frame_mask.get_size() == (140, 140)
+    assert asset_manager.get_hover_frame(variant, scale_ratios, 3).get_size() == (150, 150)
+
+    # The frames in between, their masks and the grown variant are all budgeted entries of the image they are made from
+    derived = [key for key in asset_manager.variants if isinstance(key, DerivedKey)]
+    assert {key.kind for key in derived} == {"hover frames", "hover mask"}
+    assert asset_manager.resident_bytes == sum(get_resident_bytes(cached) for cached in asset_manager.variants.values())
+    assert set(asset_manager.memory_report()) == {ImageChoice.CHARACTER_SPINO}
+
+    for size in range(300, 700, 50):
+        asset_manager.get_scaled(ImageChoice.SLOT, (size, size))
+    assert not any(key in asset_manager.variants for key in derived)
+    assert asset_manager.resident_bytes <= asset_manager.budget_bytes
+
+def test_baked_bundle_matches_index(tmp_path) -> None:
+    from bake_assets import bake
+    bundle_path, index_path = str(tmp_path / "images.bundle"), str(tmp_path / "images.json")
+    index = bake(bundle_path, index_path)
+
+    bundle = BakedBundle.open(bundle_path, index_path)
+    assert bundle
+    spino = bundle.load(ImageChoice.CHARACTER_SPINO)
+    assert spino
+    assert spino.get_size() == (index["images"]["CHARACTER_SPINO"]["width"], index["images"]["CHARACTER_SPINO"]["height"])
+    assert spino.get_width() < 768
+
+def test_stale_baked_images_are_found_by_the_bake_step(tmp_path) -> None:
+    import json
+    from bake_assets import bake, find_stale_images
+    bundle_path, index_path = str(tmp_path / "images.bundle"), str(tmp_path / "images.json")
+    index = bake(bundle_path, index_path)
+    assert find_stale_images(bundle_path, index_path) == []
+
+    # An edit that keeps the file size still changes the modification time
+    index["images"]["SLOT"]["source_mtime_ns"] -= 1
+    with open(index_path, "w") as index_file:
+        json.dump(index, index_file)
+    assert find_stale_images(bundle_path, index_path) == [ImageChoice.SLOT]
+
+def test_preloaded_originals_are_never_evicted() -> None:
+    from assets.preloader import AssetPreloader
+    asset_manager = AssetManager(budget_bytes=24 * 1024 * 1024, use_baked_bundle=False)
+    preloader = AssetPreloader(asset_manager, use_threads=False)
+    while not preloader.is_done:
+        preloader.step()
+
+    # Preloading stops once its share of the budget is full instead of evicting what it loaded before
+    assert preloader.progress == 1 and 0 < preloader.loaded < preloader.total
+    assert asset_manager.cache_info().evictions == 0
+    assert asset_manager.pinned_bytes <= asset_manager.preload_budget_bytes
+
+    for size in range(200, 1000, 40):
+        asset_manager.get_scaled(ImageChoice.SLOT, (size, size))
+    assert asset_manager.cache_info().evictions > 0
+    assert all(variant in asset_manager.variants for variant in asset_manager.pinned)
+    assert asset_manager.resident_bytes <= asset_manager.budget_bytes
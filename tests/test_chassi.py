@@ -0,0 +1,79 @@
+from chassi import Cell, Chassi, Component, ComponentRenderer, Point, get_cell_box, get_orientations, normalize_shape
+
+
+def create_chassi(width: int, height: int) -> Chassi:
+    return Chassi.create_empty((100, 50), [Cell.create(Point(x, y)) for x in range(width) for y in range(height)])
+
+def test_hovered_cell_matches_cell_boxes() -> None:
+    chassi = create_chassi(5, 4)
+
+    for mouse_position in ((x, y) for x in range(70, 260, 7) for y in range(20, 180, 7)):
+        hit_cells = [cell for cell in chassi.cells if get_cell_box(chassi.position, cell.point).collidepoint(mouse_position)]
+        hovered_cell = chassi.get_hovered_cell(mouse_position)
+        assert [hovered_cell] == hit_cells if hit_cells else hovered_cell is None
+        assert [cell for cell in chassi.cells if cell.hover_detector.is_hovered] == hit_cells
+
+def test_remove_component_clears_its_cells() -> None:
+    chassi = create_chassi(3, 3)
+    component = Component([Point(0, 0), Point(1, 0)], ComponentRenderer())
+
+    chassi.add_component(chassi.get_cell(Point(1, 1)), component)
+    assert chassi.get_hovered_component((130, 80)) is component
+
+    chassi.remove_component(component)
+    assert all(cell.is_vacant for cell in chassi.cells)
+    assert chassi.get_hovered_component((130, 80)) is None
+
+def test_fit_checks_match_cells() -> None:
+    # An L shaped chassis, the bitmask fit has to agree with looking at the cells one by one
+    chassi = Chassi.create_empty((0, 0), [Cell.create(Point(x, y)) for x in range(4) for y in range(3) if x < 2 or y == 2])
+    chassi.add_component(chassi.get_cell(Point(0, 2)), Component([Point(0, 0)], ComponentRenderer()))
+    component = Component([Point(0, 0), Point(1, 0), Point(0, -1)], ComponentRenderer())
+
+    for target_point in (Point(x, y) for x in range(-2, 6) for y in range(-2, 5)):
+        footprint = chassi.get_footprint(component, target_point)
+        cells = [chassi.get_cell(point) for point, _ in footprint.points]
+        assert [is_free for _, is_free in footprint.points] == [bool(cell and cell.is_vacant) for cell in cells]
+        assert chassi.can_fit(component, target_point) == footprint.is_fitting == all(cell and cell.is_vacant for cell in cells)
+
+    chassi.add_component(chassi.get_cell(Point(1, 2)), component)
+    assert not chassi.can_fit(Component([Point(0, 0)], ComponentRenderer()), Point(1, 1))
+    chassi.remove_component(component)
+    assert chassi.can_fit(Component([Point(0, 0)], ComponentRenderer()), Point(1, 1))
+
+def test_orientations_are_distinct_and_closed() -> None:
+    line, square, l_shape = ((Point(0, 0), Point(1, 0), Point(2, 0)), (Point(0, 0), Point(1, 0), Point(0, 1), Point(1, 1)),
+                             (Point(0, 0), Point(1, 0), Point(2, 0), Point(0, 1)))
+    assert [len(get_orientations(shape).shapes) for shape in (line, square, l_shape)] == [2, 1, 8]
+
+    component = Component(list(l_shape), ComponentRenderer())
+    seen = set()
+    for _ in range(4):
+        assert Point(0, 0) in component.points
+        seen.add(normalize_shape(component.shape))
+        component.rotate()
+    assert component.orientation == 0 and len(seen) == 4
+
+    component.rotate()
+    component.mirror()
+    component.rotate()
+    component.mirror()
+    assert component.orientation == 0
+
+def test_cached_chassi_render_matches_drawing_every_cell() -> None:
+    import pygame
+    chassi = create_chassi(4, 3)
+    chassi.add_component(chassi.get_cell(Point(0, 0)), Component([Point(0, 0), Point(1, 0), Point(0, 1)], ComponentRenderer()))
+    chassi.add_component(chassi.get_cell(Point(3, 2)), Component([Point(0, 0)], ComponentRenderer()))
+
+    for mouse_position in ((0, 0), (100, 50), (130, 50), (190, 110), (100, 50)):
+        if mouse_position == (190, 110):
+            chassi.remove_component(chassi.components[0])
+        chassi.get_hovered_cell(mouse_position)
+        cached, expected = pygame.Surface((300, 200)), pygame.Surface((300, 200))
+        chassi.draw(cached)
+        for cell in chassi.cells:
+            cell.draw(expected, chassi.position)
+        for component in chassi.components:
+            component.draw(expected, chassi.position)
+        assert pygame.image.tobytes(cached, "RGB") == pygame.image.tobytes(expected, "RGB")
@@ -0,0 +1,57 @@
+import json
+import shutil
+
+import pytest
+
+import chassi_config
+from chassi_config import ConfigError, compile_config, load_config
+
+
+def test_config_is_compiled_and_cached(tmp_path, monkeypatch) -> None:
+    chassis_path, components_path = str(tmp_path / "chassis.json"), str(tmp_path / "components.json")
+    shutil.copy("config/chassis.json", chassis_path)
+    shutil.copy("config/components.json", components_path)
+    cache_path = str(tmp_path / "compiled" / "config.pickle")
+
+    config = load_config(chassis_path, components_path, cache_path)
+    assert len(config.components) == len(json.load(open(components_path)))
+    component = config.components[0].create()
+    assert component.orientations is config.components[0].orientations
+
+    def fail_compile(*_) -> None:
+        raise AssertionError("compiled again although the configs did not change")
+    monkeypatch.setattr(chassi_config, "compile_config", fail_compile)
+    assert load_config(chassis_path, components_path, cache_path) == config
+
+    with open(components_path, "a") as file:
+        file.write("\n")
+    with pytest.raises(AssertionError):
+        load_config(chassis_path, components_path, cache_path)
+
+@pytest.mark.parametrize("coordinates, component_type, error", [
+    ([[0, 0], [2, 0]], "weapon", "not connected"),
+    ([[0, 0], [1, 0], [0, 0]], "weapon", "appears twice"),
+    ([[0, 0], [1.5, 0]], "weapon", "pair of integers"),
+    ([], "weapon", "non-empty"),
+    ([[0, 0]], "laser", "unknown type"),
+    ([[1, 0], [2, 0]], "weapon", "must contain \\[0, 0\\]"),
+])
+def test_bad_config_is_rejected(coordinates, component_type, error) -> None:
+    with pytest.raises(ConfigError, match=error):
+        compile_config({"chassis": []}, [{"name": "Broken", "type": component_type, "coordinates": coordinates}])
+
+def test_cache_from_other_code_is_rebuilt(tmp_path, monkeypatch) -> None:
+    cache_path = tmp_path / "config.pickle"
+    config = load_config(cache_path=str(cache_path))
+
+    monkeypatch.setattr(chassi_config, "get_code_sources", lambda: (b"changed code",))
+    cache_path.write_bytes(b"\x80\x04\x95\x10\x00\x00\x00\x00\x00\x00\x00\x8c\x07missing\x94\x8c\x01x\x94\x93\x94.")
+    assert load_config(cache_path=str(cache_path)) == config
+
+    def fail_compile(*_) -> None:
+        raise AssertionError("compiled again although neither configs nor code changed")
+    monkeypatch.setattr(chassi_config, "compile_config", fail_compile)
+    assert load_config(cache_path=str(cache_path)) == config
+    monkeypatch.setattr(chassi_config, "get_code_sources", lambda: (b"changed again",))
+    with pytest.raises(AssertionError):
+        load_config(cache_path=str(cache_path))
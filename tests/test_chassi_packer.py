@@ -0,0 +1,79 @@
+import json
+from itertools import product
+
+from chassi import Cell, Chassi, Component, ComponentRenderer, Point
+from chassi_packer import AutoPackDragDropper, auto_pack, get_grid_options, solved_packings
+
+
+def create_chassi(points: list[tuple[int, int]]) -> Chassi:
+    return Chassi.create_empty((0, 0), [Cell.create(Point(x, y)) for x, y in points])
+
+def create_component(points: list[tuple[int, int]]) -> Component:
+    return Component([Point(x, y) for x, y in points], ComponentRenderer())
+
+def get_brute_force_count(chassis: list[Chassi], components: list[Component]) -> int:
+    """Place the components one by one wherever they fit, or leave them out, and count the best"""
+    if not components: return 0
+    component, rest = components[0], components[1:]
+    best = get_brute_force_count(chassis, rest)
+    for chassi, cell in ((chassi, cell) for chassi in chassis for cell in list(chassi.cells)):
+        if not chassi.can_fit(component, cell.point): continue
+        chassi.add_component(cell, component)
+        best = max(best, 1 + get_brute_force_count(chassis, rest))
+        chassi.remove_component(component)
+    return best
+
+def test_auto_pack_is_optimal_and_placeable() -> None:
+    shapes = ([(0, 0)], [(0, 0), (1, 0)], [(0, 0), (0, 1)], [(0, 0), (1, 0), (0, 1)], [(0, 0), (1, 0), (2, 0)])
+    chassis = [create_chassi([(0, 0), (1, 0), (2, 0), (0, 1), (1, 1)]), create_chassi([(0, 0), (1, 0), (1, 1), (0, 1)])]
+    chassis[1].add_component(chassis[1].get_cell(Point(1, 1)), create_component([(0, 0)]))
+
+    for shape_indices in product(range(len(shapes)), repeat=4):
+        components = [create_component(shapes[index]) for index in shape_indices]
+        result = auto_pack(chassis, components, time_limit_ms=1000)
+        assert result.is_complete
+        assert result.value == get_brute_force_count(chassis, components)
+
+    for placement in result.placements:
+        chassi = chassis[placement.chassi_index]
+        chassi.add_component(chassi.get_cell(placement.target_point), components[placement.component_index])
+
+def test_auto_pack_reuses_results_and_respects_time_limit() -> None:
+    with open("config/components.json") as file:
+        components = [create_component(data["coordinates"]) for data in json.load(file)]
+    with open("config/chassis.json") as file:
+        chassis = [create_chassi(data["coordinates"]) for data in json.load(file)["chassis"]]
+
+    first = auto_pack(chassis, components)
+    assert first.is_complete
+    assert auto_pack(chassis, components) is first
+
+    # A rushed packing is not cached, a later try with more time gets to search again
+    cached = len(solved_packings)
+    rushed = auto_pack(chassis, components * 3, time_limit_ms=0)
+    assert not rushed.is_complete
+    assert rushed.value > 0
+    assert len(solved_packings) == cached
+    assert auto_pack(chassis, components * 3, time_limit_ms=0) is not rushed
+
+def test_space_packs_the_source_chassi() -> None:
+    source = create_chassi([(x, 0) for x in range(6)])
+    target = create_chassi([(0, 0), (1, 0), (0, 1), (1, 1)])
+    source.add_component(source.get_cell(Point(0, 0)), create_component([(0, 0), (1, 0)]))
+    source.add_component(source.get_cell(Point(2, 0)), create_component([(0, 0), (1, 0)]))
+    source.add_component(source.get_cell(Point(4, 0)), create_component([(0, 0)]))
+
+    result = AutoPackDragDropper([source, target], source, [target]).pack_source()
+
+    assert result.value == 2
+    assert all(not cell.is_vacant for cell in target.cells)
+    assert len(source.components) == 1
+
+def test_candidate_options_are_cached_regardless_of_occupancy() -> None:
+    chassi = create_chassi([(x, y) for x in range(3) for y in range(2)])
+    auto_pack([chassi], [create_component([(0, 0), (1, 0)])])
+    cache_size = get_grid_options.cache_info().currsize
+
+    chassi.add_component(chassi.get_cell(Point(0, 0)), create_component([(0, 0)]))
+    auto_pack([chassi], [create_component([(0, 0), (1, 0)])])
+    assert get_grid_options.cache_info().currsize == cache_size
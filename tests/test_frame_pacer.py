@@ -0,0 +1,55 @@
+import asyncio
+
+from core.engine import FramePacer
+
+
+class FakeClock:
+    """Time only moves when the frame's work or the pacer's sleep moves it"""
+    def __init__(self) -> None:
+        self.now: float = 0.
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, duration_s: float) -> None:
+        self.sleeps.append(duration_s)
+        self.now += duration_s
+
+def test_frame_pacer_idles_after_quiet_frames() -> None:
+    pacer = FramePacer(fps=60, idle_fps=10, idle_after_frames=3)
+
+    for _ in range(3):
+        pacer.report_frame(is_busy=False)
+    assert pacer.is_idle
+
+    pacer.report_frame(is_busy=True)
+    assert not pacer.is_idle
+
+def test_frame_pacer_sleeps_only_the_remaining_budget() -> None:
+    clock = FakeClock()
+    pacer = FramePacer(fps=20, idle_fps=10, idle_after_frames=1, clock=clock, sleep=clock.sleep)
+
+    async def run_frames() -> None:
+        await pacer.wait_for_next_frame()
+        clock.now += 0.02  # Frame work takes part of the 50 ms budget
+        await pacer.wait_for_next_frame()
+        pacer.report_frame(is_busy=False)
+        await pacer.wait_for_next_frame()
+
+    asyncio.run(run_frames())
+    assert [round(duration_s, 6) for duration_s in clock.sleeps] == [0.05, 0.03, 0.1]
+    assert pacer.overruns == 0
+
+def test_frame_pacer_counts_overruns() -> None:
+    clock = FakeClock()
+    pacer = FramePacer(fps=100, clock=clock, sleep=clock.sleep)
+
+    async def run_frames() -> None:
+        await pacer.wait_for_next_frame()
+        clock.now += 0.03
+        await pacer.wait_for_next_frame()
+
+    asyncio.run(run_frames())
+    assert pacer.overruns == 1
+    assert clock.sleeps[-1] == 0
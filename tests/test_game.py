@@ -1,7 +1,8 @@
 from states.game import Game, create_enemy_slots, create_ally_slots
+from core.state_machine import StateChoice
 from states.combat_state import CombatState
 from core.input_listener import CrazyInputListener, NoInputListener
-from components import character_pool
+from rules import character_pool
 
 
 def test_game_1000_loops() -> None:
@@ -35,3 +36,30 @@ def test_combat_1000_loops() -> None:
         user_input = input_listener.capture()
 
         combat_state.loop(user_input)
+
+def test_upcoming_state_is_prepared_once_while_hovered() -> None:
+    test_game = Game.new_game()
+    test_game.switch_state(StateChoice.PREPARATION)
+    test_game.switch_state(StateChoice.BATTLE)
+    combat_state = test_game.state
+    combat_state.ally_slots[0].content = character_pool.Macedon()
+    for slot in combat_state.enemy_slots:
+        slot.content = None
+
+    hover_input = NoInputListener().capture()
+    hover_input.mouse_position = combat_state.continue_button.rect.center
+    for _ in range(500):  # The round plays out before combat concludes
+        test_game.loop(hover_input)
+        if test_game.prepared_state: break
+
+    reward_state = test_game.states[StateChoice.REWARD]
+    assert test_game.prepared_state is reward_state
+    prepared_rewards = reward_state.prepared_rewards
+    assert prepared_rewards
+
+    test_game.loop(hover_input)
+    assert reward_state.prepared_rewards is prepared_rewards
+
+    test_game.switch_state(StateChoice.REWARD)
+    assert [slot.content for slot in reward_state.reward_slots] == prepared_rewards
+    assert test_game.prepared_state is None
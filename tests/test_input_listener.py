@@ -0,0 +1,49 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from core.input_listener import PygameInputListener
+
+
+def post_events(*events: pygame.event.Event) -> None:
+    pygame.event.clear()
+    for posted_event in events:
+        pygame.event.post(posted_event)
+
+
+def test_pygame_input_listener_single_pass() -> None:
+    pygame.display.init()
+    pygame.display.set_mode((100, 100))
+    input_listener = PygameInputListener()
+
+    post_events(
+        pygame.event.Event(pygame.MOUSEMOTION, pos=(10, 20), rel=(4, 5), buttons=(0, 0, 0)),
+        pygame.event.Event(pygame.MOUSEMOTION, pos=(12, 24), rel=(2, 4), buttons=(0, 0, 0)),
+        pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(12, 24), button=pygame.BUTTON_RIGHT),
+        pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1),
+        pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0, unicode=" ", scancode=44),
+    )
+    user_input = input_listener.capture()
+
+    assert user_input.mouse_position == (12, 24)
+    assert user_input.mouse_motion == (6, 9)
+    assert user_input.is_mouse_moved
+    assert user_input.mouse_buttons_down == {pygame.BUTTON_RIGHT}
+    assert not user_input.is_mouse1_down
+    assert user_input.mouse_wheel == (0, -1)
+    assert user_input.is_space_key_down
+    assert [input_event.code for input_event in user_input.events] == [pygame.BUTTON_RIGHT, pygame.K_SPACE]
+
+    # The record is reused, only the held space key and the mouse position carry over
+    post_events(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(12, 24), button=pygame.BUTTON_LEFT))
+    next_input = input_listener.capture()
+
+    assert next_input is user_input
+    assert next_input.is_mouse1_up
+    assert not next_input.is_mouse_moved
+    assert not next_input.mouse_buttons_down
+    assert next_input.is_space_key_down
+    assert next_input.mouse_position == (12, 24)
+
+    pygame.display.quit()
@@ -0,0 +1,54 @@
+import random
+import pygame
+
+from core.input_listener import CrazyInputListener, RecordingInputListener, ReplayInputListener
+from core.interfaces import UserInput, InputEvent
+from states.game import Game
+
+
+def play(input_listener, frames: int) -> tuple[list[UserInput], Game]:
+    game = Game.new_game()
+    user_inputs = []
+    for _ in range(frames):
+        user_input = input_listener.capture()
+        user_inputs.append(user_input.copy())
+        game.loop(user_input)
+    return user_inputs, game
+
+
+def test_replay_reproduces_recorded_session(tmp_path) -> None:
+    recording_path = str(tmp_path / "session.rti")
+
+    random.seed(1234)
+    recorder = RecordingInputListener(CrazyInputListener(), recording_path, seed=1234)
+    recorded_inputs, recorded_game = play(recorder, 150)
+    recorder.close()
+
+    replayer = ReplayInputListener(recording_path)
+    random.seed(replayer.seed)
+    replayed_inputs, replayed_game = play(replayer, 150)
+
+    assert replayer.seed == 1234
+    assert replayer.is_finished
+    assert replayed_inputs == recorded_inputs
+    assert type(replayed_game.state) == type(recorded_game.state)
+    assert [slot.content.name if slot.content else None for slot in replayed_game.state.ally_slots] == \
+        [slot.content.name if slot.content else None for slot in recorded_game.state.ally_slots]
+    assert replayer.capture().is_quit
+
+def test_recording_keeps_events(tmp_path) -> None:
+    recording_path = str(tmp_path / "events.rti")
+    user_input = UserInput(False, True, False, False, (640, 480), mouse_motion=(-3, 7), mouse_wheel=(0, 1), is_mouse_moved=True)
+    user_input.mouse_buttons_down.add(1)
+    user_input.keys_down.add(pygame.K_UP)  # Key codes above 2**30 must survive
+    user_input.events.extend([InputEvent(pygame.MOUSEBUTTONDOWN, 1, 100), InputEvent(pygame.KEYDOWN, pygame.K_UP, 101)])
+
+    class OneInput:
+        def capture(self) -> UserInput:
+            return user_input
+
+    recorder = RecordingInputListener(OneInput(), recording_path, seed=0)
+    recorder.capture()
+    recorder.close()
+
+    assert ReplayInputListener(recording_path).capture() == user_input
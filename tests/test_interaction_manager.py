@@ -0,0 +1,82 @@
+from pygame import Rect
+
+from assets.images import ASSETS
+from rules import character_pool
+from components.character_slot import create_bench_slots
+from components.interactable import Button
+from components.interaction_manager import InteractionManager
+
+
+class CountingButton(Button):
+    def __init__(self, position: tuple[int, int]) -> None:
+        super().__init__(position, "Test")
+        self.hover_changes = 0
+
+    def set_hovered(self, is_hovered: bool) -> None:
+        self.hover_changes += is_hovered != self.is_hovered
+        super().set_hovered(is_hovered)
+
+
+def test_interaction_manager_notifies_only_changed_widgets() -> None:
+    buttons = [CountingButton((x, y)) for x in range(0, 800, 160) for y in range(0, 600, 60)]
+    interactions = InteractionManager()
+    interactions.register(*buttons)
+
+    interactions.update((10, 10))
+    assert [button for button in buttons if button.is_hovered] == [buttons[0]]
+
+    interactions.update((170, 10))
+    assert [button for button in buttons if button.is_hovered] == [buttons[10]]
+    assert sum(button.hover_changes for button in buttons) == 3
+
+    # The hover animation of the button left behind keeps stepping back to rest
+    for _ in range(10):
+        interactions.update((170, 10))
+    assert buttons[0].hover_frame == 0
+    assert buttons[0] not in interactions.animating
+
+def test_interaction_manager_full_pass_after_invalidate() -> None:
+    button = Button((0, 0), "Test")
+    interactions = InteractionManager()
+    interactions.register(button)
+    interactions.update((10, 10))
+
+    button.set_hovered(False)  # E.g. another state sharing the widget moved on
+    interactions.invalidate()
+    interactions.update((10, 10))
+    assert button.is_hovered
+
+def test_pixel_perfect_slot_hover() -> None:
+    slot = create_bench_slots()[0]
+    slot.content = character_pool.Spinoswordaus()
+    art_rect = slot.get_art_rect((slot.content.width_pixels, slot.content.height_pixels))
+    art_mask = ASSETS.get_mask(slot.content.character_image, art_rect.size)
+    slot_box = Rect(slot.position, slot.size)
+
+    above_slot = [(x, y) for x in range(art_rect.width) for y in range(art_rect.height)
+                  if not slot_box.collidepoint(art_rect.left + x, art_rect.top + y)]
+    opaque = next(point for point in above_slot if art_mask.get_at(point))
+    transparent = next(point for point in above_slot if not art_mask.get_at(point))
+
+    assert slot.is_hit((art_rect.left + opaque[0], art_rect.top + opaque[1]))
+    assert not slot.is_hit((art_rect.left + transparent[0], art_rect.top + transparent[1]))
+    assert slot.get_hit_bounds().contains(art_rect)
+
+def test_slot_hover_follows_content_under_still_mouse() -> None:
+    slot = create_bench_slots()[0]
+    slot.content = character_pool.Spinoswordaus()
+    interactions = InteractionManager()
+    interactions.register(slot)
+
+    art_rect = slot.get_art_rect((slot.content.width_pixels, slot.content.height_pixels))
+    art_mask = ASSETS.get_mask(slot.content.character_image, art_rect.size)
+    slot_box = Rect(slot.position, slot.size)
+    mouse_position = next((art_rect.left + x, art_rect.top + y) for x in range(art_rect.width) for y in range(art_rect.height)
+                          if art_mask.get_at((x, y)) and not slot_box.collidepoint(art_rect.left + x, art_rect.top + y))
+    interactions.update(mouse_position)
+    assert slot.is_hovered
+
+    # E.g. the character was bought or died, the mouse never moved
+    slot.content = None
+    interactions.update(mouse_position)
+    assert not slot.is_hovered
@@ -0,0 +1,19 @@
+from rules import character_pool
+from rules.combat import BattleRound, is_everyone_dead
+from rules.slots import create_simulation_slots
+
+
+def test_combat_runs_on_simulation_slots() -> None:
+    ally_slots, enemy_slots = create_simulation_slots()
+    ally_slots[0].content = character_pool.Macedon()
+    ally_slots[1].content = character_pool.Healamimus()
+    enemy_slots[0].content = character_pool.Trilo()
+    enemy_slots[1].content = character_pool.Trilo()
+
+    for _ in range(50):
+        battle_round = BattleRound.start_new_round(ally_slots, enemy_slots)
+        while not battle_round.is_done:
+            battle_round.loop()
+        if is_everyone_dead(ally_slots) or is_everyone_dead(enemy_slots): break
+
+    assert is_everyone_dead(ally_slots) or is_everyone_dead(enemy_slots)
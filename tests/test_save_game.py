@@ -0,0 +1,72 @@
+from dataclasses import replace
+
+from core.saves import RunSaver, FileSaveStorage
+from core.state_machine import StateChoice
+from rules import character_pool
+from rules.character import Character
+from rules.save_game import CHARACTER_IDS, MAX_SAVED_VALUE, CharacterRecord, encode_run, decode_run
+from states.game import Game
+
+
+def test_every_character_has_a_save_id() -> None:
+    character_types = {character_type for character_type in Character.__subclasses__() if character_type.__module__ == character_pool.__name__}
+    assert character_types <= set(CHARACTER_IDS)
+    assert len(set(CHARACTER_IDS.values())) == len(CHARACTER_IDS)
+
+def test_run_survives_save_and_resume(tmp_path) -> None:
+    game = Game.new_game()
+    game.switch_state(StateChoice.PREPARATION)
+    shop_state = game.states[StateChoice.SHOP]
+    shop_state.gold = 7
+    macedon = character_pool.Macedon()
+    macedon.raise_max_health(3)
+    macedon.lose_health(2)
+    shop_state.ally_slots[1].content = macedon
+
+    saver = RunSaver(FileSaveStorage(str(tmp_path / "run.rts")))
+    saver.save(game.to_snapshot())
+    saver.close()
+
+    data = (tmp_path / "run.rts").read_bytes()
+    assert len(data) < 200
+    assert decode_run(data) == game.to_snapshot()
+    assert encode_run(decode_run(data)) == data
+
+    resumed = Game.resume(RunSaver(FileSaveStorage(str(tmp_path / "run.rts"))).load())
+
+    assert resumed.to_snapshot() == game.to_snapshot()
+    assert resumed.get_state_choice() == StateChoice.PREPARATION
+    resumed_macedon = resumed.states[StateChoice.SHOP].ally_slots[1].content
+    assert isinstance(resumed_macedon, character_pool.Macedon)
+    assert (resumed_macedon.health, resumed_macedon.max_health) == (macedon.health, macedon.max_health)
+
+def test_truncated_save_is_deleted(tmp_path) -> None:
+    save_path = tmp_path / "run.rts"
+    save_path.write_bytes(encode_run(Game.new_game().to_snapshot())[:7])
+    saver = RunSaver(FileSaveStorage(str(save_path)), use_threads=False)
+
+    assert saver.load() is None
+    assert not save_path.exists()
+
+def test_save_that_does_not_fit_the_game_starts_a_new_run(tmp_path) -> None:
+    save_path = tmp_path / "run.rts"
+    snapshot = Game.new_game().to_snapshot()
+    save_path.write_bytes(encode_run(replace(snapshot, gold=99, slot_groups=snapshot.slot_groups[:-1])))
+    saver = RunSaver(FileSaveStorage(str(save_path)), use_threads=False)
+
+    game = Game.load_or_new_game(saver)
+
+    assert game.get_state_choice() == StateChoice.SHOP
+    assert decode_run(save_path.read_bytes()) == game.to_snapshot()
+    assert game.to_snapshot().gold != 99
+
+def test_values_beyond_the_save_fields_are_clamped() -> None:
+    game = Game.new_game()
+    game.states[StateChoice.SHOP].gold = 100_000
+    macedon = character_pool.Macedon()
+    macedon.raise_max_health(100_000)
+    game.states[StateChoice.SHOP].ally_slots[0].content = macedon
+
+    snapshot = decode_run(encode_run(game.to_snapshot()))
+    assert snapshot.gold == MAX_SAVED_VALUE
+    assert CharacterRecord.from_character(macedon).max_health == MAX_SAVED_VALUE
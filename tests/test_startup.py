@@ -0,0 +1,30 @@
+import pkgutil
+import subprocess
+import sys
+from typing import Final
+
+import rules
+from startup_profile import profile_imports, get_project_import_ms, PROJECT_IMPORT_BUDGET_MS
+
+IMPORT_BUDGET_TOLERANCE: Final[float] = 3   # Slow or busy test machines, startup_profile.py holds the exact budget
+
+
+def test_project_imports_within_budget() -> None:
+    profile_imports("states.game")  # Writes the bytecode cache on a clean checkout, the second import is measured
+    timings = profile_imports("states.game")
+    modules = {timing.module for timing in timings if timing.is_project_module}
+    assert {"settings", "states.game", "rules.combat"} <= modules
+    assert all(timing.cumulative_ms >= timing.self_ms >= 0 for timing in timings)
+    assert get_project_import_ms(timings) < PROJECT_IMPORT_BUDGET_MS * IMPORT_BUDGET_TOLERANCE
+
+def test_importing_the_game_loads_no_images() -> None:
+    check = "import states.game; from assets.images import ASSETS; print(ASSETS.cache_info().resident_bytes, len(ASSETS.variants))"
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True)
+    assert result.stdout.split()[-2:] == ["0", "0"]
+
+def test_game_logic_modules_import_without_pygame() -> None:
+    # Every rules module is listed, so a new one is covered as soon as it is added
+    modules = ["core.state_machine"] + [f"rules.{module.name}" for module in pkgutil.iter_modules(rules.__path__)]
+    check = f"import sys, {', '.join(modules)}; print('pygame' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True)
+    assert result.stdout.split()[-1] == "False"
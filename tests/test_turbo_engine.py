@@ -0,0 +1,16 @@
+from core.engine import TurboEngine
+from core.input_listener import NoInputListener
+from states.game import Game
+from settings import GAME_FPS
+
+
+def test_turbo_engine_stops_after_step_budget() -> None:
+    engine = TurboEngine(Game.new_game(), input_listener=NoInputListener(), max_steps=600)
+    engine.run()
+
+    report = engine.report()
+    assert report.steps == 600
+    assert report.virtual_time_s == 600 / GAME_FPS
+    # Ten seconds of game time must take only a fraction of that on the wall clock
+    assert report.wall_time_s < report.virtual_time_s / 2
+    assert report.loops_per_second > 0